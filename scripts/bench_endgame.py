@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the endgame table.
+
+Usage:
+    python scripts/bench_endgame.py --positions 200 --tricks 4
+
+Finds the best card in random endgame positions twice with an in-memory
+``EndgameTable``: cold, where every position is solved, and warm, where
+every position is a lookup. Then reports the table's hit rate and size.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List
+
+from server import cards
+from server.endgame import EndgameTable
+from server.solver import Deal
+
+
+def random_positions(count: int, tricks: int, seed: int) -> List[Deal]:
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(count):
+        indices = rng.sample(range(len(cards.CARD_CODES)), 4 * tricks)
+        hands = tuple(cards.mask_of(indices[seat * tricks:(seat + 1) * tricks]) for seat in range(4))
+        positions.append(Deal(hands, rng.choice(cards.SUITS), rng.randint(1, 4)))
+    return positions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Sjavs endgame table.")
+    parser.add_argument("--positions", type=int, default=200, help="Random positions (default: 200)")
+    parser.add_argument("--tricks", type=int, choices=(1, 2, 3, 4), default=4, help="Tricks left (default: 4)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    positions = random_positions(args.positions, args.tricks, args.seed)
+    table = EndgameTable(path=None)
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        for deal in positions:
+            table.best_card(deal)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<6} {elapsed:8.3f}s  {1000 * elapsed / len(positions):8.3f} ms/position")
+    stats = table.stats()
+    print(f"{stats.entries:,} entries, {stats.lookups:,} lookups, hit rate {stats.hit_rate:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Commit throughput of the command journal, against one commit per command.
+
+Usage:
+    python scripts/bench_journal.py --tables 200 --clients 16 --commands 50
+
+Seats four players at each of ``--tables`` games. Then ``--clients`` threads
+send ``--commands`` ``say`` commands to every table they own. Two ways of
+logging the commands are measured in turn:
+
+* ``per command``: the recorder inserts the record and commits it on the
+  caller's thread, so every command waits for its own commit;
+* ``group commit``: the games are attached to a ``Journal``, whose writer
+  thread commits whatever has queued up in one transaction.
+
+Reports commands/sec, p50/p99 command latency, transactions and records
+per transaction, and how long the journal then takes to restore every table.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from server.game import Game
+from server.journal import Journal
+
+
+def make_games(count: int) -> List[Game]:
+    games = []
+    for _ in range(count):
+        game = Game(inactivity_timeout=None)
+        for name in ("Anna", "Bjorg", "Carl", "Dani"):
+            game.process_command(f"Hallo, Eg eri {name}")
+        games.append(game)
+    return games
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def drive(games: List[Game], clients: int, commands: int) -> Tuple[float, List[float]]:
+    """Send every table its commands from ``clients`` threads; elapsed seconds and latencies."""
+    latencies: List[List[float]] = [[] for _ in range(clients)]
+
+    def client(index: int) -> None:
+        mine = games[index::clients]
+        for count in range(commands):
+            for seat, game in enumerate(mine):
+                started = time.perf_counter()
+                game.process_command(f"P{seat % 4 + 1} say {count}")
+                latencies[index].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, [sample for samples in latencies for sample in samples]
+
+
+def per_command_recorder(path: Path) -> Tuple[Callable[[str], Callable[[tuple], None]], Callable[[], int]]:
+    """Recorders that commit each record before the command returns."""
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("CREATE TABLE records (game_id TEXT, seq INTEGER, record TEXT)")
+    lock = threading.Lock()
+    commits = [0]
+
+    def recorder_for(game_id: str) -> Callable[[tuple], None]:
+        seq = [0]
+
+        def record(entry: tuple) -> None:
+            with lock:
+                seq[0] += 1
+                db.execute("INSERT INTO records VALUES (?, ?, ?)", (game_id, seq[0], json.dumps(entry)))
+                db.commit()
+                commits[0] += 1
+
+        return record
+
+    return recorder_for, lambda: commits[0]
+
+
+def report(label: str, elapsed: float, latencies: List[float], commits: int, records: int) -> None:
+    print(
+        f"{label:>13}: {len(latencies) / elapsed:>9,.0f} commands/s   "
+        f"p50 {percentile(latencies, 0.5) * 1e6:>6.0f} us   p99 {percentile(latencies, 0.99) * 1e6:>7.0f} us   "
+        f"{commits:>7,} commits   {records / max(commits, 1):>6.1f} records/commit"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Sjavs command journal.")
+    parser.add_argument("--tables", type=int, default=200, help="Tables (default: 200)")
+    parser.add_argument("--clients", type=int, default=16, help="Client threads (default: 16)")
+    parser.add_argument("--commands", type=int, default=50, help="Commands per table (default: 50)")
+    parser.add_argument("--snapshot-every", type=int, default=200, help="Records between snapshots (default: 200)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        games = make_games(args.tables)
+        recorder_for, commits = per_command_recorder(Path(scratch) / "per_command.sqlite3")
+        for index, game in enumerate(games):
+            game.recorder = recorder_for(f"t{index}")
+        elapsed, latencies = drive(games, args.clients, args.commands)
+        report("per command", elapsed, latencies, commits(), len(latencies))
+
+        path = Path(scratch) / "journal.sqlite3"
+        journal = Journal(path, snapshot_every=args.snapshot_every)
+        games = make_games(args.tables)
+        for index, game in enumerate(games):
+            journal.attach(f"t{index}", game)
+        journal.flush()
+        before = journal.stats()
+        elapsed, latencies = drive(games, args.clients, args.commands)
+        flush_started = time.perf_counter()
+        journal.flush()
+        drained = time.perf_counter() - flush_started
+        stats = journal.stats()
+        report("group commit", elapsed, latencies, stats.commits - before.commits, len(latencies))
+        print(
+            f"{'':>13}  largest batch {stats.largest_batch:,}, {stats.snapshots - before.snapshots:,} snapshots, "
+            f"queue drained {drained * 1e3:.0f} ms after the last command"
+        )
+        journal.close()
+        for game in games:
+            game.close()
+
+        started = time.perf_counter()
+        tables = Journal(path).restore()
+        restored = time.perf_counter() - started
+        replayed = sum(table.replayed for table in tables)
+        print(f"{'restore':>13}: {len(tables):,} tables, {replayed:,} records replayed in {restored * 1e3:.0f} ms")
+        for table in tables:
+            table.game.close()
+
+
+if __name__ == "__main__":
+    main()
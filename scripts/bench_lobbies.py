@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Request latency across many lobbies: one global lock against per-game actors.
+
+Usage:
+    python scripts/bench_lobbies.py --lobbies 500 --clients 64 --seconds 5
+
+Seats four players at each of ``--lobbies`` games and deals a hand, then runs
+``--clients`` threads that hit random seats for ``--seconds``: mostly state
+reads, with a ``say`` command every ``--command-every`` requests. One table
+is made slow (``--slow-ms`` per state build, standing in for a heavy
+``/state``). Two models are measured in turn:
+
+* ``global lock``: every read and command holds one process-wide lock, as
+  ``webapp.session_lock`` did, and reads build the seat's state on demand;
+* ``actors``: commands go through each game's ``GameActor`` and reads take
+  the snapshot it last published.
+
+Reports requests/sec and p50/p99/max latency for reads and commands.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from server.actor import ActorExecutor, GameActor
+from server.game import Game
+
+
+def seat_state(game: Game, player_id: int, slow: float) -> Dict[str, object]:
+    """A stand-in for ``webapp.build_state``: the fields a seat is sent."""
+    if slow:
+        time.sleep(slow)
+    player = game.players[player_id]
+    table = game.table
+    return {
+        "version": game.state_version,
+        "phase": game.state,
+        "scoreboard": dict(game.scoreboard),
+        "current_turn": game.current_turn,
+        "trump": game.trump_suit,
+        "hand": [str(card) for card in player.hand],
+        "table_cards": [str(card) for card in table.cards] if table else [],
+        "players": [
+            {"id": pid, "name": other.name, "ping": other.time_since_last_update()}
+            for pid, other in sorted(game.players.items())
+        ],
+    }
+
+
+def make_games(count: int) -> List[Game]:
+    games = []
+    for _ in range(count):
+        game = Game()
+        for name in ("Anna", "Bjorg", "Carl", "Dani"):
+            game.process_command(f"Hallo, Eg eri {name}")
+        game.process_command("P1 start")
+        game.process_command(f"P{game.current_turn} banka")
+        games.append(game)
+    return games
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def drive(
+    read: Callable[[int, int], object],
+    command: Callable[[int, str], str],
+    lobbies: int,
+    clients: int,
+    seconds: float,
+    command_every: int,
+) -> Tuple[float, List[float], List[float]]:
+    reads: List[float] = []
+    commands: List[float] = []
+    stop = time.perf_counter() + seconds
+
+    def client(seed: int) -> None:
+        rng = random.Random(seed)
+        mine_reads, mine_commands = [], []
+        requests = 0
+        while time.perf_counter() < stop:
+            lobby = rng.randrange(lobbies)
+            seat = rng.randint(1, 4)
+            requests += 1
+            start = time.perf_counter()
+            if requests % command_every == 0:
+                command(lobby, f"P{seat} say hi")
+                mine_commands.append(time.perf_counter() - start)
+            else:
+                read(lobby, seat)
+                mine_reads.append(time.perf_counter() - start)
+        reads.extend(mine_reads)
+        commands.extend(mine_commands)
+
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, reads, commands
+
+
+def report(label: str, elapsed: float, reads: List[float], commands: List[float]) -> None:
+    total = len(reads) + len(commands)
+    print(f"{label:<12} {total / elapsed:9.0f} req/s")
+    for kind, samples in (("reads", reads), ("commands", commands)):
+        if not samples:
+            continue
+        print(
+            f"  {kind:<10} n={len(samples):<8} p50 {1000 * statistics.median(samples):8.3f} ms"
+            f"  p99 {1000 * percentile(samples, 0.99):8.3f} ms  max {1000 * max(samples):8.3f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark lobby request latency.")
+    parser.add_argument("--lobbies", type=int, default=500, help="Open games (default: 500)")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent client threads (default: 64)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Run time per model (default: 5)")
+    parser.add_argument("--command-every", type=int, default=10, help="One command per N requests (default: 10)")
+    parser.add_argument("--slow-ms", type=float, default=20.0, help="State build time at table 0 (default: 20)")
+    parser.add_argument("--workers", type=int, default=8, help="Actor executor threads (default: 8)")
+    args = parser.parse_args()
+
+    slow = args.slow_ms / 1000
+    print(f"{args.lobbies} lobbies, {args.clients} clients, {args.seconds:.0f}s per model")
+
+    games = make_games(args.lobbies)
+    lock = threading.Lock()
+
+    def locked_read(lobby: int, seat: int) -> object:
+        with lock:
+            return seat_state(games[lobby], seat, slow if lobby == 0 else 0.0)
+
+    def locked_command(lobby: int, text: str) -> str:
+        with lock:
+            return games[lobby].process_command(text)
+
+    report("global lock", *drive(locked_read, locked_command, args.lobbies, args.clients, args.seconds, args.command_every))
+
+    executor = ActorExecutor(workers=args.workers)
+    games = make_games(args.lobbies)
+
+    def publisher(lobby: int) -> Callable[[Game, object], Dict[int, Dict[str, object]]]:
+        def publish(game: Game, _previous: object) -> Dict[int, Dict[str, object]]:
+            return {seat: seat_state(game, seat, slow if lobby == 0 else 0.0) for seat in game.players}
+
+        return publish
+
+    actors = [GameActor(game, publisher(lobby), executor) for lobby, game in enumerate(games)]
+
+    def actor_read(lobby: int, seat: int) -> object:
+        return actors[lobby].snapshot[seat]
+
+    def actor_command(lobby: int, text: str) -> str:
+        return actors[lobby].command(text)
+
+    report("actors", *drive(actor_read, actor_command, args.lobbies, args.clients, args.seconds, args.command_every))
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the double-dummy solver.
+
+Usage:
+    python scripts/bench_solver.py --deals 20 --processes 4
+
+Solves random full deals one at a time and reports the time per deal
+(median and worst), then solves the same deals with ``solve_many`` across a
+process pool and reports deals per second.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+from server import cards
+from server.solver import Deal, solve, solve_many
+
+
+def random_deals(count: int, seed: int) -> List[Deal]:
+    rng = random.Random(seed)
+    deals = []
+    for _ in range(count):
+        codes = list(cards.CARD_CODES)
+        rng.shuffle(codes)
+        hands = tuple(cards.mask_from_codes(codes[seat * 8:(seat + 1) * 8]) for seat in range(4))
+        deals.append(Deal(hands, rng.choice(cards.SUITS), rng.randint(1, 4)))
+    return deals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Sjavs double-dummy solver.")
+    parser.add_argument("--deals", type=int, default=20, help="Random deals to solve (default: 20)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--processes", type=int, default=None, help="Pool size for the batch run (default: CPU count)")
+    args = parser.parse_args()
+
+    deals = random_deals(args.deals, args.seed)
+    print(f"Solving {len(deals)} random deals")
+
+    times = []
+    serial = []
+    for deal in deals:
+        start = time.perf_counter()
+        serial.append(solve(deal))
+        times.append(time.perf_counter() - start)
+    print(
+        f"{'one at a time':<16} median {statistics.median(times):7.3f}s  "
+        f"worst {max(times):7.3f}s  total {sum(times):8.3f}s"
+    )
+
+    start = time.perf_counter()
+    batch = solve_many(deals, processes=args.processes)
+    elapsed = time.perf_counter() - start
+    print(f"{'solve_many':<16} {elapsed:8.3f}s  {len(deals) / elapsed:8.2f} deals/s")
+    if batch != serial:
+        raise SystemExit("Batch results differ from the serial run.")
+
+
+if __name__ == "__main__":
+    main()
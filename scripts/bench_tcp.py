@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Side-by-side load test of the asyncio and thread-per-connection TCP servers.
+
+Usage:
+    python scripts/bench_tcp.py --clients 1000 --commands 20 --mode both
+
+Starts ``python -m server.app`` in a subprocess (with ``--blocking`` for the
+threaded server), seats one player, then opens ``--clients`` concurrent
+connections that each send ``--commands`` ``GU`` heartbeats in lock-step.
+The clients are spread over ``--processes`` load processes so the client side
+is not the bottleneck. Reports commands per second and reply latency
+percentiles for each server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def launch(port: int, blocking: bool) -> subprocess.Popen:
+    command = [sys.executable, "-m", "server.app", "--port", str(port)]
+    if blocking:
+        command.append("--blocking")
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10.0
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"Server on port {port} did not come up.")
+
+
+async def client(port: int, commands: int, latencies: List[float]) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for _ in range(commands):
+            start = time.perf_counter()
+            writer.write(b"P1 GU")
+            await writer.drain()
+            if not await reader.read(4096):
+                raise ConnectionError("Server closed the connection.")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load(port: int, clients: int, commands: int, start_at: float) -> Tuple[float, List[float]]:
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    latencies: List[float] = []
+    results = await asyncio.gather(
+        *(client(port, commands, latencies) for _ in range(clients)),
+        return_exceptions=True,
+    )
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if failures:
+        print(f"  {len(failures)} client(s) failed, first: {failures[0]!r}")
+    return time.time(), latencies
+
+
+def load_process(port: int, clients: int, commands: int, start_at: float) -> Tuple[float, List[float]]:
+    return asyncio.run(load(port, clients, commands, start_at))
+
+
+def seat_player(port: int) -> None:
+    with socket.create_connection(("127.0.0.1", port), timeout=5.0) as sock:
+        sock.sendall(b"Hallo, Eg eri Bench")
+        sock.recv(4096)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def run(label: str, port: int, blocking: bool, clients: int, commands: int, processes: int) -> None:
+    process = launch(port, blocking)
+    try:
+        seat_player(port)
+        start_at = time.time() + 1.0
+        shares = [clients // processes + (index < clients % processes) for index in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(
+                load_process,
+                [port] * processes,
+                shares,
+                [commands] * processes,
+                [start_at] * processes,
+            ))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    elapsed = max(finished for finished, _ in results) - start_at
+    latencies = [latency for _, chunk in results for latency in chunk]
+    rate = len(latencies) / elapsed if elapsed else float("inf")
+    print(
+        f"{label:<10} {len(latencies):>8} cmds {elapsed:8.2f}s {rate:>10,.0f} cmds/s"
+        f"  p50 {percentile(latencies, 0.5) * 1000:6.2f}ms  p99 {percentile(latencies, 0.99) * 1000:7.2f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Sjavs TCP servers.")
+    parser.add_argument("--clients", type=int, default=500, help="Concurrent connections (default: 500)")
+    parser.add_argument("--commands", type=int, default=20, help="Commands per connection (default: 20)")
+    parser.add_argument("--processes", type=int, default=4, help="Load generator processes (default: 4)")
+    parser.add_argument("--port", type=int, default=65440, help="Base port for the servers (default: 65440)")
+    parser.add_argument(
+        "--mode",
+        choices=("async", "blocking", "both"),
+        default="both",
+        help="Which server(s) to measure (default: both)",
+    )
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients x {args.commands} commands")
+    if args.mode in {"async", "both"}:
+        run("asyncio", args.port, False, args.clients, args.commands, args.processes)
+    if args.mode in {"blocking", "both"}:
+        run("threaded", args.port + 1, True, args.clients, args.commands, args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Commands/sec through the bot transports, before and after connection pooling.
+
+Usage:
+    python scripts/bench_transport.py --bots 3 --commands 2000
+
+Starts ``python -m server.app`` in a subprocess, seats one player and runs
+``--bots`` threads that each send ``--commands`` ``GU`` heartbeats, the way
+``BotBrain`` polls. Each transport is measured in turn:
+
+* ``per-command``: a new TCP connection for every command (the old
+  ``random_bots.py`` behaviour)
+* ``pooled legacy``: persistent connections, unframed protocol
+* ``pooled framed``: persistent ``SJAVS/1`` connections
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from typing import Callable
+
+from bench_tcp import launch, seat_player
+
+from server.transport import ConnectionPool, connect_per_command
+
+
+def drive(send: Callable[[str], str], bots: int, commands: int) -> float:
+    def bot() -> None:
+        for _ in range(commands):
+            send("P1 GU")
+
+    threads = [threading.Thread(target=bot) for _ in range(bots)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Sjavs bot transports.")
+    parser.add_argument("--bots", type=int, default=3, help="Concurrent bot threads (default: 3)")
+    parser.add_argument("--commands", type=int, default=2000, help="Commands per bot (default: 2000)")
+    parser.add_argument("--pool-size", type=int, default=None, help="Pooled connections (default: one per bot)")
+    parser.add_argument("--port", type=int, default=65450, help="Server port (default: 65450)")
+    args = parser.parse_args()
+
+    total = args.bots * args.commands
+    size = args.pool_size or args.bots
+    process = launch(args.port, blocking=False)
+    try:
+        seat_player(args.port)
+        print(f"{args.bots} bots x {args.commands} GU commands")
+        transports = [
+            ("per-command", connect_per_command("127.0.0.1", args.port), None),
+            ("pooled legacy", None, ConnectionPool("127.0.0.1", args.port, size=size, legacy=True)),
+            ("pooled framed", None, ConnectionPool("127.0.0.1", args.port, size=size)),
+        ]
+        for label, send, pool in transports:
+            elapsed = drive(send or pool, args.bots, args.commands)
+            connects = total if pool is None else pool.connects
+            if pool is not None:
+                pool.close()
+            print(f"{label:<15} {elapsed:8.2f}s {total / elapsed:>10,.0f} cmds/s {connects:>8} connections")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
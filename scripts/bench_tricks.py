@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for trick resolution.
+
+Usage:
+    python scripts/bench_tricks.py --tricks 200000
+
+Compares the string/tuple strength ordering the server and bots used to
+rebuild for every trick against the precomputed rank tables in
+``server.cards`` and reports tricks resolved per second for each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable, List, Sequence, Tuple
+
+from server import cards
+from server.bot_player import BotBrain
+from server.utils import Card, Player, Table
+
+SUIT_NAMES = {"C": "Clubs", "D": "Diamonds", "H": "Hearts", "S": "Spades"}
+VALUES = {"A": 1, "K": 13, "Q": 12, "J": 11, "T": 10, "9": 9, "8": 8, "7": 7}
+
+
+def legacy_winner(trick: Sequence[Card], trump: str) -> int:
+    """The closure-based resolver ``Table.clear_and_reset`` used before the tables."""
+    lead_suit = trick[0].suit
+
+    def value_rank(card: Card) -> int:
+        return 14 if card.value == 1 else card.value
+
+    def strength(card: Card) -> Tuple[int, int]:
+        short = card.short_name()
+        if short in Card.TRUMPS:
+            return 3, len(Card.TRUMPS) - Card.TRUMPS.index(short)
+        if short[1] == trump or short in Card.TRUMPS:
+            return 2, value_rank(card)
+        if card.suit == lead_suit:
+            return 1, value_rank(card)
+        return 0, value_rank(card)
+
+    winner_index, _ = max(enumerate(trick), key=lambda item: (strength(item[1]), -item[0]))
+    return winner_index
+
+
+def make_tricks(count: int, seed: int) -> List[Tuple[str, List[Card]]]:
+    rng = random.Random(seed)
+    tricks = []
+    for _ in range(count):
+        codes = rng.sample(cards.CARD_CODES, 4)
+        hand = [Card(SUIT_NAMES[code[1]], VALUES[code[0]]) for code in codes]
+        tricks.append((rng.choice(cards.SUITS), hand))
+    return tricks
+
+
+def time_it(label: str, count: int, fn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{label:<28} {elapsed:8.3f}s  {rate:>12,.0f} tricks/s")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Sjavs trick resolution.")
+    parser.add_argument("--tricks", type=int, default=200_000, help="Tricks to resolve (default: 200000)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    tricks = make_tricks(args.tricks, args.seed)
+    index_tricks = [(trump, [card.index for card in trick]) for trump, trick in tricks]
+    code_tricks = [(trump, [(seat, str(card)) for seat, card in enumerate(trick, start=1)]) for trump, trick in tricks]
+    owners = [Player(f"P{idx}", id=idx) for idx in range(1, 5)]
+
+    def run_legacy() -> None:
+        for trump, trick in tricks:
+            legacy_winner(trick, trump)
+
+    def run_tables() -> None:
+        winner = cards.trick_winner
+        for trump, indices in index_tricks:
+            winner(indices, trump)
+
+    def run_table_class() -> None:
+        for trump, trick in tricks:
+            table = Table(trump)
+            table.cards.extend(trick)
+            table.cardOwners.extend(owners)
+            table.firstCard = trick[0]
+            table.clear_and_reset()
+
+    bot = BotBrain(name="Bench", send_fn=lambda _payload: "")
+
+    def run_bot() -> None:
+        for trump, plays in code_tricks:
+            bot.trump = trump
+            bot._current_winning_play(plays)
+
+    print(f"Resolving {args.tricks:,} random tricks")
+    legacy = time_it("legacy closure", args.tricks, run_legacy)
+    tables = time_it("rank tables (indices)", args.tricks, run_tables)
+    time_it("Table.clear_and_reset", args.tricks, run_table_class)
+    time_it("BotBrain winning play", args.tricks, run_bot)
+    print(f"Speed-up of rank tables over legacy: {tables / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
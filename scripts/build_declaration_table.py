@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Build the precomputed declaration table.
+
+Usage:
+    python scripts/build_declaration_table.py [--output server/data/declarations.bin]
+
+Writes one byte for each of the C(32, 8) possible 8-card hands (about 10 MB)
+and checks a random sample of entries against ``cards.highest_declaration``.
+The server memory-maps the file on first use; without it, declarations are
+computed on each call as before.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from server import cards, declarations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the Sjavs declaration lookup table.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=declarations.DEFAULT_TABLE_PATH,
+        help=f"Table file (default: {declarations.DEFAULT_TABLE_PATH})",
+    )
+    parser.add_argument("--check", type=int, default=100_000, help="Random hands to verify (default: 100000)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entries = declarations.write_table(args.output)
+    print(f"Wrote {entries:,} entries to {args.output} in {time.perf_counter() - start:.1f}s")
+
+    table = declarations.DeclarationTable(args.output)
+    rng = random.Random(0)
+    for _ in range(args.check):
+        mask = cards.mask_of(rng.sample(range(len(cards.CARD_CODES)), declarations.HAND_SIZE))
+        if table.lookup(mask) != cards.highest_declaration(mask):
+            raise SystemExit(f"Table disagrees with highest_declaration for {cards.codes_of(mask)}")
+    table.close()
+    print(f"Verified {args.check:,} random hands")
+
+
+if __name__ == "__main__":
+    main()
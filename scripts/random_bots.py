@@ -7,26 +7,20 @@ Usage:
 
 Run this while the server is up, then attach your own client as the
 fourth seat to play alongside the bots.
+
+The bots share a bounded pool of persistent connections (one per bot by
+default, see ``--pool-size``). Pass ``--legacy`` when the server runs with
+``--blocking`` and does not speak the framed protocol.
 """
 
 from __future__ import annotations
 
 import argparse
-import socket
 import time
-from typing import Callable, List
+from typing import List
 
 from server.bot_player import BotBrain, unique_names
-
-
-def make_send_fn(host: str, port: int, timeout: float = 3.0) -> Callable[[str], str]:
-    def send(message: str) -> str:
-        data = message.encode("utf-8")
-        with socket.create_connection((host, port), timeout=timeout) as sock:
-            sock.sendall(data)
-            return sock.recv(4096).decode("utf-8")
-
-    return send
+from server.transport import ConnectionPool
 
 
 def main() -> None:
@@ -35,6 +29,14 @@ def main() -> None:
     parser.add_argument("--port", type=int, default=65432, help="Server port (default: 65432)")
     parser.add_argument("--bots", type=int, default=3, help="Number of bots to launch (default: 3)")
     parser.add_argument("--quiet", action="store_true", help="Reduce logging output.")
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=None,
+        help="Persistent connections shared by the bots (default: one per bot)",
+    )
+    parser.add_argument("--timeout", type=float, default=3.0, help="Socket timeout in seconds (default: 3.0)")
+    parser.add_argument("--legacy", action="store_true", help="Use the unframed protocol (for --blocking servers).")
     args = parser.parse_args()
 
     name_pool = [
@@ -50,7 +52,13 @@ def main() -> None:
     ]
     bot_names = unique_names(args.bots, name_pool)
 
-    send_fn = make_send_fn(args.host, args.port)
+    send_fn = ConnectionPool(
+        args.host,
+        args.port,
+        size=args.pool_size or max(1, args.bots),
+        timeout=args.timeout,
+        legacy=args.legacy,
+    )
     bots: List[BotBrain] = []
 
     for name in bot_names:
@@ -71,6 +79,7 @@ def main() -> None:
             bot.stop()
         for bot in bots:
             bot.join(timeout=1.0)
+        send_fn.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Play full Sjavs rubbers headlessly and report throughput.
+
+Usage:
+    python scripts/simulate.py --rubbers 1000 --seats hard medium hard medium
+
+Runs ``server.simulation.HeadlessTable`` in the current process (no server,
+threads or sockets) and prints rubbers/sec and deals/sec alongside the
+rubber results for each partnership.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections import Counter
+
+from server.bot_player import DIFFICULTY_STRATEGIES
+from server.simulation import HeadlessTable
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate Sjavs rubbers between bot difficulties.")
+    parser.add_argument("--rubbers", type=int, default=200, help="Rubbers to play (default: 200)")
+    parser.add_argument(
+        "--seats",
+        nargs=4,
+        default=["medium"] * 4,
+        choices=sorted(DIFFICULTY_STRATEGIES),
+        metavar="LEVEL",
+        help="Difficulty for seats 1-4 (default: medium x4)",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible runs.")
+    args = parser.parse_args()
+
+    table = HeadlessTable(args.seats, seed=args.seed)
+    winners: Counter = Counter()
+    deals = rounds = 0
+
+    start = time.perf_counter()
+    for _ in range(args.rubbers):
+        result = table.play_rubber()
+        winners[result.winner or "unfinished"] += 1
+        deals += len(result.deals)
+        rounds += result.rounds
+    elapsed = time.perf_counter() - start
+
+    print(f"Seats: Vit={args.seats[0]}/{args.seats[2]}  Tit={args.seats[1]}/{args.seats[3]}")
+    print(f"Rubbers won: Vit={winners['Vit']}  Tit={winners['Tit']}  unfinished={winners['unfinished']}")
+    print(f"Played {args.rubbers} rubbers ({deals} deals, {rounds} played out) in {elapsed:.2f}s")
+    print(f"Throughput: {args.rubbers / elapsed:,.1f} rubbers/s, {deals / elapsed:,.1f} deals/s")
+
+
+if __name__ == "__main__":
+    main()
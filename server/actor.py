@@ -0,0 +1,181 @@
+"""
+Single-writer actors for games.
+
+A ``GameActor`` owns one ``Game``. Everything that changes the game (player
+commands, bot commands, heartbeats) is posted to the actor's mailbox and
+runs there, one message at a time, in order. Readers never touch the game:
+after any message that moves ``Game.state_version`` the actor publishes a
+fresh snapshot, built by a caller-supplied function, and readers take
+whatever snapshot is current without locking. The snapshot is published
+before the message's future resolves, so a client always reads its own
+writes.
+
+Actors do not own threads. A mailbox with work is run on a process-wide
+``ActorExecutor`` with a fixed pool of threads (in the spirit of
+``server.bot_scheduler``). A busy actor yields its thread after
+``MAX_BATCH`` messages. So one slow table delays only its own
+commands, however many tables are open.
+
+A message that posts to its own actor, such as a bot joining from inside a
+``bots`` command, runs inline instead of waiting on itself.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Generic, Optional, Tuple, TypeVar
+
+DEFAULT_WORKERS = 8
+# Messages an actor handles before giving its worker thread to the next one.
+MAX_BATCH = 32
+
+Snapshot = TypeVar("Snapshot")
+
+
+class ActorClosed(RuntimeError):
+    """Raised for messages sent to an actor after ``close``."""
+
+
+class ActorExecutor:
+    """Fixed pool of threads shared by every actor in the process."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS) -> None:
+        if workers < 1:
+            raise ValueError("An actor executor needs at least one worker.")
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="game-actor")
+
+    def schedule(self, run: Callable[[], None]) -> None:
+        self._pool.submit(run)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+class GameActor(Generic[Snapshot]):
+    def __init__(
+        self,
+        game,
+        publish: Callable[[Any, Optional[Snapshot]], Snapshot],
+        executor: Optional[ActorExecutor] = None,
+    ) -> None:
+        """``publish(game, previous)`` builds a snapshot; it runs on the actor."""
+        self.game = game
+        self._publish = publish
+        self._executor = executor or default_executor()
+        self._lock = threading.Lock()
+        self._mailbox: Deque[Tuple[Callable[..., Any], tuple, Future]] = deque()
+        self._scheduled = False  # handed to the executor or running
+        self._runner: Optional[int] = None  # thread id while running
+        self._closed = False
+        self._published_version = game.state_version
+        self.messages = 0  # handled so far, for metrics
+        self.snapshot: Snapshot = publish(game, None)
+
+    # ------------- sending -------------
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run ``fn(game, *args)`` on the actor; the future holds its result."""
+        future: Future = Future()
+        if self._runner == threading.get_ident():
+            self._handle(fn, args, future)
+            return future
+        with self._lock:
+            if self._closed:
+                future.set_exception(ActorClosed("The game is closed."))
+                return future
+            self._mailbox.append((fn, args, future))
+            if self._scheduled:
+                return future
+            self._scheduled = True
+        self._executor.schedule(self._run)
+        return future
+
+    def call(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """``submit`` and wait for the result (re-raising what ``fn`` raised)."""
+        return self.submit(fn, *args).result(timeout)
+
+    def command(self, text: str) -> str:
+        """A raw protocol command, e.g. ``"P2 M 5"``; usable as a bot's ``send_fn``."""
+        return self.call(_process_command, text)
+
+    def close(self) -> None:
+        """Refuse further messages; those already queued still run."""
+        with self._lock:
+            self._closed = True
+
+    def close_if_idle(self) -> bool:
+        """``close`` unless messages are waiting; from a message, those queued behind it."""
+        with self._lock:
+            if self._mailbox:
+                return False
+            self._closed = True
+            return True
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._mailbox)
+
+    # ------------- running -------------
+    def _run(self) -> None:
+        self._runner = threading.get_ident()
+        try:
+            for _ in range(MAX_BATCH):
+                with self._lock:
+                    if not self._mailbox:
+                        self._scheduled = False
+                        return
+                    fn, args, future = self._mailbox.popleft()
+                self._handle(fn, args, future)
+        finally:
+            self._runner = None
+        with self._lock:
+            if not self._mailbox:
+                self._scheduled = False
+                return
+        self._executor.schedule(self._run)  # more work: go to the back of the pool's queue
+
+    def _handle(self, fn: Callable[..., Any], args: tuple, future: Future) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        self.messages += 1
+        try:
+            result = fn(self.game, *args)
+        except BaseException as exc:  # noqa: BLE001 - handed to the caller
+            self._republish()
+            future.set_exception(exc)
+            return
+        try:
+            self._republish()
+        except BaseException as exc:  # noqa: BLE001
+            future.set_exception(exc)
+            return
+        future.set_result(result)
+
+    def _republish(self) -> None:
+        version = self.game.state_version
+        if version != self._published_version:
+            self.snapshot = self._publish(self.game, self.snapshot)
+            self._published_version = version
+
+
+def _process_command(game, text: str) -> str:
+    return game.process_command(text)
+
+
+_default_executor: Optional[ActorExecutor] = None
+_default_lock = threading.Lock()
+
+
+def default_executor() -> ActorExecutor:
+    """The process-wide executor shared by every ``GameActor``."""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = ActorExecutor()
+        return _default_executor
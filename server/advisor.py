@@ -0,0 +1,237 @@
+"""
+Expected-value advice for the declaration phase.
+
+``maxmeld`` only says how long a declaration a hand *may* make. Whether
+declaring pays depends on whether the declaring side then takes 61 or more
+card points, and on how many rubber points ride on the result. The advisor
+estimates that by rolling the round out: the other 24 cards are dealt at
+random to the three other seats, all four seats play with the "hard"
+heuristics, and each finished round is scored with ``game.score_round`` from
+the declaring side's point of view (+points taken off its own 24, -points the
+defenders take off theirs, 0 for a 60-60 draw).
+
+Passing is the baseline at 0: the deal is either redealt or played by someone
+else, which the advisor does not try to value. The length declared only
+decides the auction, not the play, so every legal length up to ``maxmeld``
+has the value of the best suit the hand could then name.
+
+Values are cached per suit under a canonical form of the hand. Side suits of
+the same build (clubs and spades have six plain cards, hearts and diamonds
+seven) can be swapped without changing the play, so e.g. a hand and its
+mirror with hearts and diamonds exchanged share one entry, and the
+random rollouts are seeded from the key so a cached value is reproducible.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from . import cards, declarations
+from .game import score_round
+
+DEFAULT_ROLLOUTS = 32
+CACHE_SIZE = 4096
+MIN_DECLARATION = 5
+PASS_VALUE = 0.0
+SEATS = (1, 2, 3, 4)
+# The advised hand sits in seat 1 and declares; seat 3 is its partner.
+DECLARER = 1
+DECLARERS = (1, 3)
+
+
+def canonical_key(hand_mask: int, trump: str) -> Hashable:
+    """Cache key shared by every hand that plays the same with ``trump``."""
+    trump = trump.upper()
+    shift = 8 * cards.SUITS.index(trump)
+    sides = sorted(
+        (suit in "CS", (hand_mask & cards.PLAIN_SUIT_MASKS[suit]) >> (8 * position))
+        for position, suit in enumerate(cards.SUITS)
+        if suit != trump
+    )
+    return (
+        trump == "C",  # clubs doubles most scores
+        trump in "CS",
+        hand_mask & cards.PERMANENT_TRUMP_MASK,
+        (hand_mask & cards.PLAIN_SUIT_MASKS[trump]) >> shift,
+        tuple(sides),
+    )
+
+
+@dataclass(frozen=True)
+class Advice:
+    """The advisor's view of one hand."""
+
+    length: int  # longest declaration the hand may make, 0 below five
+    suit_values: Dict[str, float]  # expected rubber points for each suit it may name
+
+    @property
+    def suit(self) -> Optional[str]:
+        """The suit to name after winning the declaration (clubs on ties)."""
+        if not self.suit_values:
+            return None
+        return max(self.suit_values, key=lambda suit: (self.suit_values[suit], suit == "C"))
+
+    @property
+    def value(self) -> float:
+        """Expected rubber points of declaring, or ``PASS_VALUE`` if the hand cannot."""
+        suit = self.suit
+        return self.suit_values[suit] if suit is not None else PASS_VALUE
+
+    @property
+    def declaration(self) -> int:
+        """The length to declare, or 0 to pass."""
+        return self.length if self.suit is not None and self.value > PASS_VALUE else 0
+
+    def values(self) -> Dict[int, float]:
+        """Expected rubber points for each legal declaration, 0 meaning pass."""
+        values = {0: PASS_VALUE}
+        for length in range(MIN_DECLARATION, self.length + 1):
+            values[length] = self.value
+        return values
+
+    def describe(self) -> str:
+        if self.suit is None:
+            return "Hint: pass (M 0); the hand has no declaration."
+        estimates = ", ".join(f"{suit} {value:+.1f}" for suit, value in sorted(self.suit_values.items()))
+        if self.declaration:
+            advice = f"declare {self.length} (M {self.length}) and name {self.suit}"
+        else:
+            advice = "pass (M 0)"
+        return f"Hint: {advice}. Expected rubber points if you declare: {estimates}; passing: {PASS_VALUE:+.1f}."
+
+
+class DeclarationAdvisor:
+    """Rollout-based declaration values with a bounded per-suit cache."""
+
+    def __init__(self, rollouts: int = DEFAULT_ROLLOUTS, cache_size: int = CACHE_SIZE) -> None:
+        self.rollouts = rollouts
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def advise(self, hand: Sequence[str]) -> Advice:
+        mask = cards.mask_from_codes(hand)
+        summary = declarations.lookup(mask)
+        digits = "".join(ch for ch in summary if ch.isdigit())
+        length = int(digits) if digits else 0
+        if length < MIN_DECLARATION:
+            return Advice(length=0, suit_values={})
+        suits = [ch for ch in summary if ch.isalpha()]
+        return Advice(length=length, suit_values={suit: self.suit_value(mask, suit) for suit in suits})
+
+    def suit_value(self, hand_mask: int, trump: str) -> float:
+        """Expected rubber points for declaring with ``hand_mask`` and naming ``trump``."""
+        key = canonical_key(hand_mask, trump)
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        # Rolled out without the lock; two threads may race on one key, and
+        # both arrive at the same value because the rollouts are seeded by it.
+        value = rollout_value(hand_mask, trump, self.rollouts, random.Random(repr(key)))
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+
+def rollout_value(hand_mask: int, trump: str, rollouts: int, rng: random.Random) -> float:
+    """Average rubber points for the declaring side over ``rollouts`` random deals."""
+    bots = _rollout_bots(rng)
+    rest = list(cards.iter_mask(cards.FULL_MASK & ~hand_mask))
+    total = 0
+    for _ in range(rollouts):
+        rng.shuffle(rest)
+        hands = {
+            1: hand_mask,
+            2: cards.mask_of(rest[0:8]),
+            3: cards.mask_of(rest[8:16]),
+            4: cards.mask_of(rest[16:24]),
+        }
+        total += score_rollout(*play_out(hands, trump, rng.choice(SEATS), bots), trump)
+    return total / rollouts
+
+
+def score_rollout(points: Dict[int, int], trick_winners: List[int], trump: str) -> int:
+    declarer_points = sum(points[seat] for seat in DECLARERS)
+    if declarer_points == 60:
+        return 0
+    sweep = len(set(trick_winners)) == 1 and trick_winners[0] in DECLARERS
+    declarers_win, base, _ = score_round(declarer_points, trump == "C", sweep)
+    return base if declarers_win else -base
+
+
+def play_out(hands: Dict[int, int], trump: str, leader: int, bots) -> Tuple[Dict[int, int], List[int]]:
+    """Play eight tricks from ``hands`` (seat -> mask); card points per seat and trick winners."""
+    masks = dict(hands)
+    for seat, bot in bots.items():
+        bot.on_redeal()
+        bot.hand = cards.codes_of(masks[seat])
+        bot.trump = trump
+        bot.declarer = DECLARER
+    points = {seat: 0 for seat in SEATS}
+    winners: List[int] = []
+    for _ in range(8):
+        indices: List[int] = []
+        owners: List[int] = []
+        seat = leader
+        for _ in range(4):
+            lead = indices[0] if indices else None
+            card = bots[seat]._choose_card(cards.codes_of(cards.legal_mask(masks[seat], lead, trump)))
+            index = cards.CARD_INDEX[card]
+            masks[seat] &= ~(1 << index)
+            for bot in bots.values():
+                bot.on_card_played(seat, card)
+            indices.append(index)
+            owners.append(seat)
+            seat = seat % 4 + 1
+        leader = owners[cards.trick_winner(indices, trump)]
+        points[leader] += sum(cards.CARD_POINTS[index] for index in indices)
+        winners.append(leader)
+        for bot in bots.values():
+            bot.on_trick_won(leader)
+    return points, winners
+
+
+def _rollout_bots(rng: random.Random):
+    from .bot_player import BotBrain, HARD_STRATEGIES  # bot_player imports this module
+
+    bots = {}
+    for seat in SEATS:
+        bot = BotBrain(
+            name=f"Rollout{seat}",
+            send_fn=_no_transport,
+            strategy_names=HARD_STRATEGIES,
+            rng=rng,
+        )
+        bot.player_id = seat
+        bots[seat] = bot
+    return bots
+
+
+def _no_transport(_payload: str) -> str:
+    raise RuntimeError("Rollout bots do not use a command transport.")
+
+
+_default_advisor = DeclarationAdvisor()
+
+
+def advise(hand: Sequence[str]) -> Advice:
+    """Advice for ``hand`` (card codes) through the shared advisor and its cache."""
+    return _default_advisor.advise(hand)
@@ -1,15 +1,31 @@
+import argparse
+import asyncio
+import signal
 import socket
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, current_thread, main_thread
 
 try:  # pragma: no cover - fallback for direct script execution
     from .game import Game
     from .bot_manager import BotManager
+    from .protocol import (
+        HANDSHAKE_PREFIX, MAX_HANDSHAKE_SIZE, FrameBuffer, ProtocolError,
+        encode_frame, handshake_reply, parse_handshake,
+    )
 except ImportError:  # pragma: no cover
     from game import Game  # type: ignore
     from bot_manager import BotManager  # type: ignore
+    from protocol import (  # type: ignore
+        HANDSHAKE_PREFIX, MAX_HANDSHAKE_SIZE, FrameBuffer, ProtocolError,
+        encode_frame, handshake_reply, parse_handshake,
+    )
 
 HOST = "127.0.0.1"  # Standard loopback interface address (localhost)
 PORT = 65432  # Port to listen on (non-privileged ports are > 1023)
+MAX_CONNECTIONS = 4096  # Concurrent clients the asyncio server accepts
+READ_SIZE = 1024  # One recv per command, as legacy clients expect
+FRAMED_READ_SIZE = 65536  # Framed connections may pipeline many commands per read
+BUSY_REPLY = "Server busy."
 
 
 def client_thread(conn, addr, game):
@@ -34,17 +50,11 @@ def client_thread(conn, addr, game):
         conn.close()
 
 
-def start_server(host='127.0.0.1', port=65432, game_instance=None, bot_manager=None):
+def _resolve_game(game_instance=None, bot_manager=None):
     """
-    Initialize the server, bind it to a host and port, and listen for incoming connections.
+    Return ``(game, bot_manager, created_bot_manager)``, creating whatever the
+    caller did not supply.
     """
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    server_socket.bind((host, port))
-    server_socket.listen()
-
-    print(f"Server started on {host}:{port} waiting for connections...")
-
     created_bot_manager = False
 
     if game_instance is None:
@@ -63,6 +73,22 @@ def start_server(host='127.0.0.1', port=65432, game_instance=None, bot_manager=N
                 bot_manager = game.bot_manager
         else:
             game.attach_bot_manager(bot_manager)
+    return game, bot_manager, created_bot_manager
+
+
+def start_server(host='127.0.0.1', port=65432, game_instance=None, bot_manager=None):
+    """
+    Initialize the blocking server (one thread per connection), bind it to a
+    host and port, and listen for incoming connections.
+    """
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_socket.bind((host, port))
+    server_socket.listen()
+
+    print(f"Server started on {host}:{port} waiting for connections...")
+
+    game, bot_manager, created_bot_manager = _resolve_game(game_instance, bot_manager)
 
     try:
         while True:
@@ -77,5 +103,232 @@ def start_server(host='127.0.0.1', port=65432, game_instance=None, bot_manager=N
         server_socket.close()
 
 
+
+class AsyncGameServer:
+    """
+    Single event loop listener for the TCP protocol.
+
+    Every connection is a coroutine rather than a thread. Commands are handed
+    to one command thread per server and run there in arrival order, so a
+    command waiting on ``Game.command_lock`` (held by a bot thread, say) or a
+    slow one (``hint``) never stalls the loop, which keeps reading and writing
+    for every other connection. Connections beyond ``max_connections`` get
+    ``BUSY_REPLY`` and are closed.
+
+    A connection whose first bytes are a ``SJAVS/1`` handshake switches to the
+    framed protocol in ``server.protocol``; anything else is served as legacy
+    one-recv-per-command traffic.
+    """
+
+    def __init__(self, game, host=HOST, port=PORT, max_connections=MAX_CONNECTIONS):
+        self.game = game
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.rejected = 0
+        self._server = None
+        self._handlers = set()
+        self._busy = set()  # handlers still sending a reply
+        self._closing = False
+        # One thread: commands reach the game in the order they were read.
+        self._commands = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tcp-commands")
+
+    @property
+    def connections(self):
+        return len(self._handlers)
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server else ()
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, reuse_address=True, backlog=1024,
+        )
+        print(f"Async server started on {self.host}:{self.port} waiting for connections...")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def shutdown(self, timeout=5.0):
+        """
+        Stop accepting, let every connection finish sending its current reply,
+        then close the remaining sockets.
+        """
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+        handlers = list(self._handlers)
+        for task in handlers:
+            if task not in self._busy:
+                task.cancel()
+        if handlers:
+            _, pending = await asyncio.wait(handlers, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        if self._server is not None:
+            await self._server.wait_closed()
+        self._commands.shutdown(wait=False)
+
+    async def _run_commands(self, texts):
+        """Run ``texts`` on the game, in order, off the loop; returns the replies."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._commands, lambda: [self.game.process_command(text) or "" for text in texts],
+        )
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        if self._closing or len(self._handlers) >= self.max_connections:
+            self.rejected += 1
+            await self._close(writer, BUSY_REPLY)
+            return
+        self._handlers.add(task)
+        try:
+            await self._serve_connection(reader, writer)
+        except asyncio.CancelledError:
+            pass  # shutdown while idle, waiting for the next command
+        except (ConnectionError, OSError, ProtocolError, UnicodeDecodeError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            await self._close(writer)
+
+    async def _serve_connection(self, reader, writer):
+        task = asyncio.current_task()
+        data = await reader.read(READ_SIZE)
+        if data.startswith(HANDSHAKE_PREFIX):
+            await self._serve_framed(reader, writer, data)
+            return
+        while data:
+            # A shutdown leaves busy handlers alone until their reply is sent.
+            self._busy.add(task)
+            try:
+                [response] = await self._run_commands([data.decode()])
+                writer.write(response.encode())
+                await writer.drain()
+            finally:
+                self._busy.discard(task)
+            if self._closing:
+                return
+            data = await reader.read(READ_SIZE)
+
+    async def _serve_framed(self, reader, writer, data):
+        task = asyncio.current_task()
+        while b"\n" not in data:
+            if len(data) > MAX_HANDSHAKE_SIZE:
+                raise ProtocolError("Handshake line too long.")
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                return
+            data += chunk
+        line, _, rest = data.partition(b"\n")
+        command = parse_handshake(line.decode())
+        if command is None:
+            raise ProtocolError(f"Unsupported handshake: {line[:64]!r}")
+        reply = (await self._run_commands([command]))[0] if command else "OK"
+        writer.write(handshake_reply(reply))
+
+        frames = FrameBuffer(rest)
+        while True:
+            self._busy.add(task)
+            try:
+                # Answer every complete frame already received in one trip to
+                # the command thread, then flush once.
+                batch = []
+                frame = frames.next_frame()
+                while frame is not None:
+                    batch.append(frame)
+                    frame = frames.next_frame()
+                if batch:
+                    replies = await self._run_commands([text for _, text in batch])
+                    for (request_id, _), reply in zip(batch, replies):
+                        writer.write(encode_frame(request_id, reply))
+                await writer.drain()
+            finally:
+                self._busy.discard(task)
+            if self._closing:
+                return
+            chunk = await reader.read(FRAMED_READ_SIZE)
+            if not chunk:
+                return
+            frames.feed(chunk)
+
+    @staticmethod
+    async def _close(writer, message=None):
+        try:
+            if message:
+                writer.write(message.encode())
+                await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+def start_async_server(
+    host=HOST,
+    port=PORT,
+    game_instance=None,
+    bot_manager=None,
+    max_connections=MAX_CONNECTIONS,
+):
+    """
+    Run ``AsyncGameServer`` until interrupted. SIGINT/SIGTERM trigger a graceful
+    shutdown when called from the main thread.
+    """
+    game, bot_manager, created_bot_manager = _resolve_game(game_instance, bot_manager)
+
+    async def run():
+        server = AsyncGameServer(game, host, port, max_connections)
+        await server.start()
+        serving = asyncio.ensure_future(server.serve_forever())
+        if current_thread() is main_thread():
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, serving.cancel)
+                except (NotImplementedError, RuntimeError):  # pragma: no cover - Windows
+                    pass
+        try:
+            await serving
+        finally:
+            await server.shutdown()
+
+    try:
+        asyncio.run(run())
+    finally:
+        if created_bot_manager and bot_manager is not None:
+            bot_manager.stop_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Sjavs TCP server.")
+    parser.add_argument("--host", default=HOST, help=f"Interface to bind (default: {HOST})")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Port to listen on (default: {PORT})")
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=MAX_CONNECTIONS,
+        help=f"Concurrent clients for the asyncio server (default: {MAX_CONNECTIONS})",
+    )
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="Use the original thread-per-connection server instead of asyncio.",
+    )
+    args = parser.parse_args()
+
+    if args.blocking:
+        start_server(args.host, args.port)
+    else:
+        start_async_server(args.host, args.port, max_connections=args.max_connections)
+
+
 if __name__ == '__main__':
-    start_server(HOST, PORT)
+    main()
@@ -2,17 +2,44 @@ from __future__ import annotations
 
 import random
 import threading
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
 
 from .bot_player import BotBrain, DIFFICULTY_STRATEGIES
+from .bot_scheduler import BotMailbox, BotScheduler, default_scheduler
+from .events import GameEvent
 
 
 class BotManager:
-    def __init__(self, game, verbose: bool = False) -> None:
+    """
+    Seats in-process bots at a game and drives them from the game's typed
+    events (``server.events``): every event for a bot's seat is posted to that
+    bot's mailbox on the shared ``BotScheduler``, which hands it over
+    ``think_delay`` seconds later on one of its fixed worker threads. Bots do
+    not poll and a table owns no threads, so ``stop_all`` only has to
+    deregister. Expert searches run on ``expert.search_threads`` and come back
+    through the same mailbox.
+    """
+
+    def __init__(
+        self,
+        game,
+        verbose: bool = False,
+        think_delay: float = 0.0,
+        scheduler: Optional[BotScheduler] = None,
+        send_fn: Optional[Callable[[str], str]] = None,
+    ) -> None:
         self.game = game
+        # How bots send commands (default: straight to the game); a web lobby
+        # routes them through its actor.
+        self.send_fn = send_fn
         self.verbose = verbose
+        self.think_delay = think_delay
+        self.scheduler = scheduler or default_scheduler()
         self._lock = threading.Lock()
         self._bots: List[BotBrain] = []
+        # Read by the update listener without taking ``_lock``; replaced, never mutated.
+        self._seated: Tuple[BotMailbox, ...] = ()
+        self._remove_listener: Optional[Callable[[], None]] = None
         self._name_pool = [
             "AnnaBot",
             "BergBot",
@@ -58,16 +85,20 @@ class BotManager:
                 )
                 bot = BotBrain(
                     name=name,
-                    send_fn=self.game.process_command,
-                    poll_interval=0.2,
+                    send_fn=self.send_fn or self.game.process_command,
                     verbose=self.verbose,
                     difficulty=bot_difficulty,
                     strategy_names=DIFFICULTY_STRATEGIES[bot_difficulty],
                 )
-                if bot.start():
+                if bot.start(poll=False):
+                    self.game.seat_bot(bot.player_id, bot_difficulty)
                     self._bots.append(bot)
+                    mailbox = self.scheduler.register(bot, self.think_delay)
+                    bot.post_event = mailbox.post
+                    self._seated = self._seated + (mailbox,)
+                    if self._remove_listener is None:
+                        self._remove_listener = self.game.events.add_listener(self._on_event)
                     added += 1
-                    self.game.broadcast_players(f"{name} has joined the table.")
                 else:
                     self._log(f"Failed to start bot {name}")
 
@@ -75,13 +106,66 @@ class BotManager:
                 return "Unable to add bots."
             return f"{added} bot(s) joined the table."
 
+    def bot_states(self) -> List[dict]:
+        """Every seated bot's ``export_state``, for a snapshot of the table."""
+        with self._lock:
+            return [bot.export_state() for bot in self._bots]
+
+    def restore_bots(self, states: List[dict]) -> int:
+        """
+        Re-seat bots saved with ``bot_states`` on a restored game, at their old
+        seats and without a ``Hallo``. A bot whose turn it is gets the pending
+        prompt again.
+        """
+        with self._lock:
+            prompt = self.game.pending_prompt()
+            for state in states:
+                player = self.game.players.get(state["player_id"])
+                if player is None:
+                    continue
+                bot = BotBrain(
+                    name=state["name"],
+                    send_fn=self.send_fn or self.game.process_command,
+                    verbose=self.verbose,
+                    difficulty=state["difficulty"],
+                    strategy_names=state["strategies"],
+                )
+                bot.restore_state(state, [str(card) for card in player.hand])
+                player.in_process = True
+                self.game.bot_seats[player] = state["difficulty"]
+                self._bots.append(bot)
+                mailbox = self.scheduler.register(bot, self.think_delay)
+                bot.post_event = mailbox.post
+                self._seated = self._seated + (mailbox,)
+                if prompt is not None and prompt.visible_to(bot.player_id):
+                    mailbox.post(prompt)
+            if self._bots and self._remove_listener is None:
+                self._remove_listener = self.game.events.add_listener(self._on_event)
+            return len(self._bots)
+
     def stop_all(self) -> None:
         with self._lock:
+            if self._remove_listener is not None:
+                self._remove_listener()
+                self._remove_listener = None
+            for mailbox in self._seated:
+                mailbox.close()
             for bot in self._bots:
                 bot.stop()
-            for bot in self._bots:
-                bot.join(timeout=1.0)
             self._bots.clear()
+            self._seated = ()
+
+    def remap(self, seat_map: dict[int, int]) -> None:
+        """Follow seat renumbering after a player leaves."""
+        with self._lock:
+            for bot in self._bots:
+                if bot.player_id in seat_map:
+                    bot.player_id = seat_map[bot.player_id]
+
+    def _on_event(self, event: GameEvent) -> None:
+        for mailbox in self._seated:
+            if event.visible_to(mailbox.bot.player_id):
+                mailbox.post(event)
 
     def _generate_names(
         self,
@@ -4,11 +4,45 @@ import random
 import threading
 import time
 from collections import Counter
-from typing import Callable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from . import advisor, declarations, endgame, expert
+from .cards import CARD_INDEX, TRICK_RANKS, mask_from_codes
+from .solver import Deal
+from .tracking import CardTracker
+from .events import (
+    CardPlayed,
+    DeclarationRequested,
+    GameEvent,
+    HandDealt,
+    Redeal,
+    RoundFinished,
+    SplitRequested,
+    SuitRequested,
+    TrickWon,
+    TrumpSet,
+    TurnToPlay,
+)
 
 PERMANENT_TRUMPS = ("QC", "QS", "JC", "JS", "JH", "JD")
 SUITS = ("C", "D", "H", "S")
 CARD_POINTS = {"A": 11, "T": 10, "K": 4, "Q": 3, "J": 2}
+HARD_STRATEGIES = [
+    "dont_overtake_partner",
+    "partner_points_dump",
+    "stinga_low_trump",
+    "save_high_trumps",
+    "safe_last_player_capture",
+    "win_cheap_trick",
+    "lead_unseen_ace",
+    "follow_with_strength_when_long",
+    "protect_ace_leads",
+    "preserve_entry",
+    "discard_dead_suit",
+    "bleed_trump_late",
+    "discard_filler_when_losing",
+]
 DIFFICULTY_STRATEGIES = {
     "easy": ["discard_filler_when_losing"],
     "medium": [
@@ -19,22 +53,24 @@ DIFFICULTY_STRATEGIES = {
         "discard_dead_suit",
         "discard_filler_when_losing",
     ],
-    "hard": [
-        "dont_overtake_partner",
-        "partner_points_dump",
-        "stinga_low_trump",
-        "save_high_trumps",
-        "safe_last_player_capture",
-        "win_cheap_trick",
-        "lead_unseen_ace",
-        "follow_with_strength_when_long",
-        "protect_ace_leads",
-        "preserve_entry",
-        "discard_dead_suit",
-        "bleed_trump_late",
-        "discard_filler_when_losing",
-    ],
+    "hard": HARD_STRATEGIES,
+    # Sampled double-dummy search late in the round, "hard" play before that;
+    # exact play from the endgame table once the other hands are known.
+    "expert": ["endgame_table", "determinized_search", *HARD_STRATEGIES],
 }
+# Difficulties that ask ``server.advisor`` whether a declaration pays.
+ADVISED_DIFFICULTIES = ("hard", "expert")
+# Returned by the "determinized_search" strategy when the search went to
+# ``expert.search_threads``; the card is played when ``SearchFinished`` arrives.
+SEARCHING = "searching"
+
+
+@dataclass(frozen=True)
+class SearchFinished:
+    """A background search's answer, posted back to the bot that started it."""
+
+    view: expert.SearchView  # the position it was run for
+    card: Optional[str]  # None if no sample was solved in time
 
 
 class BotBrain:
@@ -51,6 +87,10 @@ class BotBrain:
         verbose: bool = False,
         difficulty: str = "medium",
         strategy_names: Optional[Sequence[str]] = None,
+        rng: Optional[random.Random] = None,
+        move_budget: float = expert.DEFAULT_MOVE_BUDGET,
+        search_samples: int = expert.DEFAULT_SAMPLES,
+        advise_declarations: Optional[bool] = None,
     ) -> None:
         self.name = name
         self._send_fn = send_fn
@@ -64,33 +104,67 @@ class BotBrain:
         )
 
         self.player_id: Optional[int] = None
-        self.trump: Optional[str] = None
+        # What has been played, by whom, and who has shown out of what.
+        self.knowledge = CardTracker()
+        self.trump = None
         self.hand: List[str] = []
         self.current_trick: List[Tuple[int, str]] = []
         self.trick_winners: List[int] = []
         self.seen_suits_played: set[str] = set()
         self.seen_cards_played: List[str] = []
+        self.declarer: Optional[int] = None
         self.last_declared_suits: str = ""
+        self.advised_suit: Optional[str] = None
         self.deal_choice_needed = True
+        # Module-level ``random`` unless a seeded generator is supplied (simulations).
+        self._rng = rng if rng is not None else random
+        # Seconds and sampled deals per card for the "determinized_search" strategy.
+        self.move_budget = move_budget
+        self.search_samples = search_samples
+        # Declare only when rollouts expect a profit, instead of whenever allowed.
+        self.advise_declarations = (
+            difficulty in ADVISED_DIFFICULTIES if advise_declarations is None else advise_declarations
+        )
 
         self._stop_event = threading.Event()
-        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread: Optional[threading.Thread] = None  # only polling bots have one
+        # Set by ``BotManager`` to the bot's mailbox: searches then run on
+        # ``expert.search_threads`` and post ``SearchFinished`` back, instead of
+        # holding a scheduler worker for the move budget.
+        self.post_event: Optional[Callable[[Any], None]] = None
+        # A finished search's answer while ``_play_card`` replays the strategies.
+        self._searched: Optional[SearchFinished] = None
 
     # ------------- lifecycle -------------
-    def start(self) -> bool:
+    def start(self, poll: bool = True) -> bool:
+        """
+        Take a seat and, with ``poll``, start the thread that polls ``GU``.
+        Event-driven bots pass ``poll=False`` and are fed through ``handle_event``.
+        """
         if not self._join_table():
             return False
-        self._thread.start()
+        if poll:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
         return True
 
     def stop(self) -> None:
         self._stop_event.set()
 
     def join(self, timeout: Optional[float] = None) -> None:
-        self._thread.join(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
 
     def is_alive(self) -> bool:
-        return self._thread.is_alive()
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def trump(self) -> Optional[str]:
+        return self.knowledge.trump
+
+    @trump.setter
+    def trump(self, suit: Optional[str]) -> None:
+        self.knowledge.set_trump(suit)
 
     # ------------- transport helpers -------------
     def _log(self, message: str) -> None:
@@ -133,13 +207,50 @@ class BotBrain:
                 time.sleep(self.poll_interval)
                 continue
 
-            self._log(f"<< {text}")
-            lines = [line.strip() for line in text.splitlines() if line.strip()]
-            for line in lines:
-                self._handle_update(line)
-
+            self.handle_updates(text)
             time.sleep(self.poll_interval)
 
+    def handle_updates(self, text: str) -> None:
+        """React to one or more update lines addressed to this bot's seat."""
+        if self._stop_event.is_set():
+            return
+        self._log(f"<< {text}")
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        for line in lines:
+            self._handle_update(line)
+
+    def handle_event(self, event: GameEvent) -> None:
+        """
+        React to one typed game event (in-process bots). The hand arrives with
+        ``HandDealt``, so no ``show`` or ``maxmeld`` round-trips are needed.
+        """
+        if self._stop_event.is_set():
+            return
+        self._log(f"<< {event}")
+        if isinstance(event, CardPlayed):
+            self.on_card_played(event.player_id, event.card)
+        elif isinstance(event, TrickWon):
+            self.on_trick_won(event.winner)
+        elif isinstance(event, RoundFinished):
+            self.on_round_finished()
+        elif isinstance(event, Redeal):
+            self.on_redeal()
+        elif isinstance(event, TrumpSet):
+            self.trump = event.suit
+            self.declarer = event.declarer
+        elif isinstance(event, HandDealt):
+            self.hand = list(event.cards)
+        elif isinstance(event, SplitRequested):
+            self._handle_split_choice()
+        elif isinstance(event, DeclarationRequested):
+            self._handle_declaration(declarations.lookup(mask_from_codes(self.hand)))
+        elif isinstance(event, SuitRequested):
+            self._handle_suit_choice()
+        elif isinstance(event, TurnToPlay):
+            self._play_card()
+        elif isinstance(event, SearchFinished):
+            self._play_card(event)
+
     # ------------- update handlers -------------
     def _handle_update(self, line: str) -> None:
         self._log(f"< {line}")
@@ -150,32 +261,20 @@ class BotBrain:
 
         lower_line = line.lower()
         if " vann" in lower_line:
-            self.current_trick.clear()
             try:
                 winner_id = int(line.split()[1])
-                self.trick_winners.append(winner_id)
             except (ValueError, IndexError):
-                pass
+                self.current_trick.clear()
+                return
+            self.on_trick_won(winner_id)
             return
 
         if line.startswith("Round totals"):
-            self.hand.clear()
-            self.current_trick.clear()
-            self.trick_winners.clear()
-            self.seen_suits_played.clear()
-            self.seen_cards_played.clear()
-            self.trump = None
-            self.deal_choice_needed = True
+            self.on_round_finished()
             return
 
         if "No player declared trump. Redealing." in line:
-            self.hand.clear()
-            self.current_trick.clear()
-            self.seen_suits_played.clear()
-            self.seen_cards_played.clear()
-            self.trump = None
-            self.last_declared_suits = ""
-            self.deal_choice_needed = True
+            self.on_redeal()
             return
 
         if line.startswith("The current trump is"):
@@ -209,23 +308,121 @@ class BotBrain:
             self.current_trick.clear()
             return
 
+    # ------------- observations -------------
+    # Called by the text parser above, and directly by transport-free drivers
+    # such as ``server.simulation``.
+    def on_card_played(self, player_id: int, card: str) -> None:
+        # The bot records its own play as soon as the server accepts it.
+        if (player_id, card) not in self.current_trick:
+            self.current_trick.append((player_id, card))
+        if len(card) >= 2:
+            self.seen_suits_played.add(card[1])
+            self.seen_cards_played.append(card)
+            self.knowledge.record(player_id, card)
+        if player_id == self.player_id and card in self.hand:
+            self.hand.remove(card)
+
+    def on_trick_won(self, winner_id: int) -> None:
+        self.current_trick.clear()
+        self.knowledge.end_trick()
+        self.trick_winners.append(winner_id)
+
+    def on_round_finished(self) -> None:
+        self.hand.clear()
+        self.current_trick.clear()
+        self.trick_winners.clear()
+        self.seen_suits_played.clear()
+        self.seen_cards_played.clear()
+        self.knowledge.reset()
+        self.declarer = None
+        self.deal_choice_needed = True
+
+    def on_redeal(self) -> None:
+        self.hand.clear()
+        self.current_trick.clear()
+        self.seen_suits_played.clear()
+        self.seen_cards_played.clear()
+        self.knowledge.reset()
+        self.declarer = None
+        self.last_declared_suits = ""
+        self.advised_suit = None
+        self.deal_choice_needed = True
+
+    # ------------- saved state -------------
+    def export_state(self) -> dict:
+        """What the bot remembers of the round, as plain data (see ``server.snapshot``)."""
+        return {
+            "player_id": self.player_id,
+            "name": self.name,
+            "difficulty": self.difficulty,
+            "strategies": list(self.strategy_names),
+            "trump": self.trump,
+            "declarer": self.declarer,
+            "plays": [list(play) for play in self.knowledge.plays],
+            "trick_winners": list(self.trick_winners),
+            "last_declared_suits": self.last_declared_suits,
+            "advised_suit": self.advised_suit,
+            "deal_choice_needed": self.deal_choice_needed,
+        }
+
+    def restore_state(self, state: dict, hand: Sequence[str]) -> None:
+        """
+        Pick up from ``export_state``: the round's plays are replayed through the
+        usual observers so the card tracker is rebuilt, then ``hand`` (the
+        game's record of the seat's cards) replaces whatever they left.
+        """
+        self.player_id = state["player_id"]
+        self.trump = state["trump"]
+        self.declarer = state["declarer"]
+        winners = state["trick_winners"]
+        for count, (seat, card) in enumerate(state["plays"], start=1):
+            self.on_card_played(seat, card)
+            if count % 4 == 0 and count // 4 <= len(winners):
+                self.on_trick_won(winners[count // 4 - 1])
+        self.trick_winners = list(winners)
+        self.hand = list(hand)
+        self.last_declared_suits = state["last_declared_suits"]
+        self.advised_suit = state["advised_suit"]
+        self.deal_choice_needed = state["deal_choice_needed"]
+
+    # ------------- decisions -------------
+    def decide_split(self) -> str:
+        if self._rng.random() < 0.5:
+            return f"split {self._rng.randint(10, 22)}"
+        return "banka"
+
+    def decide_declaration(self, maxmeld: str) -> int:
+        """Return the length to declare (0 to pass) given the ``maxmeld`` summary."""
+        digits = "".join(ch for ch in maxmeld if ch.isdigit())
+        self.last_declared_suits = "".join(ch for ch in maxmeld if ch.isalpha()).upper()
+        length = int(digits) if digits else 0
+        self.advised_suit = None
+        if length >= 5 and self.advise_declarations and len(self.hand) == 8:
+            advice = advisor.advise(self.hand)
+            self.advised_suit = advice.suit
+            return advice.declaration
+        return length if length >= 5 else 0
+
+    def decide_suit(self) -> str:
+        if self.advised_suit and self.advised_suit in self.last_declared_suits:
+            return self.advised_suit
+        if self.last_declared_suits:
+            if "C" in self.last_declared_suits:
+                return "C"
+            return self._rng.choice(list(self.last_declared_suits))
+        return self._rng.choice(SUITS)
+
     # ------------- split/declaration helpers -------------
     def _handle_split_choice(self) -> None:
-        if random.random() < 0.5:
-            position = random.randint(10, 22)
-            action = f"split {position}"
-        else:
-            action = "banka"
+        action = self.decide_split()
         response = self._command(action).strip()
         self._log(f"> {action} [{response}]")
         self.deal_choice_needed = False
 
-    def _handle_declaration(self) -> None:
-        summary = self._command("maxmeld").strip()
-        digits = "".join(ch for ch in summary if ch.isdigit())
-        suits = "".join(ch for ch in summary if ch.isalpha()).upper()
-        self.last_declared_suits = suits
-        length = int(digits) if digits else 0
+    def _handle_declaration(self, summary: Optional[str] = None) -> None:
+        if summary is None:
+            summary = self._command("maxmeld").strip()
+        length = self.decide_declaration(summary)
 
         if length < 5:
             response = self._command("M 0").strip()
@@ -239,18 +436,12 @@ class BotBrain:
             self._log(f"> M 0 [{fallback}]")
 
     def _handle_suit_choice(self) -> None:
-        if self.last_declared_suits:
-            if "C" in self.last_declared_suits:
-                suit = "C"
-            else:
-                suit = random.choice(list(self.last_declared_suits))
-        else:
-            suit = random.choice(SUITS)
+        suit = self.decide_suit()
 
         response = self._command(f"S {suit}").strip()
         self._log(f"> S {suit} [{response}]")
         if "Invalid" in response:
-            suit = random.choice(SUITS)
+            suit = self._rng.choice(SUITS)
             retry = self._command(f"S {suit}").strip()
             self._log(f"> S {suit} [{retry}]")
         self.trump = suit
@@ -271,12 +462,7 @@ class BotBrain:
             card = parts[-1]
         except (ValueError, IndexError):
             return
-        self.current_trick.append((player_id, card))
-        if len(card) >= 2:
-            self.seen_suits_played.add(card[1])
-            self.seen_cards_played.append(card)
-        if player_id == self.player_id and card in self.hand:
-            self.hand.remove(card)
+        self.on_card_played(player_id, card)
 
     # ------------- card utilities -------------
     def _is_trump(self, card: str) -> bool:
@@ -306,7 +492,12 @@ class BotBrain:
         return sum(self._card_points(card) for _, card in plays)
 
     def _seen_trump_count(self) -> int:
-        return sum(1 for card in self.seen_cards_played if self._is_trump(card))
+        return self.knowledge.trumps_played
+
+    def _opponents(self) -> Tuple[int, ...]:
+        if self.player_id is None:
+            return ()
+        return tuple(seat for seat in (1, 2, 3, 4) if not self._same_team(seat, self.player_id))
 
     def _hand_suit_counts(self, cards: Optional[Sequence[str]] = None) -> Counter:
         suits = [
@@ -330,15 +521,12 @@ class BotBrain:
     ) -> Optional[str]:
         if not winning_cards:
             return None
-        ordered = list(winning_cards)
-        if prefer_non_permanent_trump:
-            ordinary = [card for card in ordered if self._ordinary_trump(card)]
-            permanent = [card for card in ordered if card in PERMANENT_TRUMPS]
-            ordered = ordinary + permanent
+        # Permanent trumps are spent last; plain winners stay eligible so the
+        # cheapest card that still takes the trick is chosen.
         return min(
-            ordered,
+            winning_cards,
             key=lambda card: (
-                0 if (prefer_non_permanent_trump and self._ordinary_trump(card)) else 1,
+                1 if (prefer_non_permanent_trump and card in PERMANENT_TRUMPS) else 0,
                 self._card_strength(card, lead_card),
                 self._card_points(card),
             ),
@@ -389,14 +577,11 @@ class BotBrain:
             return 14
         return {"K": 13, "Q": 12, "J": 11, "T": 10, "9": 9, "8": 8, "7": 7}.get(value, 0)
 
-    def _card_strength(self, card: str, lead_card: str) -> Tuple[int, int]:
-        if card in PERMANENT_TRUMPS:
-            return 3, len(PERMANENT_TRUMPS) - PERMANENT_TRUMPS.index(card)
-        if self._is_trump(card):
-            return 2, self._card_value_rank(card)
-        if card[1] == lead_card[1]:
-            return 1, self._card_value_rank(card)
-        return 0, self._card_value_rank(card)
+    def _trick_ranks(self, lead_card: str) -> Tuple[int, ...]:
+        return TRICK_RANKS[(self.trump, lead_card[1])]
+
+    def _card_strength(self, card: str, lead_card: str) -> int:
+        return self._trick_ranks(lead_card)[CARD_INDEX[card]]
 
     def _current_winning_play(
         self, trick: Optional[List[Tuple[int, str]]] = None
@@ -404,29 +589,19 @@ class BotBrain:
         plays = trick if trick is not None else self.current_trick
         if not plays:
             return None
-        lead_card = plays[0][1]
-        winner = plays[0]
-        best_strength = self._card_strength(winner[1], lead_card)
-        for player_id, card in plays[1:]:
-            strength = self._card_strength(card, lead_card)
-            if strength > best_strength:
-                winner = (player_id, card)
-                best_strength = strength
-        return winner
+        ranks = self._trick_ranks(plays[0][1])
+        return max(plays, key=lambda play: ranks[CARD_INDEX[play[1]]])
 
     def _card_points(self, card: str) -> int:
         return CARD_POINTS.get(card[0], 0)
 
     def _winning_cards(self, legal_cards: Sequence[str]) -> List[str]:
-        if not self.current_trick:
+        winner = self._current_winning_play()
+        if winner is None:
             return []
-        winning_cards: List[str] = []
-        for card in legal_cards:
-            candidate = self.current_trick + [(self.player_id or 0, card)]
-            winner = self._current_winning_play(candidate)
-            if winner and winner[0] == self.player_id:
-                winning_cards.append(card)
-        return winning_cards
+        ranks = self._trick_ranks(self.current_trick[0][1])
+        best = ranks[CARD_INDEX[winner[1]]]
+        return [card for card in legal_cards if ranks[CARD_INDEX[card]] > best]
 
     def _strategy_partner_points_dump(self, legal_cards: Sequence[str]) -> Optional[str]:
         if not self.current_trick or self.player_id is None:
@@ -615,6 +790,8 @@ class BotBrain:
         seen_trumps = self._seen_trump_count()
         if seen_trumps >= 8:
             return None
+        if not self.knowledge.trumps_possible(self._opponents(), mask_from_codes(self.hand)):
+            return None  # nothing left to draw from the opponents
         trump_cards = [card for card in legal_cards if self._ordinary_trump(card)]
         if not trump_cards:
             return None
@@ -623,8 +800,68 @@ class BotBrain:
             key=lambda card: (self._card_points(card), self._card_value_rank(card)),
         )
 
+    def _search_view(self) -> expert.SearchView:
+        return expert.SearchView(
+            seat=self.player_id,
+            hand=tuple(self.hand),
+            trump=self.trump,
+            plays=tuple(self.knowledge.plays),
+            declarer=self.declarer,
+            barred=tuple(self.knowledge.barred[seat] for seat in (1, 2, 3, 4)),
+        )
+
+    def _strategy_endgame_table(self, legal_cards: Sequence[str]) -> Optional[str]:
+        if self.trump is None or self.player_id is None or 4 * len(self.hand) > endgame.ENDGAME_CARDS:
+            return None
+        view = self._search_view()
+        if view.trick != tuple(self.current_trick):
+            return None
+        hands = expert.known_hands(view)
+        if hands is None:
+            return None  # the other hands are not pinned down yet
+        trick = tuple(CARD_INDEX[card] for _, card in view.trick)
+        card, _ = endgame.default_table().best_card(Deal(hands, self.trump, view.leader, trick))
+        return card if card in legal_cards else None
+
+    def _strategy_determinized_search(self, legal_cards: Sequence[str]) -> Optional[str]:
+        if self.trump is None or self.player_id is None or len(self.hand) > expert.SEARCH_CARDS:
+            return None
+        view = self._search_view()
+        if view.trick != tuple(self.current_trick):
+            return None  # missed a play; the sample would be inconsistent
+        if self._searched is not None:
+            return self._searched.card if self._searched.card in legal_cards else None
+        seed = self._rng.getrandbits(32)
+        if self.post_event is not None:
+            expert.search_threads().submit(self._search_in_background, view, list(legal_cards), seed)
+            return SEARCHING
+        return expert.choose_card(
+            view,
+            legal_cards,
+            budget=self.move_budget,
+            samples=self.search_samples,
+            rng=random.Random(seed),
+        )
+
+    def _search_in_background(self, view: expert.SearchView, legal_cards: List[str], seed: int) -> None:
+        card = None
+        try:
+            card = expert.choose_card(
+                view,
+                legal_cards,
+                budget=self.move_budget,
+                samples=self.search_samples,
+                rng=random.Random(seed),
+            )
+        except Exception as exc:  # noqa: BLE001
+            self._log(f"Search failed: {exc}")
+        # Straight back: the think delay was spent before the search began.
+        self.post_event(SearchFinished(view, card), 0.0)
+
     def _choose_card(self, legal_cards: Sequence[str]) -> str:
         strategy_map = {
+            "endgame_table": self._strategy_endgame_table,
+            "determinized_search": self._strategy_determinized_search,
             "dont_overtake_partner": self._strategy_dont_overtake_partner,
             "partner_points_dump": self._strategy_partner_points_dump,
             "stinga_low_trump": self._strategy_stinga_low_trump,
@@ -647,10 +884,14 @@ class BotBrain:
             if choice:
                 return choice
         options = list(legal_cards)
-        random.shuffle(options)
+        self._rng.shuffle(options)
         return options[0]
 
-    def _play_card(self) -> None:
+    def _play_card(self, searched: Optional[SearchFinished] = None) -> None:
+        if searched is not None and (
+            self.trump is None or self.player_id is None or searched.view != self._search_view()
+        ):
+            return  # the position moved on while the search ran
         if not self.hand:
             self._refresh_hand()
             if not self.hand:
@@ -658,7 +899,13 @@ class BotBrain:
 
         lead_card = self.current_trick[0][1] if self.current_trick else None
         options = self._legal_cards(lead_card)
-        chosen = self._choose_card(options)
+        self._searched = searched
+        try:
+            chosen = self._choose_card(options)
+        finally:
+            self._searched = None
+        if chosen == SEARCHING:
+            return  # played when ``SearchFinished`` comes back
 
         for card in [chosen, *[card for card in options if card != chosen]]:
             response = self._command(f"P {card}").strip()
@@ -0,0 +1,162 @@
+"""
+One scheduler for every in-process bot in the process.
+
+Each bot gets a ``BotMailbox``. Game events posted to it become due after
+the bot's think delay, and the scheduler keeps one heap entry per mailbox,
+keyed by the deadline of its oldest pending event. A fixed pool of worker
+threads pops whichever mailbox is due first and hands its due events to the
+bot in order, so:
+
+* the thread count is ``workers`` however many tables have bots,
+* a think delay is a deadline in the heap, not a sleeping thread,
+* a bot never runs on two workers at once, and sees its events in order,
+* closing a mailbox is O(1); its heap entry is dropped when it surfaces.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, List, Optional, Protocol, Tuple
+
+DEFAULT_WORKERS = 4
+
+
+class EventHandler(Protocol):
+    name: str
+
+    def handle_event(self, event: Any) -> None: ...
+
+
+class BotMailbox:
+    def __init__(self, scheduler: "BotScheduler", bot: EventHandler, think_delay: float) -> None:
+        self.scheduler = scheduler
+        self.bot = bot
+        self.think_delay = think_delay
+        self.active = True
+        self._pending: Deque[Tuple[float, Any]] = deque()
+        self._scheduled = False  # in the heap or being run by a worker
+
+    def post(self, event: Any, delay: Optional[float] = None) -> None:
+        """Hand ``event`` to the bot after ``delay`` seconds (default: its think delay)."""
+        self.scheduler._post(self, event, delay)
+
+    def close(self) -> None:
+        """Deregister the bot; anything still queued for it is discarded."""
+        self.active = False
+
+
+class BotScheduler:
+    def __init__(self, workers: int = DEFAULT_WORKERS, verbose: bool = False) -> None:
+        if workers < 1:
+            raise ValueError("A bot scheduler needs at least one worker.")
+        self.workers = workers
+        self.verbose = verbose
+        self._heap: List[Tuple[float, int, BotMailbox]] = []
+        self._condition = threading.Condition()
+        self._order = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+
+    def register(self, bot: EventHandler, think_delay: float = 0.0) -> BotMailbox:
+        return BotMailbox(self, bot, think_delay)
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def shutdown(self, timeout: Optional[float] = 1.0) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(f"[BotScheduler] {message}")
+
+    def _post(self, mailbox: BotMailbox, event: Any, delay: Optional[float] = None) -> None:
+        with self._condition:
+            if not mailbox.active or self._stopped:
+                return
+            deadline = time.monotonic() + (mailbox.think_delay if delay is None else delay)
+            if mailbox._pending:
+                # Never overtake an earlier event for the same bot.
+                deadline = max(deadline, mailbox._pending[-1][0])
+            mailbox._pending.append((deadline, event))
+            if not mailbox._scheduled:
+                mailbox._scheduled = True
+                heapq.heappush(self._heap, (deadline, next(self._order), mailbox))
+                self._condition.notify()
+            if not self._threads:
+                self._start_workers()
+
+    def _start_workers(self) -> None:
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"bot-worker-{index}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_due(self) -> Optional[Tuple[BotMailbox, List[Any]]]:
+        """Block until a mailbox is due; return it with its due events (None to exit)."""
+        with self._condition:
+            while True:
+                if self._stopped:
+                    return None
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                deadline, _, mailbox = self._heap[0]
+                now = time.monotonic()
+                if deadline > now:
+                    self._condition.wait(deadline - now)
+                    continue
+                heapq.heappop(self._heap)
+                if not mailbox.active:
+                    mailbox._pending.clear()
+                    mailbox._scheduled = False
+                    continue
+                due = []
+                while mailbox._pending and mailbox._pending[0][0] <= now:
+                    due.append(mailbox._pending.popleft()[1])
+                return mailbox, due
+
+    def _work(self) -> None:
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            mailbox, events = due
+            for event in events:
+                if not mailbox.active:
+                    break
+                try:
+                    mailbox.bot.handle_event(event)
+                except Exception as exc:  # noqa: BLE001
+                    self._log(f"{mailbox.bot.name} failed to handle {event!r}: {exc}")
+            with self._condition:
+                if mailbox.active and mailbox._pending:
+                    heapq.heappush(self._heap, (mailbox._pending[0][0], next(self._order), mailbox))
+                    self._condition.notify()
+                else:
+                    mailbox._pending.clear()
+                    mailbox._scheduled = False
+
+
+_default_scheduler: Optional[BotScheduler] = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler() -> BotScheduler:
+    """The process-wide scheduler shared by every ``BotManager``."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = BotScheduler()
+        return _default_scheduler
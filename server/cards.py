@@ -0,0 +1,178 @@
+"""
+Compact card engine for the 32-card Sjavs pack.
+
+Every card is a small integer ``index = suit_index * 8 + rank_index`` and any
+set of cards (a hand, a team pile, the cards seen so far) is a 32-bit mask.
+Trump membership, follow-suit sets and pile points are then plain mask
+operations, which keeps the hot paths in ``server.utils`` free of string
+formatting.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator, Sequence
+
+SUITS = ("C", "D", "H", "S")
+RANKS = ("7", "8", "9", "T", "J", "Q", "K", "A")
+PERMANENT_TRUMPS = ("QC", "QS", "JC", "JS", "JH", "JD")
+RANK_POINTS = {"A": 11, "T": 10, "K": 4, "Q": 3, "J": 2}
+
+CARD_CODES: tuple[str, ...] = tuple(rank + suit for suit in SUITS for rank in RANKS)
+CARD_INDEX: dict[str, int] = {code: index for index, code in enumerate(CARD_CODES)}
+CARD_POINTS: tuple[int, ...] = tuple(RANK_POINTS.get(code[0], 0) for code in CARD_CODES)
+FULL_MASK = (1 << len(CARD_CODES)) - 1
+
+PERMANENT_TRUMP_MASK = 0
+for _code in PERMANENT_TRUMPS:
+    PERMANENT_TRUMP_MASK |= 1 << CARD_INDEX[_code]
+
+# Every card of a suit, including any permanent trumps printed in it.
+SUIT_MASKS: dict[str, int] = {
+    suit: 0xFF << (8 * offset) for offset, suit in enumerate(SUITS)
+}
+# The cards that follow a plain (non-trump) lead of the suit.
+PLAIN_SUIT_MASKS: dict[str, int] = {
+    suit: mask & ~PERMANENT_TRUMP_MASK for suit, mask in SUIT_MASKS.items()
+}
+# All trumps once the suit has been named: the permanent trumps plus the suit.
+TRUMP_MASKS: dict[str, int] = {
+    suit: mask | PERMANENT_TRUMP_MASK for suit, mask in SUIT_MASKS.items()
+}
+
+# Suit order of the ``maxmeld`` summary.
+DECLARATION_ORDER = ("H", "C", "D", "S")
+
+# Points held by each possible byte of a suit, so pile scoring is four lookups.
+_BYTE_POINTS: tuple[int, ...] = tuple(
+    sum(RANK_POINTS.get(RANKS[rank], 0) for rank in range(8) if byte >> rank & 1)
+    for byte in range(256)
+)
+
+
+def card_index(code: str) -> int:
+    """Return the engine index for a short card code such as ``"QC"``."""
+    try:
+        return CARD_INDEX[code]
+    except KeyError:
+        raise ValueError(f"Not a Sjavs card: {code!r}") from None
+
+
+def suit_of(index: int) -> str:
+    return SUITS[index >> 3]
+
+
+def mask_of(cards: Iterable[int]) -> int:
+    mask = 0
+    for index in cards:
+        mask |= 1 << index
+    return mask
+
+
+def mask_from_codes(codes: Iterable[str]) -> int:
+    return mask_of(card_index(code) for code in codes)
+
+
+def iter_mask(mask: int) -> Iterator[int]:
+    """Yield the indices set in ``mask`` from lowest to highest."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def codes_of(mask: int) -> list[str]:
+    return [CARD_CODES[index] for index in iter_mask(mask)]
+
+
+def mask_points(mask: int) -> int:
+    return (
+        _BYTE_POINTS[mask & 0xFF]
+        + _BYTE_POINTS[(mask >> 8) & 0xFF]
+        + _BYTE_POINTS[(mask >> 16) & 0xFF]
+        + _BYTE_POINTS[(mask >> 24) & 0xFF]
+    )
+
+
+def highest_declaration(mask: int) -> str:
+    """
+    The ``maxmeld`` summary for a hand: the longest possible trump length
+    followed by the suits that reach it (``"6HC"``), or ``"0"`` below five.
+    """
+    permanent = (mask & PERMANENT_TRUMP_MASK).bit_count()
+    lengths = {
+        suit: (mask & PLAIN_SUIT_MASKS[suit]).bit_count() + permanent
+        for suit in DECLARATION_ORDER
+    }
+    longest = max(lengths.values())
+    if longest < 5:
+        return "0"
+    return str(longest) + "".join(suit for suit, length in lengths.items() if length == longest)
+
+
+def trump_mask(trump: str) -> int:
+    """Mask of every trump for ``trump`` (accepts ``"H"`` or ``"Hearts"``)."""
+    return TRUMP_MASKS.get(trump[0].upper(), PERMANENT_TRUMP_MASK)
+
+
+def is_trump(index: int, trump: str) -> bool:
+    return bool(trump_mask(trump) >> index & 1)
+
+
+def follow_mask(lead_index: int, trump: str) -> int:
+    """Mask of the cards that count as following the lead card."""
+    trumps = trump_mask(trump)
+    if trumps >> lead_index & 1:
+        return trumps
+    return PLAIN_SUIT_MASKS[SUITS[lead_index >> 3]]
+
+
+def legal_mask(hand_mask: int, lead_index: int | None, trump: str | None) -> int:
+    """Cards in ``hand_mask`` that may legally be played to the current trick."""
+    if lead_index is None or trump is None:
+        return hand_mask
+    following = hand_mask & follow_mask(lead_index, trump)
+    return following or hand_mask
+
+
+def _build_trick_ranks(trump: str | None, lead_suit: str) -> tuple[int, ...]:
+    # Off-suit cards rank 0-7, the lead suit 8-15, ordinary trumps 16-23 and the
+    # permanent trumps 24-29, so a single integer comparison settles any pair.
+    trumps = TRUMP_MASKS[trump] if trump is not None else PERMANENT_TRUMP_MASK
+    ranks = []
+    for index, code in enumerate(CARD_CODES):
+        rank = index & 7
+        if code in PERMANENT_TRUMPS:
+            ranks.append(24 + len(PERMANENT_TRUMPS) - 1 - PERMANENT_TRUMPS.index(code))
+        elif trumps >> index & 1:
+            ranks.append(16 + rank)
+        elif code[1] == lead_suit:
+            ranks.append(8 + rank)
+        else:
+            ranks.append(rank)
+    return tuple(ranks)
+
+
+# One rank table per (trump suit, lead suit); ``None`` covers an unnamed trump.
+TRICK_RANKS: dict[tuple[str | None, str], tuple[int, ...]] = {
+    (trump, lead): _build_trick_ranks(trump, lead)
+    for trump in (*SUITS, None)
+    for lead in SUITS
+}
+
+
+def trick_ranks(trump: str | None, lead_index: int) -> tuple[int, ...]:
+    """Rank table for a trick whose first card is ``lead_index``."""
+    return TRICK_RANKS[(trump, SUITS[lead_index >> 3])]
+
+
+def trick_winner(indices: Sequence[int], trump: str | None) -> int:
+    """Return the position in ``indices`` of the card that takes the trick."""
+    ranks = TRICK_RANKS[(trump, SUITS[indices[0] >> 3])]
+    best_position = 0
+    best_rank = ranks[indices[0]]
+    for position in range(1, len(indices)):
+        rank = ranks[indices[position]]
+        if rank > best_rank:
+            best_position = position
+            best_rank = rank
+    return best_position
@@ -0,0 +1,164 @@
+"""
+Precomputed ``maxmeld`` answers for every 8-card hand.
+
+There are C(32, 8) = 10,518,300 possible hands. The table holds one byte per
+hand: the longest trump declaration in the low nibble (0 below five) and the
+suits that reach it as flags in the high nibble, in ``DECLARATION_ORDER``.
+A hand's position is its colexicographic rank, i.e. its place among all
+8-card masks sorted numerically, which four byte-table lookups compute.
+
+The file is built offline by ``scripts/build_declaration_table.py`` and
+memory-mapped on first use, so every process serving games shares one copy
+through the page cache. Without the file, or for hands that are not exactly
+eight cards, lookups fall back to ``cards.highest_declaration``.
+"""
+
+from __future__ import annotations
+
+import mmap
+import threading
+from math import comb
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from . import cards
+
+HAND_SIZE = 8
+TABLE_SIZE = comb(32, HAND_SIZE)
+DEFAULT_TABLE_PATH = Path(__file__).with_name("data") / "declarations.bin"
+
+# _RANK_PARTS[byte_position][bits_below][byte]: what the set bits of one byte
+# of the mask add to the rank, given how many lower bits are already set.
+_RANK_PARTS: Tuple[Tuple[Tuple[int, ...], ...], ...] = tuple(
+    tuple(
+        tuple(
+            sum(
+                comb(8 * position + bit, below + order + 1)
+                for order, bit in enumerate(b for b in range(8) if byte >> b & 1)
+            )
+            for byte in range(256)
+        )
+        for below in range(HAND_SIZE + 1)
+    )
+    for position in range(4)
+)
+
+
+def hand_rank(mask: int) -> int:
+    """Colexicographic rank of an 8-card mask among all 8-card masks."""
+    parts = _RANK_PARTS
+    low = mask & 0xFF
+    rank = parts[0][0][low]
+    below = low.bit_count()
+    byte = mask >> 8 & 0xFF
+    rank += parts[1][below][byte]
+    below += byte.bit_count()
+    byte = mask >> 16 & 0xFF
+    rank += parts[2][below][byte]
+    below += byte.bit_count()
+    return rank + parts[3][below][mask >> 24 & 0xFF]
+
+
+def iter_hands() -> Iterator[int]:
+    """Every 8-card mask in rank order (numerically increasing)."""
+    mask = (1 << HAND_SIZE) - 1
+    end = 1 << len(cards.CARD_CODES)
+    while mask < end:
+        yield mask
+        lowest = mask & -mask
+        ripple = mask + lowest
+        mask = (((ripple ^ mask) >> 2) // lowest) | ripple
+
+
+def encode(mask: int) -> int:
+    permanent = (mask & cards.PERMANENT_TRUMP_MASK).bit_count()
+    longest = 0
+    flags = 0
+    for position, suit in enumerate(cards.DECLARATION_ORDER):
+        length = (mask & cards.PLAIN_SUIT_MASKS[suit]).bit_count() + permanent
+        if length > longest:
+            longest, flags = length, 1 << position
+        elif length == longest:
+            flags |= 1 << position
+    if longest < 5:
+        return 0
+    return flags << 4 | longest
+
+
+# The ``maxmeld`` summary for each table byte.
+DECODED: Tuple[str, ...] = tuple(
+    (
+        str(value & 0x0F)
+        + "".join(suit for position, suit in enumerate(cards.DECLARATION_ORDER) if value >> (4 + position) & 1)
+    )
+    if value & 0x0F
+    else "0"
+    for value in range(256)
+)
+
+
+def write_table(path: Path = DEFAULT_TABLE_PATH, limit: Optional[int] = None) -> int:
+    """Write the table (or its first ``limit`` entries) to ``path``; returns the entry count."""
+    size = TABLE_SIZE if limit is None else min(limit, TABLE_SIZE)
+    table = bytearray(size)
+    for rank, mask in enumerate(iter_hands()):
+        if rank >= size:
+            break
+        table[rank] = encode(mask)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    temporary.write_bytes(table)
+    temporary.replace(path)
+    return size
+
+
+class DeclarationTable:
+    """Lazily memory-mapped view of a table written by ``write_table``."""
+
+    def __init__(self, path: Path = DEFAULT_TABLE_PATH) -> None:
+        self.path = Path(path)
+        self._data: Optional[mmap.mmap] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self._load() is not None
+
+    def _load(self) -> Optional[mmap.mmap]:
+        if self._loaded:
+            return self._data
+        with self._lock:
+            if not self._loaded:
+                try:
+                    with open(self.path, "rb") as handle:
+                        self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    self._data = None  # missing or empty: compute instead
+                self._loaded = True
+        return self._data
+
+    def lookup(self, mask: int) -> str:
+        """The ``maxmeld`` summary for ``mask``, e.g. ``"6HC"`` or ``"0"``."""
+        data = self._data if self._loaded else self._load()
+        if data is not None and mask.bit_count() == HAND_SIZE:
+            rank = hand_rank(mask)
+            if rank < len(data):
+                return DECODED[data[rank]]
+        return cards.highest_declaration(mask)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._data is not None:
+                self._data.close()
+            self._data = None
+            self._loaded = False
+
+
+_default_table = DeclarationTable()
+
+
+def lookup(mask: int) -> str:
+    """``maxmeld`` for a hand mask through the shared default table."""
+    return _default_table.lookup(mask)
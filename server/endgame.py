@@ -0,0 +1,264 @@
+"""
+Exact results for the last tricks of a round, remembered across runs.
+
+Once four tricks or fewer remain (``ENDGAME_CARDS`` cards in the hands), a
+position is small enough to solve exactly in milliseconds, and the same
+positions recur: every card a search tries leads to a sibling position, and
+sampled deals often agree on the last few cards. ``EndgameTable`` solves a
+position once with ``DoubleDummySolver`` and keeps the result, keyed by the
+four remaining hands, the trump, the leader and the cards already in the
+trick. The value stored is what Vit takes from that point on; points won in
+earlier tricks do not change the best play and are added back by callers.
+
+Given a file, new entries are appended to it as fixed-size records and read
+back on first use, so a later run (or another worker process) starts warm.
+The process-wide table uses the file named by ``$SJAVS_ENDGAME`` and stays
+in memory when that is unset; nothing is written at import, and the web server
+and the expert search workers flush it when they shut down. Each batch goes
+out as one ``O_APPEND`` write, which keeps records from different processes
+whole; a torn record at the end of the file, from a crash mid-write, is cut off
+on load. ``stats`` reports lookups, hits and the hit rate.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import cards
+from .solver import Deal, DoubleDummySolver, Outcome
+
+ENDGAME_CARDS = 16  # four tricks
+TABLE_ENV = "SJAVS_ENDGAME"
+MAX_ENTRIES = 250_000
+FLUSH_EVERY = 1024
+# A solver's transposition table is dropped after this many nodes.
+SOLVER_NODE_LIMIT = 2_000_000
+
+# hands (4 masks), trump, leader, trick length, up to three trick cards, Vit's points.
+RECORD = struct.Struct("<4I7B")
+
+Key = Tuple[str, int, Tuple[int, int, int, int], Tuple[int, ...]]
+
+
+@dataclass(frozen=True)
+class EndgameStats:
+    entries: int
+    loaded: int  # entries read from disk
+    hits: int
+    misses: int
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+def covers(deal: Deal) -> bool:
+    """Whether ``deal`` is late enough in the round for the table."""
+    remaining = (deal.hands[0] | deal.hands[1] | deal.hands[2] | deal.hands[3]).bit_count()
+    return remaining + len(deal.trick) <= ENDGAME_CARDS
+
+
+def _key(deal: Deal) -> Key:
+    return (deal.trump[0].upper(), deal.leader, tuple(deal.hands), tuple(deal.trick))
+
+
+def _pack(key: Key, value: int) -> bytes:
+    trump, leader, hands, trick = key
+    padded = (*trick, 0, 0, 0)[:3]
+    return RECORD.pack(*hands, cards.SUITS.index(trump), leader, len(trick), *padded, value)
+
+
+def _unpack(record: Tuple[int, ...]) -> Tuple[Key, int]:
+    *hands, trump, leader, length, first, second, third, value = record
+    trick = (first, second, third)[:length]
+    return (cards.SUITS[trump], leader, tuple(hands), trick), value
+
+
+class EndgameTable:
+    """Memoized exact endgame values, persisted to ``path`` (``None`` keeps them in memory)."""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = MAX_ENTRIES) -> None:
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+        self._values: Dict[Key, int] = {}
+        self._pending: List[bytes] = []
+        # Each thread solves with its own solvers, so the lock is only held for lookups.
+        self._local = threading.local()
+        self._loaded = False
+        self._from_disk = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+    # ------------- queries -------------
+    def value(self, deal: Deal) -> int:
+        """Vit's card points from this position to the end of the round, under perfect play."""
+        if not covers(deal):
+            raise ValueError(f"Endgame positions hold at most {ENDGAME_CARDS} cards.")
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            key = _key(deal)
+            value = self._values.get(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = self._solve(deal)
+        with self._lock:
+            if key not in self._values and len(self._values) < self.max_entries:
+                self._values[key] = value
+                if self.path is not None:
+                    self._pending.append(_pack(key, value))
+                    if len(self._pending) >= FLUSH_EVERY:
+                        self.flush()
+        return value
+
+    def solve(self, deal: Deal) -> Outcome:
+        """Card points for each side at the end of the deal, like ``DoubleDummySolver.solve``."""
+        vit = deal.taken[0] + self.value(deal)
+        return Outcome(vit, sum(deal.taken) + _remaining_points(deal) - vit)
+
+    def move_values(self, deal: Deal) -> Dict[str, Outcome]:
+        """The final outcome after each legal card for the seat to move."""
+        seat = deal.to_move()
+        hand = deal.hands[seat - 1]
+        lead = deal.trick[0] if deal.trick else None
+        legal = cards.legal_mask(hand, lead, deal.trump)
+        total = sum(deal.taken) + _remaining_points(deal)
+        values: Dict[str, Outcome] = {}
+        for index in cards.iter_mask(legal):
+            hands = list(deal.hands)
+            hands[seat - 1] = hand & ~(1 << index)
+            trick = deal.trick + (index,)
+            vit = deal.taken[0]
+            if len(trick) == 4:
+                winner = (deal.leader - 1 + cards.trick_winner(trick, deal.trump)) % 4 + 1
+                if winner % 2:
+                    vit += sum(cards.CARD_POINTS[card] for card in trick)
+                if any(hands):
+                    vit += self.value(Deal(tuple(hands), deal.trump, winner))
+            else:
+                vit += self.value(Deal(tuple(hands), deal.trump, deal.leader, trick))
+            values[cards.CARD_CODES[index]] = Outcome(vit, total - vit)
+        return values
+
+    def best_card(self, deal: Deal) -> Tuple[str, Outcome]:
+        """The card the seat to move should play, and the outcome it leads to."""
+        values = self.move_values(deal)
+        maximize = deal.to_move() % 2 == 1
+        card = (max if maximize else min)(values, key=lambda code: values[code].vit)
+        return card, values[card]
+
+    def stats(self) -> EndgameStats:
+        with self._lock:
+            return EndgameStats(len(self._values), self._from_disk, self.hits, self.misses)
+
+    # ------------- storage -------------
+    def flush(self) -> None:
+        """Append entries solved since the last flush to the file."""
+        with self._lock:
+            if not self._pending or self.path is None:
+                return
+            batch = b"".join(self._pending)
+            self._pending.clear()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            descriptor = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(descriptor, batch)
+            finally:
+                os.close(descriptor)
+
+    def clear(self) -> None:
+        """Forget every entry and the statistics (the file is left alone)."""
+        with self._lock:
+            self._values.clear()
+            self._pending.clear()
+            self._local = threading.local()
+            self._loaded = True
+            self._from_disk = self.hits = self.misses = 0
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.path is None:
+            return
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return  # nothing saved yet
+        whole = len(data) - len(data) % RECORD.size
+        if whole < len(data):
+            # Cut the torn record off so later appends stay aligned.
+            try:
+                os.truncate(self.path, whole)
+            except OSError:
+                pass
+        for record in RECORD.iter_unpack(data[:whole]):
+            if len(self._values) >= self.max_entries:
+                break
+            key, value = _unpack(record)
+            self._values[key] = value
+        self._from_disk = len(self._values)
+
+    def _solve(self, deal: Deal) -> int:
+        trump = deal.trump[0].upper()
+        solvers = getattr(self._local, "solvers", None)
+        if solvers is None:
+            solvers = self._local.solvers = {}
+        solver = solvers.get(trump)
+        if solver is None or solver.nodes > SOLVER_NODE_LIMIT:
+            solver = solvers[trump] = DoubleDummySolver(trump)
+        return solver.solve(Deal(deal.hands, trump, deal.leader, deal.trick)).vit
+
+
+def _remaining_points(deal: Deal) -> int:
+    masks = deal.hands[0] | deal.hands[1] | deal.hands[2] | deal.hands[3]
+    return cards.mask_points(masks) + sum(cards.CARD_POINTS[index] for index in deal.trick)
+
+
+def table_path() -> Optional[Path]:
+    """The file named by ``$SJAVS_ENDGAME``, or None (memory only) if it is unset or empty."""
+    value = os.environ.get(TABLE_ENV, "")
+    return Path(value) if value.strip() else None
+
+
+_default_table: Optional[EndgameTable] = None
+_default_lock = threading.Lock()
+
+
+def default_table() -> EndgameTable:
+    """The process-wide table, created on first use at ``table_path()``."""
+    global _default_table
+    with _default_lock:
+        if _default_table is None:
+            _default_table = EndgameTable(table_path())
+        return _default_table
+
+
+def set_default_table(table: Optional[EndgameTable]) -> Optional[EndgameTable]:
+    """Install ``table`` as the process-wide one (None: rebuild on next use); returns the old one."""
+    global _default_table
+    with _default_lock:
+        previous, _default_table = _default_table, table
+        return previous
+
+
+def flush_default() -> None:
+    """Write out whatever the process-wide table has solved, if it has a file."""
+    with _default_lock:
+        table = _default_table
+    if table is not None:
+        table.flush()
+
+
+def stats() -> EndgameStats:
+    return default_table().stats()
@@ -0,0 +1,105 @@
+"""
+Structured game events for in-process consumers.
+
+``Game`` publishes human-readable text to its ``UpdateLog`` for clients, and
+alongside it emits the typed events below to ``Game.events``. In-process bots
+subscribe here so they never have to scrape message wording or ask the game
+for ``show`` / ``maxmeld`` to rebuild what it already knows.
+
+Events carrying a ``recipient`` are private to that seat (a dealt hand, a
+prompt to act); the rest are seen by every seat.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class GameEvent:
+    def visible_to(self, player_id: Optional[int]) -> bool:
+        recipient = getattr(self, "recipient", None)
+        return recipient is None or recipient == player_id
+
+
+@dataclass(frozen=True)
+class SplitRequested(GameEvent):
+    recipient: int
+
+
+@dataclass(frozen=True)
+class HandDealt(GameEvent):
+    recipient: int
+    cards: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class DeclarationRequested(GameEvent):
+    recipient: int
+
+
+@dataclass(frozen=True)
+class SuitRequested(GameEvent):
+    recipient: int
+
+
+@dataclass(frozen=True)
+class TrumpSet(GameEvent):
+    suit: str
+    declarer: Optional[int]
+
+
+@dataclass(frozen=True)
+class TurnToPlay(GameEvent):
+    recipient: int
+
+
+@dataclass(frozen=True)
+class CardPlayed(GameEvent):
+    player_id: int
+    card: str
+
+
+@dataclass(frozen=True)
+class TrickWon(GameEvent):
+    winner: int
+    cards: Tuple[Tuple[int, str], ...]
+
+
+@dataclass(frozen=True)
+class RoundFinished(GameEvent):
+    vit: int
+    tit: int
+
+
+@dataclass(frozen=True)
+class Redeal(GameEvent):
+    pass
+
+
+class EventStream:
+    """Synchronous fan-out of ``GameEvent`` objects, in emission order."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[GameEvent], None]] = []
+
+    def emit(self, event: GameEvent) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+
+    def add_listener(self, listener: Callable[[GameEvent], None]) -> Callable[[], None]:
+        """Call ``listener`` with every event emitted from now on; returns a remover."""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def remove() -> None:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return remove
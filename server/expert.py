@@ -0,0 +1,311 @@
+"""
+Determinized search for the "expert" bot difficulty.
+
+A bot only sees its own hand, so it cannot solve the real deal. Instead it
+samples complete deals that agree with everything it has seen:
+
+* cards already played are gone, and the bot's own hand is fixed;
+* a seat that failed to follow a lead holds nothing that would have followed;
+* the declarer started the round with at least five trumps.
+
+Each sample is solved double-dummy (``server.solver``) for every legal card,
+and the card with the best average card points for the bot's side is played.
+Samples are solved on a shared process pool, so the game server's threads stay
+free while bots think; event-driven bots also wait for the pool on
+``search_threads`` rather than on a bot scheduler worker. Every move has a
+time budget: the solver gives up at the deadline, samples that did not finish
+are ignored, and if none finished the caller falls back to its heuristics.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import multiprocessing.util
+import os
+import random
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from . import cards, endgame
+from .solver import Deal, DoubleDummySolver, SearchTimeout
+from .tracking import CardTracker
+
+DEFAULT_MOVE_BUDGET = 1.0  # seconds per card
+DEFAULT_SAMPLES = 24
+# Search once the bot holds this many cards or fewer; earlier tricks are too
+# deep to solve within a move budget and use the "hard" heuristics instead.
+SEARCH_CARDS = 6
+MIN_DECLARATION = 5
+SAMPLE_ATTEMPTS = 50
+# Worker processes drop their solver (and its table) after this many nodes.
+SOLVER_NODE_LIMIT = 5_000_000
+
+
+@dataclass(frozen=True)
+class SearchView:
+    """What one seat knows at its turn to play."""
+
+    seat: int
+    hand: Tuple[str, ...]
+    trump: str
+    plays: Tuple[Tuple[int, str], ...]  # every card played this round, in order
+    declarer: Optional[int] = None
+    # Cards each of seats 1-4 cannot hold; worked out from ``plays`` if omitted.
+    barred: Optional[Tuple[int, int, int, int]] = None
+
+    @property
+    def trick(self) -> Tuple[Tuple[int, str], ...]:
+        return self.plays[len(self.plays) - len(self.plays) % 4:]
+
+    @property
+    def leader(self) -> int:
+        trick = self.trick
+        return trick[0][0] if trick else self.seat
+
+
+def barred_cards(plays: Sequence[Tuple[int, str]], trump: str) -> Dict[int, int]:
+    """For each seat, a mask of cards it cannot hold because it failed to follow."""
+    tracker = CardTracker()
+    tracker.set_trump(trump)
+    for seat, card in plays:
+        tracker.record(seat, card)
+    return tracker.barred
+
+
+def _unseen_cards(view: SearchView):
+    """
+    The bot's hand mask, what each seat has played, how many cards each other
+    seat still holds, the unseen cards, and for each of those the seats that
+    may hold it; or None if the view does not add up.
+    """
+    hand_mask = cards.mask_from_codes(view.hand)
+    played = cards.mask_from_codes(card for _, card in view.plays)
+    played_by = {seat: 0 for seat in (1, 2, 3, 4)}
+    for seat, card in view.plays:
+        played_by[seat] |= 1 << cards.CARD_INDEX[card]
+    in_trick = {seat for seat, _ in view.trick}
+    others = [seat for seat in (1, 2, 3, 4) if seat != view.seat]
+    sizes = {seat: len(view.hand) - (1 if seat in in_trick else 0) for seat in others}
+    unseen = list(cards.iter_mask(cards.FULL_MASK & ~hand_mask & ~played))
+    if sum(sizes.values()) != len(unseen):
+        return None
+    if view.barred is not None:
+        barred = dict(zip((1, 2, 3, 4), view.barred))
+    else:
+        barred = barred_cards(view.plays, view.trump)
+    eligible = {card: [seat for seat in others if not barred[seat] >> card & 1] for card in unseen}
+    return hand_mask, played_by, sizes, unseen, eligible
+
+
+def sample_hands(view: SearchView, rng: random.Random) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Deal the unseen cards to the other seats consistently with ``view``, or
+    None if no consistent deal turned up. If the declarer's trump count cannot
+    be met (a misread declaration, say) that constraint is dropped.
+    """
+    setup = _unseen_cards(view)
+    if setup is None:
+        return None
+    hand_mask, played_by, sizes, unseen, eligible = setup
+    others = list(sizes)
+    trumps = cards.trump_mask(view.trump)
+    declarer = view.declarer if view.declarer in sizes else None
+
+    for strict in (True, False):
+        for _ in range(SAMPLE_ATTEMPTS):
+            rng.shuffle(unseen)
+            order = sorted(unseen, key=lambda card: len(eligible[card]))
+            capacity = dict(sizes)
+            hands = {seat: 0 for seat in others}
+            for card in order:
+                seats = [seat for seat in eligible[card] if capacity[seat]]
+                if not seats:
+                    break
+                seat = rng.choices(seats, weights=[capacity[seat] for seat in seats])[0]
+                hands[seat] |= 1 << card
+                capacity[seat] -= 1
+            else:
+                if (
+                    strict
+                    and declarer is not None
+                    and ((hands[declarer] | played_by[declarer]) & trumps).bit_count() < MIN_DECLARATION
+                ):
+                    continue
+                hands[view.seat] = hand_mask
+                return tuple(hands[seat] for seat in (1, 2, 3, 4))
+        if declarer is None:
+            break
+    return None
+
+
+def known_hands(view: SearchView) -> Optional[Tuple[int, int, int, int]]:
+    """
+    The other seats' hands when what the bot has seen pins them down (cards
+    only one seat can hold, or a seat with room for exactly what it may hold),
+    else None. Late in a round this often happens, and the position can be
+    played exactly.
+    """
+    setup = _unseen_cards(view)
+    if setup is None:
+        return None
+    hand_mask, _, capacity, unseen, eligible = setup
+    hands = {seat: 0 for seat in capacity}
+    open_cards = set(unseen)
+    while open_cards:
+        placed = False
+        for seat in hands:
+            if not capacity[seat]:
+                continue
+            candidates = [card for card in open_cards if seat in eligible[card]]
+            if len(candidates) < capacity[seat]:
+                return None
+            if len(candidates) == capacity[seat]:
+                forced = candidates
+            else:
+                forced = [
+                    card for card in candidates
+                    if not any(capacity[other] for other in eligible[card] if other != seat)
+                ]
+                if len(forced) > capacity[seat]:
+                    return None
+            for card in forced:
+                hands[seat] |= 1 << card
+                capacity[seat] -= 1
+                open_cards.discard(card)
+                placed = True
+        if not placed:
+            return None
+    hands[view.seat] = hand_mask
+    return tuple(hands[seat] for seat in (1, 2, 3, 4))
+
+
+_solvers: Dict[str, DoubleDummySolver] = {}
+
+
+def evaluate_sample(deal: Deal, deadline: float) -> Optional[Dict[str, int]]:
+    """
+    Vit's card points after each legal card in one sampled deal, or None if
+    the deadline passed first. Runs in the worker processes, each of which
+    keeps a solver per trump so later samples reuse its table.
+    """
+    if time.time() >= deadline:
+        return None
+    if endgame.covers(deal):
+        values = endgame.default_table().move_values(deal)
+        return {card: outcome.vit for card, outcome in values.items()}
+    solver = _solvers.get(deal.trump)
+    if solver is None or solver.nodes > SOLVER_NODE_LIMIT:
+        solver = _solvers[deal.trump] = DoubleDummySolver(deal.trump)
+    solver.deadline = deadline
+    try:
+        values = solver.move_values(deal)
+    except SearchTimeout:
+        return None
+    return {card: outcome.vit for card, outcome in values.items()}
+
+
+def choose_card(
+    view: SearchView,
+    legal_cards: Sequence[str],
+    budget: float = DEFAULT_MOVE_BUDGET,
+    samples: int = DEFAULT_SAMPLES,
+    rng: Optional[random.Random] = None,
+    pool: Optional[Executor] = None,
+) -> Optional[str]:
+    """The legal card with the best average over sampled deals, or None if no sample was solved in time."""
+    if len(legal_cards) == 1:
+        return legal_cards[0]
+    deadline = time.time() + budget
+    rng = rng or random.Random()
+    deals = []
+    for _ in range(samples):
+        hands = sample_hands(view, rng)
+        if hands is None:
+            break
+        trick = tuple(cards.CARD_INDEX[card] for _, card in view.trick)
+        deals.append(Deal(hands, view.trump, view.leader, trick))
+    if not deals:
+        return None
+
+    pool = pool or search_pool()
+    futures = [pool.submit(evaluate_sample, deal, deadline) for deal in deals]
+    done, pending = wait(futures, timeout=max(0.0, deadline - time.time()))
+    for future in pending:
+        future.cancel()
+
+    sign = 1 if view.seat % 2 else -1  # Vit maximises Vit's points, Tit minimises them
+    totals = {card: 0 for card in legal_cards}
+    solved = 0
+    for future in done:
+        if future.cancelled() or future.exception() is not None:
+            continue
+        values = future.result()
+        if values is None or not all(card in values for card in legal_cards):
+            continue
+        solved += 1
+        for card in legal_cards:
+            totals[card] += sign * values[card]
+    if not solved:
+        return None
+    return max(legal_cards, key=totals.__getitem__)
+
+
+def search_workers() -> int:
+    """Leave one core for the server itself."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def _init_worker() -> None:
+    # Endgame entries are written in batches; save the last partial one when
+    # the worker exits after ``shutdown_pool``. Workers leave through
+    # multiprocessing's exit path, which runs finalizers but not ``atexit``.
+    multiprocessing.util.Finalize(None, endgame.flush_default, exitpriority=10)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def search_pool() -> ProcessPoolExecutor:
+    """The process-wide pool expert bots solve their samples on."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers: forking a server with live threads is unsafe.
+            _pool = ProcessPoolExecutor(
+                max_workers=search_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+_threads: Optional[ThreadPoolExecutor] = None
+
+
+def search_threads() -> ThreadPoolExecutor:
+    """
+    Threads that run ``choose_card`` for event-driven bots. They spend the
+    move budget waiting on ``search_pool``, so one per search worker is enough.
+    """
+    global _threads
+    with _pool_lock:
+        if _threads is None:
+            _threads = ThreadPoolExecutor(max_workers=search_workers(), thread_name_prefix="expert-search")
+        return _threads
+
+
+def shutdown_pool(wait: bool = False) -> None:
+    """Stop the search threads and workers; each worker flushes its endgame table on the way out."""
+    global _pool, _threads
+    with _pool_lock:
+        pool, _pool = _pool, None
+        threads, _threads = _threads, None
+    if threads is not None:
+        threads.shutdown(wait=wait, cancel_futures=True)
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
@@ -1,18 +1,56 @@
 from __future__ import annotations
 
+import random
 import re
+import threading
 import time
-from collections import defaultdict
-from typing import DefaultDict, TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Union
 
-from .utils import Deck, Card, Player, Table
+from . import events
+from .events import EventStream
+from .timer_wheel import Timer, TimerWheel, default_wheel
+from .updates import DROPPED_NOTICE, PendingUpdatesView, UpdateLog
+from .utils import Deck, Player, Table
 
 if TYPE_CHECKING:  # pragma: no cover
     from .bot_manager import BotManager
 
+# Player subcommands that never change what ``/state`` shows.
+READ_ONLY_COMMANDS = ("gu", "help", "hint", "list players", "maxmeld", "show", "state")
+# Seconds a human seat may stay silent before ``on_inactive`` runs.
+INACTIVITY_TIMEOUT_SECONDS = 60.0
+
+
+def score_round(declarer_points: int, clubs_trump: bool, single_player_sweep: bool = False) -> tuple[bool, int, str]:
+    """
+    Score a finished round that is not a 60-60 draw: whether the declaring
+    side wins, the base points the winners subtract, and the reason.
+    """
+    if single_player_sweep:
+        return True, (24 if clubs_trump else 16), "Single player from declarer's side won every trick"
+    if declarer_points == 120:
+        return True, (16 if clubs_trump else 12), "Declarer side won every trick"
+    if declarer_points >= 90:
+        return True, (8 if clubs_trump else 4), "Declarer side scored 90-120 points"
+    if declarer_points >= 61:
+        return True, (4 if clubs_trump else 2), "Declarer side scored 61-89 points"
+    if declarer_points >= 31:
+        return False, (8 if clubs_trump else 4), "Defenders held declarers to 31-59 points"
+    if declarer_points == 0:
+        return False, 16, "Defenders won every trick"
+    return False, (16 if clubs_trump else 8), "Defenders held declarers under 31 points"
+
 
 class Game:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        rng: random.Random | None = None,
+        inactivity_timeout: float | None = INACTIVITY_TIMEOUT_SECONDS,
+        timers: TimerWheel | None = None,
+    ) -> None:
+        # Shuffles use the module-level ``random`` unless a seeded generator is given.
+        self.rng = rng
         self.deck: Deck | None = None
         self.table: Table | None = None
 
@@ -30,7 +68,9 @@ class Game:
         self.state: str = "init"
         self.game_over: bool = True
         self.players: dict[int, Player] = {}
-        self.updatesForPlayers: DefaultDict[int, list[str]] = defaultdict(list)
+        self.updates: UpdateLog = UpdateLog()
+        # Typed counterparts of the text updates, for in-process bots.
+        self.events: EventStream = EventStream()
         self.dealer_position: int = 1
         self.current_turn: int = 0  # init to so sanity checks unter game_init don't freak out
         self.deal_method: str = "fours"
@@ -52,20 +92,54 @@ class Game:
         self.last_round_result_key: int = 0
         self.last_round_result_kind: str | None = None
         self.last_reset_message: str | None = None
+        # Bumped after anything that may change a seat's view of the game.
+        self.state_version: int = 0
+        # Commands run one at a time whichever transport or bot thread sends
+        # them; re-entrant because some commands issue further commands.
+        self.command_lock = threading.RLock()
+        # Quiet seats are found by deadlines in a shared timer wheel, never by
+        # scanning. ``None`` turns the timeout off.
+        self.inactivity_timeout: float | None = inactivity_timeout
+        # Called as ``on_inactive(game, players)`` instead of resetting the table.
+        self.on_inactive: Callable[[Game, list[Player]], None] | None = None
+        # How an expired timer reaches the game. ``None`` runs it under
+        # ``command_lock`` on the wheel's thread; the web gateway posts it to the
+        # lobby's actor instead.
+        self.dispatch_timer: Callable[[Callable[[], None]], object] | None = None
+        self.timers = timers or default_wheel()
+        self._inactivity_timers: dict[Player, Timer] = {}
+        # Difficulty of each seat played by an in-process bot (see ``seat_bot``).
+        self.bot_seats: dict[Player, str] = {}
+        # (seat, card) for every card played this round, in order; restored bots
+        # rebuild what they have seen from it.
+        self.round_plays: list[tuple[int, str]] = []
+        # Called with a tuple for every change made outside a read-only command,
+        # always under ``command_lock``; ``apply_record`` redoes it. Set by
+        # ``server.journal``.
+        self.recorder: Callable[[tuple], None] | None = None
+        self._command_depth = 0
+
+    @property
+    def updatesForPlayers(self) -> PendingUpdatesView:
+        """Per-seat view of unread messages, kept for callers of the old dict of lists."""
+        return PendingUpdatesView(self.updates, self.players)
 
     def _begin_play_with_trump(self) -> str:
         if self.trump_suit is None:
             return "Invalid suit"
         self.broadcast_players(f"The current trump is {self.trump_suit}")
+        self.events.emit(events.TrumpSet(self.trump_suit, self.trump_owner.id if self.trump_owner else None))
         self.table = Table(self.trump_suit)
         self.state = "first_card"
         self.current_turn = ((self.dealer_position + 1) % 4) or 4
-        self.updatesForPlayers[self.current_turn].append("Play a card")
+        self.updates.publish("Play a card", recipient=self.current_turn)
+        self.events.emit(events.TurnToPlay(self.current_turn))
         return " "
 
     def _complete_declaration_phase(self) -> str:
         if self.trump_owner is None:
             self.broadcast_players("No player declared trump. Redealing.")
+            self.events.emit(events.Redeal())
             self._redeal_after_failed_declaration()
             return " "
         self.current_turn = self.trump_owner.id
@@ -74,9 +148,8 @@ class Game:
         )
         if self.trump_suit is not None:
             return self._begin_play_with_trump()
-        self.updatesForPlayers[self.trump_owner.id].append(
-            "What suit is your declaration?"
-        )
+        self.updates.publish("What suit is your declaration?", recipient=self.trump_owner.id)
+        self.events.emit(events.SuitRequested(self.trump_owner.id))
         return " "
 
     def _help_text(self) -> str:
@@ -86,11 +159,11 @@ class Game:
         ]
 
         if self.state in {"lobby", "end"}:
-            lines.append("Lobby: start, bots [count] [easy|medium|hard]")
+            lines.append("Lobby: start, bots [count] [easy|medium|hard|expert]")
         elif self.state == "deal":
             lines.append("Deal: split <10-22>, banka")
         elif self.state == "declaration":
-            lines.append("Declaration: maxmeld, M 0, M <5-8>, <0|5-8>, <5-8> Better")
+            lines.append("Declaration: maxmeld, hint, M 0, M <5-8>, <0|5-8>, <5-8> Better")
             if self.trump_owner is not None and self.trump_suit is None:
                 lines.append("Trump Suit: S <C|D|H|S>")
         elif self.state in {"first_card", "play"}:
@@ -102,6 +175,19 @@ class Game:
         lines.append("Examples: P 7C, M 5, 5 Better, S C, split 16, say hello")
         return "\n".join(lines)
 
+    def _declaration_hint(self, player_id: int) -> Union[str, Callable[[], str]]:
+        """
+        The advisor's estimate for the seat's hand. Its rollouts take tens of
+        milliseconds, so only the hand is copied here; ``process_command``
+        runs the returned callable after releasing ``command_lock``.
+        """
+        if self.state != "declaration":
+            return "Hints are only available during declarations."
+        from .advisor import advise  # the advisor scores rollouts with score_round above
+
+        hand = [str(card) for card in self.players[player_id].hand]
+        return lambda: advise(hand).describe()
+
     def handle_trump_declaration(self, command: str, player_id: int) -> str:
         parts = command.split()
         try:
@@ -149,9 +235,11 @@ class Game:
 
         if self.declaration_count > self.nPlayers:
             return self._complete_declaration_phase()
-        self.updatesForPlayers[self.current_turn].append(
-            f"{self.players[self.current_turn].name}'s turn to declare."
+        self.updates.publish(
+            f"{self.players[self.current_turn].name}'s turn to declare.",
+            recipient=self.current_turn,
         )
+        self.events.emit(events.DeclarationRequested(self.current_turn))
 
         return " "
 
@@ -179,6 +267,7 @@ class Game:
         self.highlight_until = 0.0
         self.last_trick_cards = []
         self.last_trick_expire = 0.0
+        self.round_plays = []
 
     @staticmethod
     def _team_for_player(player_id: int) -> str:
@@ -188,26 +277,128 @@ class Game:
         self.bot_manager = manager
         self.last_reset_message = None
 
-    def _check_player_timeouts(self) -> bool:
-        timed_out = [pid for pid, player in self.players.items() if player.time_since_last_update() > 60]
-        if timed_out:
-            names = [self.players[pid].name for pid in timed_out if pid in self.players]
-            name_text = ", ".join(names) if names else ", ".join(str(pid) for pid in timed_out)
-            reason = f"Inactivity timeout: {name_text}"
-            self._force_reset(reason)
-            return True
-        return False
+    def set_inactivity_timeout(self, seconds: float | None) -> None:
+        """Change the timeout (``None`` disables it) and re-arm every seat for it."""
+        self.inactivity_timeout = seconds
+        self._cancel_inactivity_timers()
+        for player in self.players.values():
+            self._arm_inactivity(player)
+
+    def check_inactivity(self, player: Player) -> bool:
+        """
+        Handle the seat's timer coming due; runs with the game to itself. Re-arms
+        from the seat's last activity if it has been heard from since, and
+        otherwise hands every quiet seat to ``on_inactive`` (default: reset the
+        table). True if the seat had timed out.
+        """
+        if self._inactivity_timers.pop(player, None) is None:
+            return False  # left, or the table was reset, since the timer was set
+        if player.in_process or self.inactivity_timeout is None:
+            return False
+        if player.time_since_last_update() < self.inactivity_timeout:
+            self._arm_inactivity(player)
+            return False
+        timed_out = [
+            other
+            for _, other in sorted(self.players.items())
+            if other.time_since_last_update() >= self.inactivity_timeout
+        ]
+        if self.on_inactive is not None:
+            self.on_inactive(self, timed_out)
+        else:
+            self._force_reset(f"Inactivity timeout: {', '.join(other.name for other in timed_out)}")
+        self.mark_changed()
+        return True
+
+    def _arm_inactivity(self, player: Player) -> None:
+        if self.inactivity_timeout is None or player.in_process:
+            return
+        deadline = player.last_update_time + self.inactivity_timeout
+        self._inactivity_timers[player] = self.timers.schedule(deadline, partial(self._inactivity_due, player))
+
+    def _inactivity_due(self, player: Player) -> None:
+        # On the wheel's thread: only pass the check on to whoever owns the game.
+        if self.dispatch_timer is not None:
+            self.dispatch_timer(partial(self.check_inactivity, player))
+            return
+        with self.command_lock:
+            self.check_inactivity(player)
+
+    def seat_bot(self, player_id: int, difficulty: str) -> None:
+        """Hand a seat taken with ``Hallo`` to an in-process bot (``BotManager`` calls this)."""
+        with self.command_lock:
+            player = self.players[player_id]
+            player.in_process = True
+            self.bot_seats[player] = difficulty
+            timer = self._inactivity_timers.pop(player, None)
+            if timer is not None:
+                timer.cancel()
+            self.broadcast_players(f"{player.name} has joined the table.")
+            self._record("bot", player.name, difficulty)
+
+    def apply_record(self, record: tuple) -> None:
+        """
+        Redo a change given to ``recorder``, on a game in the state it was made
+        from. Run without a bot manager attached: bots are seated by their own
+        ``bot`` records, so a ``bots`` command is a no-op here.
+        """
+        kind, *args, version = record
+        if kind == "command":
+            self.process_command(args[0])
+        elif kind == "bot":
+            name, difficulty = args
+            reply = self.process_command(f"Hallo, Eg eri {name}")
+            self.seat_bot(int(reply[1:]), difficulty)
+        elif kind == "leave":
+            self.remove_player(args[0])
+        elif kind == "reset":
+            self._force_reset(args[0])
+        else:
+            raise ValueError(f"Unknown record kind: {kind!r}")
+        self.state_version = version
+
+    def _record(self, kind: str, *args: object) -> None:
+        if self.recorder is not None:
+            self.recorder((kind, *args, self.state_version))
+
+    def close(self) -> None:
+        """Cancel the game's timers; for a table being put away (it can be restored later)."""
+        self._cancel_inactivity_timers()
+
+    def pending_prompt(self) -> events.GameEvent | None:
+        """
+        The request the seat whose turn it is is still waiting on, if any. Bots
+        seated on a restored game are sent it again, since they missed the original.
+        """
+        if not self.current_turn or self.current_turn not in self.players:
+            return None
+        if self.state == "deal":
+            return events.SplitRequested(self.current_turn)
+        if self.state == "declaration":
+            if self.declaration_count > self.nPlayers:
+                return events.SuitRequested(self.current_turn)
+            return events.DeclarationRequested(self.current_turn)
+        if self.state in {"first_card", "play"}:
+            return events.TurnToPlay(self.current_turn)
+        return None
+
+    def _cancel_inactivity_timers(self) -> None:
+        for timer in self._inactivity_timers.values():
+            timer.cancel()
+        self._inactivity_timers.clear()
+
+    def mark_changed(self) -> None:
+        self.state_version += 1
 
     def _force_reset(self, reason: str) -> None:
         message = f"Game reset due to inactivity. ({reason})"
-        for pid in list(self.updatesForPlayers.keys()):
-            self.updatesForPlayers[pid].append(message)
         self.deck = None
         self.table = None
         self.state = "init"
         self.game_over = True
+        self._cancel_inactivity_timers()
         self.players.clear()
-        self.updatesForPlayers.clear()
+        self.updates.clear()
         self.nPlayers = 0
         self.trump_length = 0
         self.trump_suit = None
@@ -228,11 +419,15 @@ class Game:
         self.scoreboard = {"Vit": 24, "Tit": 24}
         self.round_history = []
         self.next_game_bonus = 0
+        self.bot_seats.clear()
+        self.round_plays = []
         self.last_reset_message = message
+        self.mark_changed()
+        self._record("reset", reason)
 
     def _redeal_after_failed_declaration(self) -> None:
         self.deck = Deck()
-        self.deck.shuffle()
+        self.deck.shuffle(self.rng)
         self.table = None
         self._reset_round_state()
         for player in self.players.values():
@@ -244,7 +439,7 @@ class Game:
         if self.game_over:
             self.round_history = []
         self.deck = Deck()
-        self.deck.shuffle()
+        self.deck.shuffle(self.rng)
         self.table = None
         self._reset_round_state()
         for player in self.players.values():
@@ -289,21 +484,47 @@ class Game:
                         return "Deck ran out of cards while dealing."
         # Notify all players that cards have been dealt
         self.broadcast_players(f"Received {cards_per_player} cards.")
+        for pid, player in self.players.items():
+            self.events.emit(events.HandDealt(pid, tuple(str(card) for card in player.hand)))
 
         self.current_turn = (self.dealer_position + 1) % 4 or 4
         self.state = "declaration"
         self.broadcast_players(f"{self.players[self.current_turn].name} hvat meldar tú?")
+        self.events.emit(events.DeclarationRequested(self.current_turn))
         return " "
 
     def ask_for_split_or_banka(self, player_id: int) -> None:
         self.current_turn = player_id
-        self.updatesForPlayers[player_id].append("Choose 'split <position>' or 'banka'")
+        self.updates.publish("Choose 'split <position>' or 'banka'", recipient=player_id)
+        self.events.emit(events.SplitRequested(player_id))
 
     def broadcast_players(self, msg: str) -> None:
-        for player in self.players.values():
-            self.updatesForPlayers[player.id].append(msg)
+        if self.players:
+            self.updates.publish(msg)
+
+    def updates_since(self, player_id: int, seq: int) -> tuple[str, int]:
+        """
+        Messages for a seat published after ``seq``, and the seq to resume from.
+        Counts as a heartbeat and moves the seat's ``GU`` cursor to the end.
+        """
+        player = self.players.get(player_id)
+        if player is None:
+            return self.last_reset_message or "Player not found.", self.updates.last_seq
+        player.update_last_time()
+        events, missed = self.updates.since(player_id, seq)
+        self.updates.mark_read(player_id)
+        messages = [event.text for event in events]
+        if missed:
+            messages.insert(0, DROPPED_NOTICE)
+        return "\n".join(messages) or "No new updates.", self.updates.last_seq
 
     def remove_player(self, player_id: int) -> dict[int, int]:
+        with self.command_lock:
+            seat_map = self._remove_player(player_id)
+            self._record("leave", player_id)
+        return seat_map
+
+    def _remove_player(self, player_id: int) -> dict[int, int]:
         if self.state not in {"init", "lobby", "end"}:
             raise ValueError("Players can only leave from the lobby or after the game ends.")
         if player_id not in self.players:
@@ -311,33 +532,33 @@ class Game:
 
         was_end_state = self.state == "end"
         departing_name = self.players[player_id].name
+        self.bot_seats.pop(self.players[player_id], None)
+        timer = self._inactivity_timers.pop(self.players[player_id], None)
+        if timer is not None:
+            timer.cancel()
         remaining_players = [
             player
             for pid, player in sorted(self.players.items())
             if pid != player_id
         ]
-        old_updates = {
-            pid: list(messages)
-            for pid, messages in self.updatesForPlayers.items()
-            if pid != player_id
-        }
-
         self.players = {}
-        self.updatesForPlayers = defaultdict(list)
         seat_map: dict[int, int] = {}
 
         for new_id, player in enumerate(remaining_players, start=1):
             old_id = player.id
             player.id = new_id
             self.players[new_id] = player
-            self.updatesForPlayers[new_id].extend(old_updates.get(old_id, []))
             seat_map[old_id] = new_id
+        self.updates.remap(seat_map)
+        if self.bot_manager is not None:
+            self.bot_manager.remap(seat_map)
 
         self.nPlayers = len(self.players)
         self.current_turn = 0
         self.state = "end" if self.players and was_end_state else ("lobby" if self.players else "init")
         if self.players:
             self.broadcast_players(f"{departing_name} left the table.")
+        self.mark_changed()
         return seat_map
 
     def process_command(self, command: str) -> str:
@@ -399,7 +620,8 @@ class Game:
                 " ": all good
 
         `GU`:
-            heart beat, sends updates to player
+            heart beat, sends the player's unread updates and advances their cursor
+            in the game's bounded update log (see ``server.updates``)
             return:
                 "No new updates."
                 "Player not found."
@@ -418,24 +640,42 @@ class Game:
             return:
                  "Unknown command."
         """
+        with self.command_lock:
+            self._command_depth += 1
+            try:
+                reply = self._run_command(command)
+            finally:
+                self._command_depth -= 1
+            # Bump after the command so a snapshot taken mid-command is never
+            # cached under the new version.
+            _, _, rest = command.partition(" ")
+            if not (command.startswith("P") and rest.strip().lower().startswith(READ_ONLY_COMMANDS)):
+                self.mark_changed()
+                # Commands issued from inside a command are redone by the outer one.
+                if not self._command_depth:
+                    self._record("command", command)
+        if callable(reply):
+            reply = reply()  # work a read-only command left for outside the lock
+        return reply
+
+    def _run_command(self, command: str) -> Union[str, Callable[[], str]]:
         #print(command)
         if command.startswith("Hallo"):
-            self._check_player_timeouts()
             if self.nPlayers >= 4:
                 return "full"
             self.nPlayers += 1
             name = command[14:].strip() or f"Player {self.nPlayers}"
-            self.players[self.nPlayers] = Player(name, self.nPlayers)
-            # Touch the defaultdict so the list exists for subsequent updates.
-            self.updatesForPlayers[self.nPlayers]
+            player = Player(name, self.nPlayers)
+            self.players[self.nPlayers] = player
+            self._arm_inactivity(player)
+            # Start the seat's cursor here so it only sees updates from now on.
+            self.updates.register(self.nPlayers)
             self.state = "lobby"
             self.broadcast_players(f"{name} joined the lobby.")
             self.last_reset_message = None
             return f"P{self.nPlayers}"
 
         elif command.startswith("P"):
-            if self._check_player_timeouts():
-                return self.last_reset_message or "Game reset. Please rejoin."
             player_segment, sep, rest = command.partition(" ")
             try:
                 player_id = int(player_segment[1:])
@@ -494,6 +734,8 @@ class Game:
                 return "Not Implemented"
             elif normalized == "maxmeld":
                 return str(self.players[player_id].find_highest_trump_declaration())
+            elif normalized == "hint":
+                return self._declaration_hint(player_id)
             elif command.upper() == "MA":
                 for i in [2, 3, 4, 1]:
                     tmp = self.players[i].find_highest_trump_declaration()
@@ -537,53 +779,7 @@ class Game:
                 parts = command.split()
                 if len(parts) < 2:
                     return "Invalid card"
-                if not self.table:
-                    return "No active trick."
-                card = parts[1]
-                if self.current_turn != player_id:
-                    return "Not your turn"
-                current_player = self.players[player_id]
-                if self.state == "first_card":
-                    tmp = self.table.play_first_card(card, current_player)
-                    if tmp == "OK":
-                        self.broadcast_players(
-                            f"{player_id} Player {current_player.name} has played {card}"
-                        )
-                        self.state = "play"
-                        self.current_turn = ((self.current_turn + 1) % 4) or 4
-                        self.updatesForPlayers[self.current_turn].append("Your turn!")
-                    return tmp
-                if self.state == "play":
-                    tmp = self.table.play_other_card(card, current_player)
-                    if tmp == "OK":
-                        self.broadcast_players(
-                            f"{player_id} Player {current_player.name} has played {card}"
-                        )
-                        if len(self.table.cards) == 4:
-                            trick_snapshot = [
-                                (owner.id, str(card))
-                                for owner, card in zip(self.table.cardOwners, self.table.cards)
-                            ]
-                            winner = self.table.clear_and_reset()
-                            self.last_trick_cards = trick_snapshot
-                            self.last_trick_expire = time.time() + 5.0
-                            self.trick_winners.append(winner)
-                            self.current_turn = winner
-                            self.broadcast_players(
-                                f"Player {self.players[self.current_turn].name} vann"
-                            )
-                            self.last_trick_winner = winner
-                            self.highlight_until = time.time() + 2.5
-                            if any(player.hand for player in self.players.values()):
-                                self.state = "first_card"
-                                self.updatesForPlayers[self.current_turn].append("Play a card")
-                            else:
-                                self._complete_round()
-                        else:
-                            self.current_turn = ((self.current_turn + 1) % 4) or 4
-                            self.updatesForPlayers[self.current_turn].append("Your turn!")
-                    return tmp
-                return "Okkurt er galið"
+                return self.play_card(player_id, parts[1])
 
             elif normalized.startswith("split"):
                 # Here, the deck is split and dealt in fours
@@ -611,11 +807,9 @@ class Game:
                 player = self.players.get(target_id)
                 if player:
                     player.update_last_time()  # Update the player's last interaction time
-                    updates = self.updatesForPlayers.get(target_id, [])
+                    updates = self.updates.read(target_id)
                     if updates:
-                        response = "\n".join(updates)
-                        self.updatesForPlayers[target_id].clear()
-                        return response
+                        return "\n".join(updates)
                     return "No new updates."
                 return "Player not found."
             elif normalized.startswith("show"):
@@ -628,9 +822,7 @@ class Game:
                     return "Invalid deal command."
                 for pid, player in self.players.items():
                     player.draw(self.deck, num_cards)  # Assuming draw method can handle the deck directly
-                    self.updatesForPlayers[pid].append(
-                        f"{num_cards} cards dealt to {player.name}"
-                    )
+                    self.updates.publish(f"{num_cards} cards dealt to {player.name}", recipient=pid)
                 return "Dealt cards to each player."
 
             elif normalized == "quit":
@@ -639,6 +831,62 @@ class Game:
 
             return "Unknown command."
 
+    def play_card(self, player_id: int, card: str) -> str:
+        if not self.table:
+            return "No active trick."
+        if self.current_turn != player_id:
+            return "Not your turn"
+        current_player = self.players[player_id]
+        if self.state == "first_card":
+            tmp = self.table.play_first_card(card, current_player)
+            if tmp == "OK":
+                self.broadcast_players(
+                    f"{player_id} Player {current_player.name} has played {card}"
+                )
+                self.events.emit(events.CardPlayed(player_id, str(self.table.cards[-1])))
+                self.round_plays.append((player_id, str(self.table.cards[-1])))
+                self.state = "play"
+                self.current_turn = ((self.current_turn + 1) % 4) or 4
+                self.updates.publish("Your turn!", recipient=self.current_turn)
+                self.events.emit(events.TurnToPlay(self.current_turn))
+            return tmp
+        if self.state == "play":
+            tmp = self.table.play_other_card(card, current_player)
+            if tmp == "OK":
+                self.broadcast_players(
+                    f"{player_id} Player {current_player.name} has played {card}"
+                )
+                self.events.emit(events.CardPlayed(player_id, str(self.table.cards[-1])))
+                self.round_plays.append((player_id, str(self.table.cards[-1])))
+                if len(self.table.cards) == 4:
+                    trick_snapshot = [
+                        (owner.id, str(card))
+                        for owner, card in zip(self.table.cardOwners, self.table.cards)
+                    ]
+                    winner = self.table.clear_and_reset()
+                    self.last_trick_cards = trick_snapshot
+                    self.last_trick_expire = time.time() + 5.0
+                    self.trick_winners.append(winner)
+                    self.current_turn = winner
+                    self.broadcast_players(
+                        f"Player {self.players[self.current_turn].name} vann"
+                    )
+                    self.events.emit(events.TrickWon(winner, tuple(trick_snapshot)))
+                    self.last_trick_winner = winner
+                    self.highlight_until = time.time() + 2.5
+                    if any(player.hand for player in self.players.values()):
+                        self.state = "first_card"
+                        self.updates.publish("Play a card", recipient=self.current_turn)
+                        self.events.emit(events.TurnToPlay(self.current_turn))
+                    else:
+                        self._complete_round()
+                else:
+                    self.current_turn = ((self.current_turn + 1) % 4) or 4
+                    self.updates.publish("Your turn!", recipient=self.current_turn)
+                    self.events.emit(events.TurnToPlay(self.current_turn))
+            return tmp
+        return "Okkurt er galið"
+
     def _complete_round(self) -> None:
         if not self.table:
             return
@@ -657,12 +905,14 @@ class Game:
         )
         for msg in messages:
             self.broadcast_players(msg)
+        self.events.emit(events.RoundFinished(vit_points, tit_points))
 
         # Reset table state for the next round or match.
         self.table.cards.clear()
         self.table.cardOwners.clear()
         self.table.firstCard = None
         self.table.team_piles = {'Vit': [], 'Tit': []}
+        self.table.pile_masks = {'Vit': 0, 'Tit': 0}
         self.last_trick_cards = []
         self.last_trick_expire = 0.0
 
@@ -709,38 +959,8 @@ class Game:
             and self._team_for_player(self.trick_winners[0]) == declarer_team
         )
 
-        winning_team = declarer_team
-        base_points = 0
-        reason = ""
-
-        if single_player_sweep:
-            winning_team = declarer_team
-            base_points = 24 if clubs_trump else 16
-            reason = "Single player from declarer's side won every trick"
-        elif declarer_points == 120:
-            winning_team = declarer_team
-            base_points = 16 if clubs_trump else 12
-            reason = "Declarer side won every trick"
-        elif declarer_points >= 90:
-            winning_team = declarer_team
-            base_points = 8 if clubs_trump else 4
-            reason = "Declarer side scored 90-120 points"
-        elif declarer_points >= 61:
-            winning_team = declarer_team
-            base_points = 4 if clubs_trump else 2
-            reason = "Declarer side scored 61-89 points"
-        elif declarer_points >= 31:
-            winning_team = defenders_team
-            base_points = 8 if clubs_trump else 4
-            reason = "Defenders held declarers to 31-59 points"
-        else:
-            winning_team = defenders_team
-            if declarer_points == 0:
-                base_points = 16
-                reason = "Defenders won every trick"
-            else:
-                base_points = 16 if clubs_trump else 8
-                reason = "Defenders held declarers under 31 points"
+        declarers_win, base_points, reason = score_round(declarer_points, clubs_trump, single_player_sweep)
+        winning_team = declarer_team if declarers_win else defenders_team
 
         bonus_applied = self.next_game_bonus
         total_award = base_points + bonus_applied
@@ -0,0 +1,408 @@
+"""
+Write-ahead command log and snapshots, so live tables survive a restart.
+
+A journaled ``Game`` hands every change to ``Game.recorder`` while it holds
+``command_lock``. That covers each command that is not read-only, each bot
+seated, each seat that leaves and each reset (see ``Game.apply_record``).
+The journal numbers the records per game and puts them on a queue, so
+nothing touches the disk on the caller's thread. One writer thread takes
+whatever has queued up and commits it to SQLite in a single transaction.
+That is group commit: under load one commit covers many commands, and no
+command waits for one.
+
+Every ``snapshot_every`` records the game is snapshotted as well, with the
+same compact state ``server.snapshot`` uses for hibernation. The snapshot
+deletes the log rows it covers, so no table's log grows past that.
+``restore`` reads each game's snapshot, replays the log after it through
+``apply_record``, and hands the games back with their bots and sessions.
+
+The database runs in WAL mode with ``synchronous=NORMAL``. A commit survives
+the process dying, which is what a restart is, but a power cut may lose the
+last few. Records still queued when the process dies are lost too, so call
+``flush`` or ``close`` on shutdown. A batch that fails to commit goes back on
+the queue and is retried until it lands; ``stats`` counts the failures, and
+``flush`` reports False while they last. Journaled games get their own
+``random.Random``, saved with each snapshot, so a replayed deal is shuffled
+the way it was the first time.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sqlite3
+import threading
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .bot_player import DIFFICULTY_STRATEGIES
+from .game import Game
+from .snapshot import decode, encode, game_state, restore_game
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "data" / "journal.sqlite3"
+# Names the journal file for ``journal_path``; set but empty turns journaling off.
+JOURNAL_ENV = "SJAVS_JOURNAL"
+# Records between snapshots of a game; a restore replays at most this many.
+SNAPSHOT_EVERY = 200
+# Seconds before a batch that failed to commit is tried again.
+RETRY_DELAY = 0.5
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS games (game_id TEXT PRIMARY KEY, meta TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS snapshots (game_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, state BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS records ("
+    "game_id TEXT NOT NULL, seq INTEGER NOT NULL, record TEXT NOT NULL, "
+    "PRIMARY KEY (game_id, seq)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS sessions (token TEXT PRIMARY KEY, game_id TEXT NOT NULL, session TEXT NOT NULL)",
+)
+
+
+@dataclass(frozen=True)
+class JournalStats:
+    records: int  # records appended
+    snapshots: int  # snapshots queued, including one per ``attach``
+    commits: int  # transactions
+    operations: int  # rows written or deleted by those transactions, in queue entries
+    largest_batch: int
+    queued: int  # entries waiting for the writer, including any that failed to commit
+    failures: int  # commits that raised and were retried
+    last_error: Optional[str]  # of the most recent failure, cleared by the next commit
+
+    @property
+    def batch_size(self) -> float:
+        return self.operations / self.commits if self.commits else 0.0
+
+
+@dataclass
+class RestoredTable:
+    game_id: str
+    meta: Dict[str, Any]
+    game: Game
+    # For ``BotManager.restore_bots``.
+    bots: List[dict]
+    # token -> session, for the tokens journaled with ``put_session``.
+    sessions: Dict[str, Dict[str, Any]]
+    replayed: int  # log records applied after the snapshot
+
+
+@dataclass
+class _GameLog:
+    game: Game
+    meta: Dict[str, Any]
+    seq: int = 0  # of the last record
+    since_snapshot: int = 0
+
+
+class Journal:
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_PATH,
+        snapshot_every: int = SNAPSHOT_EVERY,
+        verbose: bool = False,
+    ) -> None:
+        if snapshot_every < 1:
+            raise ValueError("A journal needs to snapshot at least every so many records.")
+        self.path = Path(path)
+        self.snapshot_every = snapshot_every
+        self.verbose = verbose
+        self._logs: Dict[str, _GameLog] = {}
+        # Last seq of games read back by ``restore`` and not attached again yet.
+        self._restored: Dict[str, int] = {}
+        self._ops: List[tuple] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._queued = 0
+        self._committed = 0
+        self._records = 0
+        self._snapshots = 0
+        self._commits = 0
+        self._largest_batch = 0
+        self._failures = 0
+        self._last_error: Optional[str] = None
+
+    # ------------- games -------------
+    def attach(self, game_id: str, game: Game, meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Journal ``game`` under ``game_id`` from now on, starting with a snapshot
+        of it as it is. A game attached again under the same id (woken from
+        hibernation, or restored) carries on its log. ``meta`` is handed back
+        by ``restore``; it is kept from the last attach if omitted.
+        """
+        with game.command_lock:
+            if game.rng is None:
+                game.rng = random.Random()
+            data = game_state(game)
+            with self._condition:
+                previous = self._logs.get(game_id)
+                seq = previous.seq if previous is not None else self._restored.pop(game_id, 0)
+                if meta is None:
+                    meta = previous.meta if previous is not None else {}
+                self._logs[game_id] = _GameLog(game, dict(meta), seq)
+                self._snapshots += 1
+                self._enqueue(("game", game_id, dict(meta)), ("snapshot", game_id, seq, data))
+            game.recorder = partial(self._record, game_id, game)
+
+    def drop(self, game_id: str) -> None:
+        """Forget a game that is gone for good, with its sessions."""
+        with self._condition:
+            log = self._logs.pop(game_id, None)
+            self._restored.pop(game_id, None)
+            self._enqueue(("drop", game_id))
+        if log is not None:
+            log.game.recorder = None
+
+    def put_session(self, token: str, game_id: str, session: Dict[str, Any]) -> None:
+        """Save (or update) a client's session with the game it is seated at."""
+        with self._condition:
+            self._enqueue(("session", token, game_id, dict(session)))
+
+    def drop_session(self, token: str) -> None:
+        with self._condition:
+            self._enqueue(("unsession", token))
+
+    def _record(self, game_id: str, game: Game, record: tuple) -> None:
+        # Called by the game under its ``command_lock``, which keeps its records in order.
+        with self._condition:
+            log = self._logs.get(game_id)
+            if log is None or log.game is not game or self._stopped:
+                return
+            log.seq += 1
+            log.since_snapshot += 1
+            self._records += 1
+            self._enqueue(("record", game_id, log.seq, record))
+            if log.since_snapshot < self.snapshot_every:
+                return
+            log.since_snapshot = 0
+            seq = log.seq
+        # Still under the game's ``command_lock``, so the snapshot matches ``seq``.
+        # It is copied out here and encoded by the writer; other games'
+        # records do not wait for it.
+        data = game_state(game)
+        with self._condition:
+            self._snapshots += 1
+            self._enqueue(("snapshot", game_id, seq, data))
+
+    # ------------- reading back -------------
+    def restore(self, **game_kwargs: Any) -> List[RestoredTable]:
+        """
+        Every journaled game as of its last committed record. Call it before
+        anything is attached, and attach each game again under its id to keep
+        journaling it. Seats get a fresh inactivity clock, so the time the
+        server was down does not count against anyone. ``game_kwargs`` go to
+        ``Game``.
+        """
+        tables: List[RestoredTable] = []
+        db = self._connect()
+        try:
+            for game_id, meta in db.execute("SELECT game_id, meta FROM games").fetchall():
+                row = db.execute("SELECT seq, state FROM snapshots WHERE game_id = ?", (game_id,)).fetchone()
+                if row is None:
+                    continue
+                last, blob = row
+                game = restore_game(decode(blob), **game_kwargs)
+                records = db.execute(
+                    "SELECT seq, record FROM records WHERE game_id = ? AND seq > ? ORDER BY seq",
+                    (game_id, last),
+                ).fetchall()
+                if records:
+                    # Numbering carries on after the newest row, replayed or not.
+                    last = records[-1][0]
+                replayed = 0
+                for seq, text in records:
+                    try:
+                        game.apply_record(tuple(json.loads(text)))
+                    except Exception as exc:  # noqa: BLE001 - keep the table as far as it got
+                        print(f"[Journal] {game_id}: could not replay record {seq}: {exc}")
+                        break
+                    replayed += 1
+                sessions = {
+                    token: json.loads(session)
+                    for token, session in db.execute(
+                        "SELECT token, session FROM sessions WHERE game_id = ?", (game_id,)
+                    )
+                }
+                for player in game.players.values():
+                    player.update_last_time()
+                game.set_inactivity_timeout(game.inactivity_timeout)
+                # Whatever clients have cached is from before the restart.
+                game.mark_changed()
+                with self._condition:
+                    self._restored[game_id] = last
+                tables.append(
+                    RestoredTable(game_id, json.loads(meta), game, bot_states(game), sessions, replayed)
+                )
+        finally:
+            db.close()
+        return tables
+
+    # ------------- writer -------------
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is committed; False on timeout or if the writer gave up."""
+        with self._condition:
+            target = self._queued
+            self._condition.wait_for(lambda: self._committed >= target or self._thread is None, timeout)
+            return self._committed >= target
+
+    def pending(self) -> int:
+        with self._condition:
+            return self._queued - self._committed
+
+    def stats(self) -> JournalStats:
+        with self._condition:
+            return JournalStats(
+                records=self._records,
+                snapshots=self._snapshots,
+                commits=self._commits,
+                operations=self._committed,
+                largest_batch=self._largest_batch,
+                queued=self._queued - self._committed,
+                failures=self._failures,
+                last_error=self._last_error,
+            )
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """
+        Commit what is queued and stop the writer; later records are dropped.
+        If a commit fails after this, the writer stops without retrying it.
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _enqueue(self, *ops: tuple) -> None:
+        # Called with ``_condition`` held.
+        if self._stopped:
+            return
+        self._ops.extend(ops)
+        self._queued += len(ops)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+            self._thread.start()
+        elif len(self._ops) == len(ops):
+            self._condition.notify_all()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        with db:
+            for statement in SCHEMA:
+                db.execute(statement)
+        return db
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(f"[Journal] {message}")
+
+    def _run(self) -> None:
+        db = self._connect()
+        try:
+            while True:
+                with self._condition:
+                    while not self._ops and not self._stopped:
+                        self._condition.wait()
+                    if not self._ops:
+                        return
+                    batch, self._ops = self._ops, []
+                try:
+                    with db:
+                        for op in batch:
+                            self._apply(db, op)
+                except sqlite3.Error as exc:
+                    # The transaction was rolled back. Later records build on
+                    # these, so they go back first and nothing counts as committed.
+                    print(f"[Journal] could not commit {len(batch)} entries: {exc}")
+                    with self._condition:
+                        self._ops[:0] = batch
+                        self._failures += 1
+                        self._last_error = str(exc)
+                        self._condition.notify_all()
+                        if self._stopped:
+                            return
+                        self._condition.wait_for(lambda: self._stopped, RETRY_DELAY)
+                    continue
+                self._log(f"committed {len(batch)} entries")
+                with self._condition:
+                    self._committed += len(batch)
+                    self._commits += 1
+                    self._largest_batch = max(self._largest_batch, len(batch))
+                    self._last_error = None
+                    self._condition.notify_all()
+        finally:
+            db.close()
+            with self._condition:
+                self._thread = None
+                self._condition.notify_all()
+
+    @staticmethod
+    def _apply(db: sqlite3.Connection, op: tuple) -> None:
+        kind = op[0]
+        if kind == "record":
+            _, game_id, seq, record = op
+            db.execute(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?)",
+                (game_id, seq, json.dumps(record, separators=(",", ":"))),
+            )
+        elif kind == "snapshot":
+            _, game_id, seq, data = op
+            db.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", (game_id, seq, encode(data)))
+            db.execute("DELETE FROM records WHERE game_id = ? AND seq <= ?", (game_id, seq))
+        elif kind == "game":
+            _, game_id, meta = op
+            db.execute("INSERT OR REPLACE INTO games VALUES (?, ?)", (game_id, json.dumps(meta)))
+        elif kind == "drop":
+            _, game_id = op
+            for table in ("games", "snapshots", "records", "sessions"):
+                db.execute(f"DELETE FROM {table} WHERE game_id = ?", (game_id,))
+        elif kind == "session":
+            _, token, game_id, session = op
+            db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (token, game_id, json.dumps(session)))
+        elif kind == "unsession":
+            db.execute("DELETE FROM sessions WHERE token = ?", (op[1],))
+
+
+def bot_states(game: Game) -> List[dict]:
+    """
+    ``BotBrain.export_state`` for each bot seat, worked out from the game
+    itself: the round's plays and tricks, and the trump once play has begun.
+    A bot restored from it has forgotten only its advisor's suggestion.
+    """
+    in_play = game.state in {"first_card", "play"}
+    states = []
+    for pid, player in sorted(game.players.items()):
+        difficulty = game.bot_seats.get(player)
+        if difficulty is None:
+            continue
+        declared = player.find_highest_trump_declaration()
+        states.append(
+            {
+                "player_id": pid,
+                "name": player.name,
+                "difficulty": difficulty,
+                "strategies": list(DIFFICULTY_STRATEGIES[difficulty]),
+                "trump": game.trump_suit if in_play else None,
+                "declarer": game.trump_owner.id if in_play and game.trump_owner is not None else None,
+                "plays": [list(play) for play in game.round_plays],
+                "trick_winners": list(game.trick_winners),
+                "last_declared_suits": "".join(ch for ch in declared if ch.isalpha()).upper(),
+                "advised_suit": None,
+                "deal_choice_needed": True,
+            }
+        )
+    return states
+
+
+def journal_path() -> Optional[Path]:
+    """The file named by ``$SJAVS_JOURNAL``, ``DEFAULT_PATH`` if it is unset, or None if it is empty."""
+    value = os.environ.get(JOURNAL_ENV)
+    if value is None:
+        return DEFAULT_PATH
+    return Path(value) if value.strip() else None
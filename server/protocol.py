@@ -0,0 +1,178 @@
+r"""
+Framed TCP wire protocol (``SJAVS/1``).
+
+Legacy clients send one command per ``recv`` and get an unframed reply. A
+client opts into framing in its handshake by sending one newline-terminated
+line before anything else::
+
+    Hallo SJAVS/1, Eg eri Anna\n     (join a seat, as ``Hallo, Eg eri Anna``)
+    Hallo SJAVS/1\n                  (framing only, e.g. for a shared connection)
+
+The server answers with one line, ``SJAVS/1 <reply>\n``, where the reply is
+the game's answer to the join (``P1``, ``full``) or ``OK``. From then on both
+directions exchange frames::
+
+    !II header (payload length, request id) + UTF-8 payload
+
+Many frames may share a packet and many may be in flight. The server answers
+each with a frame carrying the same request id, in the order received.
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PROTOCOL = "SJAVS/1"
+HANDSHAKE_PREFIX = f"Hallo {PROTOCOL}".encode()
+HEADER = struct.Struct("!II")
+MAX_FRAME_SIZE = 1 << 20
+MAX_HANDSHAKE_SIZE = 1024
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_frame(request_id: int, text: str) -> bytes:
+    payload = text.encode()
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}.")
+    return HEADER.pack(len(payload), request_id) + payload
+
+
+def parse_handshake(line: str) -> Optional[str]:
+    """
+    Return the game command carried by a framed handshake line (``""`` when it
+    only negotiates framing), or ``None`` if the line is not a framed handshake.
+    """
+    line = line.strip()
+    if not line.startswith(HANDSHAKE_PREFIX.decode()):
+        return None
+    rest = line[len(HANDSHAKE_PREFIX):].strip()
+    if not rest:
+        return ""
+    if not rest.startswith(","):
+        return None  # e.g. a protocol version this server does not speak
+    return f"Hallo{rest}"
+
+
+def handshake_reply(reply: str) -> bytes:
+    return f"{PROTOCOL} {reply}\n".encode()
+
+
+class FrameBuffer:
+    """Accumulates received bytes and splits complete frames off the front."""
+
+    def __init__(self, data: bytes = b"") -> None:
+        self._data = bytearray(data)
+
+    def feed(self, data: bytes) -> None:
+        self._data += data
+
+    def next_frame(self) -> Optional[Tuple[int, str]]:
+        if len(self._data) < HEADER.size:
+            return None
+        length, request_id = HEADER.unpack_from(self._data)
+        if length > MAX_FRAME_SIZE:
+            raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_FRAME_SIZE}.")
+        end = HEADER.size + length
+        if len(self._data) < end:
+            return None
+        payload = bytes(self._data[HEADER.size:end])
+        del self._data[:end]
+        return request_id, payload.decode()
+
+
+class FramedClient:
+    """
+    Blocking client for one framed connection. Safe to share between threads:
+    sends are serialized and each caller waits for the reply with its own id.
+    """
+
+    def __init__(self, sock: socket.socket, greeting: str) -> None:
+        self._sock = sock
+        self.greeting = greeting  # the server's answer to the handshake
+        self._buffer = FrameBuffer()
+        self._send_lock = threading.Lock()
+        self._recv_lock = threading.Lock()
+        self._replies: Dict[int, str] = {}
+        self._next_id = 0
+
+    @classmethod
+    def connect(
+        cls,
+        host: str,
+        port: int,
+        name: Optional[str] = None,
+        timeout: Optional[float] = 3.0,
+    ) -> "FramedClient":
+        sock = socket.create_connection((host, port), timeout=timeout)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            line = HANDSHAKE_PREFIX.decode() + (f", Eg eri {name}" if name else "")
+            sock.sendall(line.encode() + b"\n")
+            greeting, leftover = _read_line(sock)
+        except BaseException:
+            sock.close()
+            raise
+        prefix = f"{PROTOCOL} "
+        if not greeting.startswith(prefix):
+            sock.close()
+            raise ProtocolError(f"Server did not accept {PROTOCOL}: {greeting!r}")
+        client = cls(sock, greeting[len(prefix):])
+        client._buffer.feed(leftover)
+        return client
+
+    def request(self, command: str) -> str:
+        return self.pipeline([command])[0]
+
+    def pipeline(self, commands: Iterable[str]) -> List[str]:
+        """Send every command in one write and return the replies in order."""
+        with self._send_lock:
+            ids = []
+            packet = bytearray()
+            for command in commands:
+                self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+                ids.append(self._next_id)
+                packet += encode_frame(self._next_id, command)
+            self._sock.sendall(packet)
+        return [self._wait_for(request_id) for request_id in ids]
+
+    def close(self) -> None:
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+    def _wait_for(self, request_id: int) -> str:
+        while True:
+            with self._recv_lock:
+                if request_id in self._replies:
+                    return self._replies.pop(request_id)
+                frame = self._buffer.next_frame()
+                if frame is None:
+                    data = self._sock.recv(65536)
+                    if not data:
+                        raise ConnectionError("Server closed the connection.")
+                    self._buffer.feed(data)
+                    continue
+                reply_id, text = frame
+                if reply_id == request_id:
+                    return text
+                self._replies[reply_id] = text
+
+
+def _read_line(sock: socket.socket) -> Tuple[str, bytes]:
+    data = b""
+    while b"\n" not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("Server closed the connection during the handshake.")
+        data += chunk
+        if len(data) > MAX_HANDSHAKE_SIZE:
+            raise ProtocolError("Handshake reply too long.")
+    line, _, rest = data.partition(b"\n")
+    return line.decode(), rest
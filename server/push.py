@@ -0,0 +1,68 @@
+"""
+Per-game fan-out of update events to push subscribers (the ``/ws`` sockets).
+
+A ``GameFeed`` listens on one game's ``UpdateLog``. Each published event is
+encoded to JSON exactly once, then handed to every subscriber whose seat may
+see it: broadcasts go to all seats, private messages only to their recipient.
+Subscribers supply a ``deliver`` callable that must not block; the web layer
+passes one that hops onto the socket's event loop.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from typing import Callable, Dict, Tuple
+
+from .updates import UpdateEvent, UpdateLog
+
+SeatFn = Callable[[], int]
+DeliverFn = Callable[[str], None]
+
+
+def encode_update(event: UpdateEvent) -> str:
+    return json.dumps({"type": "update", "seq": event.seq, "message": event.text})
+
+
+class GameFeed:
+    def __init__(self, log: UpdateLog) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Tuple[SeatFn, DeliverFn]] = {}
+        self._next_id = 0
+        self.encoded = 0  # events serialized, for tests and metrics
+        self._remove_listener = log.add_listener(self._on_event)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, seat: SeatFn, deliver: DeliverFn) -> Callable[[], None]:
+        """
+        Register a subscriber and return its unsubscribe function. ``seat`` is
+        re-read for every event because seats are renumbered when players leave.
+        """
+        with self._lock:
+            self._next_id += 1
+            subscriber_id = self._next_id
+            self._subscribers[subscriber_id] = (seat, deliver)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers.pop(subscriber_id, None)
+
+        return unsubscribe
+
+    def close(self) -> None:
+        self._remove_listener()
+        with self._lock:
+            self._subscribers.clear()
+
+    def _on_event(self, event: UpdateEvent) -> None:
+        with self._lock:
+            if not self._subscribers:
+                return
+            subscribers = list(self._subscribers.values())
+            self.encoded += 1
+        payload = encode_update(event)
+        for seat, deliver in subscribers:
+            if event.visible_to(seat()):
+                deliver(payload)
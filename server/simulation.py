@@ -0,0 +1,223 @@
+"""
+Headless, thread-free driver for whole Sjavs deals and rubbers.
+
+``HeadlessTable`` seats four ``BotBrain`` deciders at a ``Game`` and walks it
+through deal -> declaration -> play -> ``_complete_round`` by calling the
+game's methods and the bots' decision hooks directly. There is no transport,
+no polling thread and no sleeping, so thousands of rubbers run per minute.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+from . import cards
+from .bot_player import BotBrain, DIFFICULTY_STRATEGIES
+from .game import Game
+from .utils import Card, Player
+
+StrategySpec = Union[str, Sequence[str]]
+
+SUIT_NAMES = {"C": "Clubs", "D": "Diamonds", "H": "Hearts", "S": "Spades"}
+VALUE_FOR_RANK = {"A": 1, "K": 13, "Q": 12, "J": 11, "T": 10, "9": 9, "8": 8, "7": 7}
+
+
+def resolve_strategies(spec: StrategySpec) -> List[str]:
+    """Accept a difficulty name (``"hard"``) or an explicit strategy list."""
+    if isinstance(spec, str):
+        try:
+            return list(DIFFICULTY_STRATEGIES[spec.lower()])
+        except KeyError:
+            raise ValueError(f"Unknown bot difficulty: {spec}.") from None
+    return list(spec)
+
+
+def make_deck(codes: Sequence[str]) -> List[Card]:
+    return [Card(SUIT_NAMES[code[1]], VALUE_FOR_RANK[code[0]]) for code in codes]
+
+
+def shuffled_codes(rng: random.Random) -> List[str]:
+    codes = list(cards.CARD_CODES)
+    rng.shuffle(codes)
+    return codes
+
+
+def _no_transport(_payload: str) -> str:
+    raise RuntimeError("Headless bots do not use a command transport.")
+
+
+@dataclass
+class DealResult:
+    passed_out: bool
+    declarer_team: Optional[str] = None
+    trump: Optional[str] = None
+    card_points: Dict[str, int] = field(default_factory=lambda: {"Vit": 0, "Tit": 0})
+    # Rubber points each team took off its 24 in this deal.
+    game_points: Dict[str, int] = field(default_factory=lambda: {"Vit": 0, "Tit": 0})
+    trick_winners: List[int] = field(default_factory=list)
+
+
+@dataclass
+class RubberResult:
+    winner: Optional[str]
+    scoreboard: Dict[str, int]
+    deals: List[DealResult]
+
+    @property
+    def rounds(self) -> int:
+        return sum(1 for deal in self.deals if not deal.passed_out)
+
+
+class HeadlessTable:
+    def __init__(
+        self,
+        seat_strategies: Sequence[StrategySpec],
+        seed: Optional[int] = None,
+    ) -> None:
+        if len(seat_strategies) != 4:
+            raise ValueError("A Sjavs table needs exactly four seats.")
+        # Deck shuffles and bot choices use separate generators, so rotating
+        # strategies between seats leaves the sequence of deals unchanged.
+        self.deal_rng = random.Random(seed)
+        self.game = Game(rng=self.deal_rng)
+        self.bots: Dict[int, BotBrain] = {}
+        for pid, spec in enumerate(seat_strategies, start=1):
+            name = f"Seat{pid}"
+            self.game.players[pid] = Player(name, pid)
+            bot = BotBrain(
+                name=name,
+                send_fn=_no_transport,
+                strategy_names=resolve_strategies(spec),
+                rng=random.Random(None if seed is None else seed * 4 + pid),
+            )
+            bot.player_id = pid
+            self.bots[pid] = bot
+        self.game.nPlayers = 4
+        self.game.state = "lobby"
+
+    # ------------- public drivers -------------
+    def play_rubber(self, max_deals: int = 500) -> RubberResult:
+        """Play deals until one side reaches zero (or ``max_deals`` is hit)."""
+        game = self.game
+        game.scoreboard = {"Vit": 24, "Tit": 24}
+        game.next_game_bonus = 0
+        game.game_over = True
+        self._reset_bots()
+        game.setup_game()
+        deals: List[DealResult] = []
+        while game.state != "end" and len(deals) < max_deals:
+            deals.append(self._play_current_deal())
+        winner = next((team for team, score in game.scoreboard.items() if score <= 0), None)
+        return RubberResult(winner=winner, scoreboard=dict(game.scoreboard), deals=deals)
+
+    def play_deal(self, deck: Sequence[str], dealer: int = 1) -> DealResult:
+        """
+        Play one isolated deal from a fixed deck order (dealt 8-8, no cut).
+
+        The scoreboard starts from 24-24, so ``game_points`` reflects this deal
+        alone. Used for duplicate comparisons where the same cards are replayed
+        with the strategies rotated between seats.
+        """
+        game = self.game
+        game.scoreboard = {"Vit": 24, "Tit": 24}
+        game.next_game_bonus = 0
+        game.game_over = True
+        game.dealer_position = dealer
+        self._reset_bots()
+        game.setup_game()
+        game.deck.cards = make_deck(deck)
+        return self._play_current_deal(banka=True)
+
+    # ------------- deal loop -------------
+    def _reset_bots(self) -> None:
+        for bot in self.bots.values():
+            bot.on_redeal()
+
+    def _play_current_deal(self, banka: bool = False) -> DealResult:
+        game = self.game
+        self._deal(banka)
+        self._declare()
+        if game.state == "deal":
+            for bot in self.bots.values():
+                bot.on_redeal()
+            return DealResult(passed_out=True)
+
+        declarer_team = game.declaration_team
+        trump = game.trump_suit
+        before = dict(game.scoreboard)
+        trick_winners = self._play_tricks()
+        history = game.round_history[-1]
+        for bot in self.bots.values():
+            bot.on_round_finished()
+        return DealResult(
+            passed_out=False,
+            declarer_team=declarer_team,
+            trump=trump,
+            card_points={"Vit": history["vit"], "Tit": history["tit"]},
+            game_points={team: before[team] - game.scoreboard[team] for team in before},
+            trick_winners=trick_winners,
+        )
+
+    def _deal(self, banka: bool) -> None:
+        game = self.game
+        pid = game.current_turn
+        if banka:
+            game.deal_cards(pid, "banka")
+        else:
+            kind, _, position = self.bots[pid].decide_split().partition(" ")
+            game.deal_cards(pid, kind, int(position) if position else 0)
+        for pid, bot in self.bots.items():
+            bot.hand = [str(card) for card in game.players[pid].hand]
+
+    def _declare(self) -> None:
+        game = self.game
+        while game.state == "declaration":
+            pid = game.current_turn
+            player = game.players[pid]
+            if game.declaration_count > game.nPlayers:
+                self._choose_suit(pid)
+                continue
+            length = self.bots[pid].decide_declaration(player.find_highest_trump_declaration())
+            if game.handle_trump_declaration(f"M {length}", pid) == "Invalid declaration":
+                game.handle_trump_declaration("M 0", pid)
+
+    def _choose_suit(self, pid: int) -> None:
+        game = self.game
+        allowed = game.players[pid].find_highest_trump_declaration()[1:]
+        suit = self.bots[pid].decide_suit()
+        if suit not in allowed:
+            suit = allowed[0]
+        game.trump_suit = suit
+        game._begin_play_with_trump()
+
+    def _play_tricks(self) -> List[int]:
+        game = self.game
+        for bot in self.bots.values():
+            bot.trump = game.trump_suit
+            bot.declarer = game.trump_owner.id if game.trump_owner is not None else None
+        trick_winners: List[int] = []
+        while game.state in {"first_card", "play"}:
+            pid = game.current_turn
+            table = game.table
+            player = game.players[pid]
+            lead = table.firstCard.index if table.firstCard is not None else None
+            options = cards.codes_of(cards.legal_mask(player.hand.mask, lead, table.trump))
+            card = self.bots[pid]._choose_card(options)
+            winner = None
+            if len(table.cards) == 3:
+                # Resolve up front: finishing the round resets the game's trick state.
+                indices = [played.index for played in table.cards] + [cards.CARD_INDEX[card]]
+                owners = [owner.id for owner in table.cardOwners] + [pid]
+                winner = owners[cards.trick_winner(indices, table.trump)]
+            reply = game.play_card(pid, card)
+            if reply != "OK":
+                raise RuntimeError(f"Seat {pid} could not play {card}: {reply}")
+            for bot in self.bots.values():
+                bot.on_card_played(pid, card)
+            if winner is not None:
+                trick_winners.append(winner)
+                for bot in self.bots.values():
+                    bot.on_trick_won(winner)
+        return trick_winners
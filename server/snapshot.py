@@ -0,0 +1,212 @@
+"""
+Compact snapshots of a ``Game``, for putting tables away and getting them back.
+
+``game_state`` turns a game into plain data: the scoreboard and round
+history, every seat's hand and last activity, the deck, the cards on the
+table and in each team's pile, the update log with each seat's cursor, and the
+state version, so clients polling with ``since`` or an ETag carry on as if
+nothing happened. A game with its own ``rng`` has the generator's state saved
+too, so the shuffles after a restore are the ones there would have been.
+Cards are stored as their two-letter codes. Bots are saved separately with
+``BotManager.bot_states``, because they are rebuilt around the restored game
+rather than copied.
+
+``encode``/``decode`` turn that into zlib-compressed JSON (a table mid-round
+is a few kilobytes), and ``write_snapshot`` replaces a file atomically, so a
+crash mid-write leaves the previous snapshot in place.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import random
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .game import Game
+from .updates import UpdateLog
+from .utils import Card, Deck, Player, Table
+
+SNAPSHOT_FORMAT = 1
+
+# Plain attributes copied as they are.
+GAME_FIELDS = (
+    "state",
+    "game_over",
+    "nPlayers",
+    "dealer_position",
+    "current_turn",
+    "deal_method",
+    "trump_length",
+    "trump_suit",
+    "declaration_count",
+    "declaration_team",
+    "scoreboard",
+    "round_history",
+    "next_game_bonus",
+    "trick_winners",
+    "last_trick_winner",
+    "highlight_until",
+    "last_trick_expire",
+    "last_round_winner_team",
+    "last_round_result_key",
+    "last_round_result_kind",
+    "last_reset_message",
+    "state_version",
+)
+
+_SUIT_NAMES = {short: name for name, short in Card.short_suites.items()}
+_VALUES = {short: value for value, short in Card.short_value.items()}
+
+
+def card_from_code(code: str) -> Card:
+    return Card(_SUIT_NAMES[code[1]], _VALUES[code[0]])
+
+
+def _codes(cards: Sequence[Card]) -> List[str]:
+    return [card.code for card in cards]
+
+
+def _cards(codes: Sequence[str]) -> List[Card]:
+    return [card_from_code(code) for code in codes]
+
+
+def game_state(game: Game, bots: Sequence[dict] = ()) -> Dict[str, Any]:
+    """Everything needed to rebuild ``game``; call it with the game to yourself."""
+    data: Dict[str, Any] = {field: copy.deepcopy(getattr(game, field)) for field in GAME_FIELDS}
+    data["format"] = SNAPSHOT_FORMAT
+    data["inactivity_timeout"] = game.inactivity_timeout
+    data["trump_owner"] = game.trump_owner.id if game.trump_owner is not None else None
+    data["last_trick_cards"] = [list(entry) for entry in game.last_trick_cards]
+    data["round_plays"] = [list(entry) for entry in game.round_plays]
+    data["rng"] = _rng_state(game.rng) if game.rng is not None else None
+    data["players"] = [
+        {
+            "id": pid,
+            "name": player.name,
+            "hand": _codes(player.hand),
+            "last_update_time": player.last_update_time,
+            "in_process": player.in_process,
+        }
+        for pid, player in sorted(game.players.items())
+    ]
+    data["deck"] = _codes(game.deck.cards) if game.deck is not None else None
+    data["table"] = _table_state(game.table) if game.table is not None else None
+    data["updates"] = game.updates.dump()
+    data["bot_seats"] = [
+        [player.id, difficulty]
+        for player, difficulty in game.bot_seats.items()
+        if game.players.get(player.id) is player
+    ]
+    data["bots"] = list(bots)
+    return data
+
+
+def restore_game(data: Dict[str, Any], **game_kwargs: Any) -> Game:
+    """
+    A new ``Game`` in the state ``game_state`` described, with the inactivity
+    timers of its human seats armed again. ``game_kwargs`` go to ``Game``.
+    """
+    if data.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {data.get('format')!r}")
+    game = Game(inactivity_timeout=data["inactivity_timeout"], **game_kwargs)
+    for field in GAME_FIELDS:
+        setattr(game, field, data[field])
+    game.last_trick_cards = [tuple(entry) for entry in data["last_trick_cards"]]
+    # Snapshots written before these were saved restore without them.
+    game.round_plays = [tuple(entry) for entry in data.get("round_plays", ())]
+    if data.get("rng") is not None:
+        game.rng = random.Random()
+        game.rng.setstate(_rng_from_state(data["rng"]))
+    for saved in data["players"]:
+        player = Player(saved["name"], saved["id"])
+        player.hand = _cards(saved["hand"])
+        player.last_update_time = saved["last_update_time"]
+        player.in_process = saved["in_process"]
+        game.players[player.id] = player
+    for pid, difficulty in data.get("bot_seats", ()):
+        game.bot_seats[game.players[pid]] = difficulty
+    owner = data["trump_owner"]
+    game.trump_owner = game.players.get(owner) if owner is not None else None
+    if data["deck"] is not None:
+        game.deck = Deck()
+        game.deck.cards = _cards(data["deck"])
+    if data["table"] is not None:
+        game.table = _restore_table(data["table"], game.players)
+    game.updates = UpdateLog.load(data["updates"])
+    game.set_inactivity_timeout(game.inactivity_timeout)
+    return game
+
+
+def _rng_state(rng: random.Random) -> List[Any]:
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def _rng_from_state(data: Sequence[Any]) -> tuple:
+    version, internal, gauss_next = data
+    return version, tuple(internal), gauss_next
+
+
+def _table_state(table: Table) -> Dict[str, Any]:
+    return {
+        "trump": table.trump,
+        "cards": _codes(table.cards),
+        "owners": [owner.id for owner in table.cardOwners],
+        "piles": {team: _codes(pile) for team, pile in table.team_piles.items()},
+        "seen_mask": table.seen_mask,
+        "last_winning_card": table.last_winning_card.code if table.last_winning_card else None,
+        "last_winning_owner_id": table.last_winning_owner_id,
+    }
+
+
+def _restore_table(data: Dict[str, Any], players: Dict[int, Player]) -> Table:
+    table = Table(data["trump"])
+    table.cards = _cards(data["cards"])
+    table.cardOwners = [players[pid] for pid in data["owners"]]
+    table.firstCard = table.cards[0] if table.cards else None
+    table.team_piles = {team: _cards(codes) for team, codes in data["piles"].items()}
+    for team, pile in table.team_piles.items():
+        mask = 0
+        for card in pile:
+            mask |= card.bit
+        table.pile_masks[team] = mask
+    table.seen_mask = data["seen_mask"]
+    if data["last_winning_card"] is not None:
+        table.last_winning_card = card_from_code(data["last_winning_card"])
+    table.last_winning_owner_id = data["last_winning_owner_id"]
+    return table
+
+
+# ------------- bytes and files -------------
+def encode(data: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+
+def decode(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def write_snapshot(path: Path, data: Dict[str, Any]) -> int:
+    """Replace ``path`` with ``data`` atomically; returns the bytes written."""
+    blob = encode(data)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".tmp")
+    with open(partial, "wb") as handle:
+        handle.write(blob)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+    return len(blob)
+
+
+def read_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    """The snapshot at ``path``, or None if there is none."""
+    try:
+        blob = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return decode(blob)
@@ -0,0 +1,518 @@
+"""
+Double-dummy solver for the play phase.
+
+With every hand known, ``DoubleDummySolver`` finds the card points each side
+takes under perfect play by both sides. It runs an alpha-beta search over
+single cards, keeping:
+
+* a transposition table keyed by the four hands and the leader at every
+  trick boundary, holding lower/upper bounds and the best lead;
+* move ordering (the table's best lead, then leads that caused cut-offs
+  before; when following, winning cheaply or feeding points to a partner who
+  is already winning);
+* equivalence pruning: of two cards of the same trump class and point value
+  with no live card, or card in the current trick, ranked between them, only
+  one is searched;
+* sure points: trumps above every trump the other side holds win the trick
+  they are played to, so their points bound the search before it starts;
+* an exact, cached minimax for the last two tricks.
+
+Tricks are settled with the same rank tables as ``Table.clear_and_reset``
+(``server.cards``), and ``Outcome.award`` applies ``game.score_round``.
+``solve_many`` spreads independent deals over a process pool.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from . import cards
+from .game import score_round
+
+SEATS = (1, 2, 3, 4)
+TRUMP_CLASS = 4  # class of every trump; plain cards use their suit's index
+# Positions with this many cards left are solved exactly and cached.
+EXACT_CARDS = 8
+
+
+class SearchTimeout(Exception):
+    """Raised when a search runs past the solver's ``deadline``."""
+
+
+@dataclass(frozen=True)
+class Deal:
+    """A play-phase position: hands as card masks for seats 1-4."""
+
+    hands: Tuple[int, int, int, int]
+    trump: str
+    leader: int  # seat that led, or is about to lead, the current trick
+    trick: Tuple[int, ...] = ()  # card indices already played to it, from the leader
+    taken: Tuple[int, int] = (0, 0)  # card points Vit and Tit have already won
+
+    @classmethod
+    def from_codes(
+        cls,
+        hands: Mapping[int, Iterable[str]],
+        trump: str,
+        leader: int,
+        trick: Sequence[str] = (),
+        taken: Tuple[int, int] = (0, 0),
+    ) -> "Deal":
+        masks = tuple(cards.mask_from_codes(hands.get(seat, ())) for seat in SEATS)
+        return cls(masks, trump[0].upper(), leader, tuple(cards.card_index(code) for code in trick), taken)
+
+    @classmethod
+    def from_game(cls, game) -> "Deal":
+        """Snapshot a game in the ``first_card`` / ``play`` state."""
+        table = game.table
+        if table is None:
+            raise ValueError("The game has no trick in progress.")
+        hands = tuple(game.players[seat].hand.mask for seat in SEATS)
+        trick = tuple(card.index for card in table.cards)
+        leader = table.cardOwners[0].id if table.cardOwners else game.current_turn
+        return cls(hands, table.trump, leader, trick, (table.pile_points("Vit"), table.pile_points("Tit")))
+
+    def to_move(self) -> int:
+        return (self.leader - 1 + len(self.trick)) % 4 + 1
+
+
+@dataclass(frozen=True)
+class Outcome:
+    vit: int
+    tit: int
+
+    def award(self, declarer_team: str, trump: str) -> Tuple[Optional[str], int]:
+        """
+        The team that subtracts points and the base points it subtracts, as
+        ``Game._apply_round_scoring`` would score these card points (``None``
+        for a 60-60 draw). Sweeps by a single player are not distinguished.
+        """
+        declarer_points = self.vit if declarer_team == "Vit" else self.tit
+        if declarer_points == 60:
+            return None, 0
+        declarers_win, base_points, _ = score_round(declarer_points, trump == "C")
+        defenders = "Tit" if declarer_team == "Vit" else "Vit"
+        return (declarer_team if declarers_win else defenders), base_points
+
+
+def _build_pext_table() -> List[int]:
+    """``table[mask << 8 | bits]``: the bits of an 8-bit value selected by mask, packed low."""
+    table = []
+    for mask in range(256):
+        for bits in range(256):
+            packed, shift = 0, 0
+            for bit in range(8):
+                if mask >> bit & 1:
+                    packed |= (bits >> bit & 1) << shift
+                    shift += 1
+            table.append(packed)
+    return table
+
+
+_PEXT: List[int] = []
+
+
+class DoubleDummySolver:
+    """
+    Solver for one trump suit. The transposition table is kept between calls,
+    so solving many positions from the same deal (move by move, or every card
+    of a hand) reuses earlier work; ``clear`` drops it.
+
+    Internally cards are renumbered into "slots": each class (every trump, or
+    the plain cards of one suit) takes a run of consecutive bits, weakest
+    first, with the trumps on top. Following suit, the trick winner and card
+    equivalence then come down to comparing slot numbers, and seats are
+    numbered 0-3 so Vit is the even seats.
+
+    With a ``deadline`` (a ``time.time()`` value) a search that runs past it
+    raises ``SearchTimeout``; the table keeps what was learned until then.
+    """
+
+    def __init__(self, trump: str, deadline: Optional[float] = None) -> None:
+        global _PEXT
+        if not _PEXT:
+            _PEXT = _build_pext_table()
+        self.trump = trump[0].upper()
+        self.deadline = deadline
+        self.nodes = 0
+        self._table: Dict[tuple, Tuple[int, int, int]] = {}
+        self._exact: Dict[tuple, int] = {}
+        self._shapes: Dict[int, tuple] = {}
+        self._history = [[0] * 32 for _ in SEATS]
+        trumps = cards.trump_mask(self.trump)
+        klass = [TRUMP_CLASS if trumps >> index & 1 else index >> 3 for index in range(32)]
+        slot_cards: List[int] = []
+        class_masks: List[int] = []
+        for current in range(TRUMP_CLASS + 1):
+            members = [index for index in range(32) if klass[index] == current]
+            lead = members[0] if members else 0
+            members.sort(key=cards.trick_ranks(self.trump, lead).__getitem__)
+            class_masks.append(((1 << len(members)) - 1) << len(slot_cards))
+            slot_cards.extend(members)
+        self._slot_card = slot_cards
+        self._card_slot = {index: slot for slot, index in enumerate(slot_cards)}
+        self._class_masks = class_masks
+        self._trump_mask = class_masks[TRUMP_CLASS]
+        self._slot_class = [klass[index] for index in slot_cards]
+        self._slot_points = [cards.CARD_POINTS[index] for index in slot_cards]
+        # Cards of the same class and point value are interchangeable when adjacent.
+        self._slot_group = [
+            self._slot_class[slot] << 5 | self._slot_points[slot] for slot in range(32)
+        ]
+        # The class mask a lead from each slot must be followed with.
+        self._follow = [class_masks[klass[index]] for index in slot_cards]
+        # Rank of each slot in a trick led from each class: off-suit cards never win.
+        self._ranks = [
+            tuple(
+                slot if self._slot_class[slot] in (lead_class, TRUMP_CLASS) else -1
+                for slot in range(32)
+            )
+            for lead_class in range(TRUMP_CLASS + 1)
+        ]
+        self._byte_points = [
+            [sum(self._slot_points[8 * part + bit] for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+            for part in range(4)
+        ]
+        codes = sorted(set(self._slot_points))
+        self._point_bits = [
+            sum(1 << slot for slot in range(32) if codes.index(self._slot_points[slot]) >> bit & 1)
+            for bit in range(3)
+        ]
+
+    def clear(self) -> None:
+        self._table.clear()
+        self._exact.clear()
+        self._shapes.clear()
+
+    # ------------- public API -------------
+    def solve(self, deal: Deal) -> Outcome:
+        """Card points for each side at the end of the deal under perfect play."""
+        hands, leader, trick = self._internal(deal)
+        vit = deal.taken[0] + self._value(hands, leader, trick)
+        return Outcome(vit, sum(deal.taken) + self._remaining(deal) - vit)
+
+    def move_values(self, deal: Deal) -> Dict[str, Outcome]:
+        """The final outcome after each legal card for the seat to move."""
+        hands, leader, trick = self._internal(deal)
+        seat = (leader + len(trick)) & 3
+        legal = hands[seat] & self._follow[trick[0]] or hands[seat] if trick else hands[seat]
+        total = sum(deal.taken) + self._remaining(deal)
+        values: Dict[str, Outcome] = {}
+        for slot in cards.iter_mask(legal):
+            hands[seat] ^= 1 << slot
+            vit = deal.taken[0] + self._value(hands, leader, trick + (slot,))
+            hands[seat] ^= 1 << slot
+            values[cards.CARD_CODES[self._slot_card[slot]]] = Outcome(vit, total - vit)
+        return values
+
+    def best_card(self, deal: Deal) -> Tuple[str, Outcome]:
+        """The card the seat to move should play, and the outcome it leads to."""
+        values = self.move_values(deal)
+        maximize = deal.to_move() % 2 == 1
+        card = (max if maximize else min)(values, key=lambda code: values[code].vit)
+        return card, values[card]
+
+    # ------------- search -------------
+    def _internal(self, deal: Deal) -> Tuple[List[int], int, Tuple[int, ...]]:
+        if deal.trump[0].upper() != self.trump:
+            raise ValueError(f"Solver is for trump {self.trump}, not {deal.trump}.")
+        if len(deal.trick) > 3:
+            raise ValueError("A trick in progress holds at most three cards.")
+        card_slot = self._card_slot
+        hands = [cards.mask_of(card_slot[index] for index in cards.iter_mask(hand)) for hand in deal.hands]
+        return hands, deal.leader - 1, tuple(card_slot[index] for index in deal.trick)
+
+    @staticmethod
+    def _remaining(deal: Deal) -> int:
+        masks = deal.hands[0] | deal.hands[1] | deal.hands[2] | deal.hands[3]
+        return cards.mask_points(masks) + sum(cards.CARD_POINTS[index] for index in deal.trick)
+
+    def _points(self, mask: int) -> int:
+        table = self._byte_points
+        return (
+            table[0][mask & 0xFF] + table[1][mask >> 8 & 0xFF]
+            + table[2][mask >> 16 & 0xFF] + table[3][mask >> 24 & 0xFF]
+        )
+
+    def _value(self, hands: List[int], leader: int, trick: Tuple[int, ...]) -> int:
+        """Vit's exact points from ``trick`` on, by bisection over null-window searches."""
+        live = hands[0] | hands[1] | hands[2] | hands[3]
+        lower = 0
+        upper = self._points(live) + sum(self._slot_points[slot] for slot in trick)
+        while lower < upper:
+            test = (lower + upper + 1) // 2
+            value = self._search(hands, leader, trick, test - 1, test)
+            if value >= test:
+                lower = value
+            else:
+                upper = value
+        return lower
+
+    def _key(self, hands: List[int], leader: int, live: int) -> tuple:
+        """
+        Positions that differ only in which of two adjacent cards has already
+        been played are the same game, so the key packs out the played cards:
+        the owners and point values of the live cards in slot order, plus how
+        many live cards each class has. Everything but the owners depends on
+        ``live`` alone and is worked out once per set of live cards.
+        """
+        shape = self._shapes.get(live)
+        if shape is None:
+            parts = [(live >> shift & 0xFF) << 8 for shift in (0, 8, 16, 24)]
+            counts = 0
+            for mask in self._class_masks:
+                counts = counts << 4 | (live & mask).bit_count()
+            for mask in self._point_bits:
+                counts = counts << 32 | self._pack(parts, mask)
+            shape = self._shapes[live] = (parts, counts)
+        parts, counts = shape
+        pack = self._pack
+        return (leader, counts, pack(parts, hands[0]), pack(parts, hands[1]), pack(parts, hands[2]))
+
+    @staticmethod
+    def _pack(parts: List[int], mask: int) -> int:
+        """The bits of ``mask`` at live slots, packed low; ``parts`` are the live bytes, shifted for ``_PEXT``."""
+        pext = _PEXT
+        return (
+            pext[parts[0] | (mask & 0xFF)] << 24 | pext[parts[1] | (mask >> 8 & 0xFF)] << 16
+            | pext[parts[2] | (mask >> 16 & 0xFF)] << 8 | pext[parts[3] | mask >> 24]
+        )
+
+    def _search(self, hands: List[int], leader: int, trick: Tuple[int, ...], alpha: int, beta: int) -> int:
+        """Fail-soft alpha-beta: Vit's points from the cards in ``trick`` on."""
+        live = hands[0] | hands[1] | hands[2] | hands[3]
+        if not trick:
+            return self._lead(hands, live, leader, alpha, beta)
+        lead = trick[0]
+        ranks = self._ranks[self._slot_class[lead]]
+        top = max(ranks[slot] for slot in trick)
+        winner = (leader + [ranks[slot] for slot in trick].index(top)) & 3
+        points = sum(self._slot_points[slot] for slot in trick)
+        if len(trick) == 4:
+            gained = 0 if winner & 1 else points
+            return gained + self._lead(hands, live, winner, alpha - gained, beta - gained)
+        live |= cards.mask_of(trick)
+        return self._follow_suit(hands, live, leader, len(trick), lead, top, winner, points, alpha, beta)
+
+    def _lead(self, hands: List[int], live: int, leader: int, alpha: int, beta: int) -> int:
+        if not live:
+            return 0
+        remaining = self._points(live)
+        if remaining <= alpha:
+            return remaining
+        if beta <= 0:
+            return 0
+        if live.bit_count() <= EXACT_CARDS:
+            return self._endgame(hands, leader)
+        # Trumps above every live trump of the other side win the trick they are played to.
+        trumps = live & self._trump_mask
+        vit_trumps = trumps & (hands[0] | hands[2])
+        tit_trumps = trumps ^ vit_trumps
+        floor, ceiling = 0, remaining
+        if vit_trumps.bit_length() > tit_trumps.bit_length():
+            above = tit_trumps.bit_length()
+            floor = self._points(trumps >> above << above)
+            if floor >= beta:
+                return floor
+        elif tit_trumps:
+            above = vit_trumps.bit_length()
+            ceiling = remaining - self._points(trumps >> above << above)
+            if ceiling <= alpha:
+                return ceiling
+        key = self._key(hands, leader, live)
+        lower, upper, best = self._table.get(key, (floor, ceiling, -1))
+        if lower >= beta or lower == upper:
+            return lower
+        if upper <= alpha:
+            return upper
+        alpha = window_alpha = max(alpha, lower)
+        beta = window_beta = min(beta, upper)
+        self.nodes += 1
+        maximize = not leader & 1
+        hand = hands[leader]
+        moves = self._distinct(hand, live)
+        history = self._history[leader]
+        moves.sort(key=history.__getitem__, reverse=True)
+        if best in moves:
+            moves.remove(best)
+            moves.insert(0, best)
+        value = -1 if maximize else 122
+        slot_points = self._slot_points
+        ranks_for = self._ranks
+        slot_class = self._slot_class
+        for slot in moves:
+            hands[leader] = hand ^ (1 << slot)
+            result = self._follow_suit(
+                hands, live, leader, 1, slot, ranks_for[slot_class[slot]][slot], leader, slot_points[slot], alpha, beta,
+            )
+            hands[leader] = hand
+            if maximize:
+                if result > value:
+                    value, best = result, slot
+                    if value > alpha:
+                        alpha = value
+            elif result < value:
+                value, best = result, slot
+                if value < beta:
+                    beta = value
+            if alpha >= beta:
+                history[best] += live.bit_count() ** 2
+                break
+        if value <= window_alpha:
+            upper = value
+        elif value >= window_beta:
+            lower = value
+        else:
+            lower = upper = value
+        self._table[key] = (lower, upper, best)
+        return value
+
+    def _follow_suit(
+        self, hands: List[int], live: int, leader: int, count: int, lead: int,
+        top: int, winner: int, points: int, alpha: int, beta: int,
+    ) -> int:
+        """
+        The seat ``count`` places after the leader plays to a trick held by
+        ``winner``. ``live`` still holds the cards played to this trick: a card
+        between two of the seat's cards can make one win where the other loses.
+        """
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 0x3FF and time.time() > self.deadline:
+            raise SearchTimeout()
+        seat = (leader + count) & 3
+        maximize = not seat & 1
+        hand = hands[seat]
+        legal = hand & self._follow[lead] or hand
+        ranks = self._ranks[self._slot_class[lead]]
+        slot_points = self._slot_points
+        if not legal & (legal - 1):
+            moves = [legal.bit_length() - 1]
+        else:
+            moves = self._distinct(legal, live)
+            if (winner ^ seat) & 1:
+                # Win as cheaply as possible, otherwise throw the fewest points.
+                moves.sort(key=lambda slot: slot if ranks[slot] > top else 64 + slot_points[slot])
+            else:
+                # Partner is winning: feed points without overtaking.
+                moves.sort(key=lambda slot: (ranks[slot] > top) * 64 - slot_points[slot])
+        value = -1 if maximize else 122
+        last = count == 3
+        if last:
+            # What is left once the trick is over, but for this seat's card.
+            others = (hands[0] | hands[1] | hands[2] | hands[3]) ^ hand
+        for slot in moves:
+            bit = 1 << slot
+            hands[seat] = hand ^ bit
+            rank = ranks[slot]
+            if rank > top:
+                new_top, new_winner = rank, seat
+            else:
+                new_top, new_winner = top, winner
+            taken = points + slot_points[slot]
+            if last:
+                gained = 0 if new_winner & 1 else taken
+                result = gained + self._lead(hands, others | hand ^ bit, new_winner, alpha - gained, beta - gained)
+            else:
+                result = self._follow_suit(
+                    hands, live, leader, count + 1, lead, new_top, new_winner, taken, alpha, beta,
+                )
+            hands[seat] = hand
+            if maximize:
+                if result > value:
+                    value = result
+                    if value > alpha:
+                        alpha = value
+            elif result < value:
+                value = result
+                if value < beta:
+                    beta = value
+            if alpha >= beta:
+                break
+        return value
+
+    def _distinct(self, legal: int, live: int) -> List[int]:
+        """Legal cards strongest first, keeping one of each run of equal cards with nothing live between."""
+        group = self._slot_group
+        moves: List[int] = []
+        previous = -1
+        while legal:
+            slot = legal.bit_length() - 1
+            legal ^= 1 << slot
+            if previous < 0 or group[previous] != group[slot] or live >> (slot + 1) & ((1 << (previous - slot - 1)) - 1):
+                moves.append(slot)
+            previous = slot
+        return moves
+
+    def _endgame(self, hands: List[int], leader: int) -> int:
+        """Exact value of the last few tricks by plain minimax, cached; the last trick is forced."""
+        hand = hands[leader]
+        if not hand & (hand - 1):
+            return self._last_trick(hands, leader)
+        key = (hands[0], hands[1], hands[2], hands[3], leader)
+        value = self._exact.get(key)
+        if value is None:
+            value = self._minimax(hands, leader, 0, 0, -1, leader, 0)
+            self._exact[key] = value
+        return value
+
+    def _last_trick(self, hands: List[int], leader: int) -> int:
+        """Vit's points from the last trick, where every seat has one card left."""
+        lead = hands[leader].bit_length() - 1
+        ranks = self._ranks[self._slot_class[lead]]
+        top, winner, points = ranks[lead], leader, self._slot_points[lead]
+        for offset in (1, 2, 3):
+            seat = (leader + offset) & 3
+            slot = hands[seat].bit_length() - 1
+            points += self._slot_points[slot]
+            if ranks[slot] > top:
+                top, winner = ranks[slot], seat
+        return 0 if winner & 1 else points
+
+    def _minimax(
+        self, hands: List[int], leader: int, count: int, lead: int, top: int, winner: int, points: int,
+    ) -> int:
+        seat = (leader + count) & 3
+        hand = hands[seat]
+        legal = hand & self._follow[lead] or hand if count else hand
+        ranks = self._ranks[self._slot_class[lead]]
+        slot_points = self._slot_points
+        maximize = not seat & 1
+        best = -1 if maximize else 122
+        while legal:
+            bit = legal & -legal
+            legal ^= bit
+            slot = bit.bit_length() - 1
+            hands[seat] = hand ^ bit
+            if not count:
+                ranks = self._ranks[self._slot_class[slot]]
+                value = self._minimax(hands, leader, 1, slot, ranks[slot], seat, slot_points[slot])
+            else:
+                rank = ranks[slot]
+                if rank > top:
+                    new_top, new_winner = rank, seat
+                else:
+                    new_top, new_winner = top, winner
+                taken = points + slot_points[slot]
+                if count == 3:
+                    value = (0 if new_winner & 1 else taken) + self._endgame(hands, new_winner)
+                else:
+                    value = self._minimax(hands, leader, count + 1, lead, new_top, new_winner, taken)
+            hands[seat] = hand
+            if value > best if maximize else value < best:
+                best = value
+        return best
+
+
+def solve(deal: Deal) -> Outcome:
+    return DoubleDummySolver(deal.trump).solve(deal)
+
+
+def solve_many(deals: Sequence[Deal], processes: Optional[int] = None, chunksize: int = 4) -> List[Outcome]:
+    """Solve independent deals in parallel; ``processes=1`` solves in-process."""
+    if processes == 1:
+        return [solve(deal) for deal in deals]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(solve, deals, chunksize=chunksize))
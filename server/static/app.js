@@ -7,6 +7,13 @@ const state = {
   playerId: null,
   joinedExistingLobby: false,
   pollTimer: null,
+  updatesSeq: null,
+  updatesLoopId: 0,
+  socket: null,
+  stateVersion: null,
+  lastStateData: null,
+  socketRequestId: 0,
+  pendingReplies: {},
   stateTimer: null,
   browserTimer: null,
   browserLobbies: [],
@@ -240,16 +247,35 @@ async function leaveLobby() {
   }
 }
 
+const UPDATES_WAIT_SECONDS = 25;
+
+async function runUpdatesLoop(loopId) {
+  // Long-poll: each request parks on the server until an update arrives.
+  while (state.token && state.updatesLoopId === loopId) {
+    const ok = await fetchUpdates(UPDATES_WAIT_SECONDS);
+    if (!ok && state.updatesLoopId === loopId) {
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+  }
+}
+
 function startPolling() {
   stopPolling();
-  state.pollTimer = setInterval(fetchUpdates, 700);
+  startHttpPolling();
+  connectSocket();
+  renderMeldActions();
+}
+
+function startHttpPolling() {
+  stopHttpPolling();
   state.stateTimer = setInterval(fetchState, 560);
-  fetchUpdates();
+  state.updatesLoopId += 1;
+  runUpdatesLoop(state.updatesLoopId);
   fetchState();
-  renderMeldActions();
 }
 
-function stopPolling() {
+function stopHttpPolling() {
+  state.updatesLoopId += 1;
   if (state.pollTimer) {
     clearInterval(state.pollTimer);
     state.pollTimer = null;
@@ -258,6 +284,85 @@ function stopPolling() {
     clearInterval(state.stateTimer);
     state.stateTimer = null;
   }
+}
+
+function socketUrl() {
+  return `ws://${state.host}:${state.port}/ws?token=${state.token}`;
+}
+
+function connectSocket() {
+  // The socket carries updates, state snapshots and command replies; HTTP
+  // polling only runs until it opens, and again if it drops.
+  if (!state.token || typeof WebSocket === "undefined") return;
+  const socket = new WebSocket(socketUrl());
+  state.socket = socket;
+  socket.onopen = () => {
+    if (state.socket === socket) stopHttpPolling();
+  };
+  socket.onmessage = (event) => {
+    if (state.socket === socket) handleSocketMessage(JSON.parse(event.data));
+  };
+  socket.onclose = () => {
+    if (state.socket !== socket) return;
+    state.socket = null;
+    failPendingReplies("Connection closed.");
+    if (state.token) startHttpPolling();
+  };
+}
+
+function closeSocket() {
+  const socket = state.socket;
+  state.socket = null;
+  failPendingReplies("Connection closed.");
+  if (socket) socket.close();
+}
+
+function failPendingReplies(reason) {
+  Object.values(state.pendingReplies).forEach(({ onResult }) => {
+    if (onResult) onResult(null, reason);
+  });
+  state.pendingReplies = {};
+}
+
+function handleUpdateMessage(message) {
+  if (message && message !== "No new updates.") {
+    appendUpdate(message);
+    if (message.includes("Received 8 cards.")) {
+      sendCommand("show");
+    }
+  }
+}
+
+function handleCommandReply(message, silent, onResult) {
+  const msg = message ?? "";
+  if (msg && msg.trim() && !silent) {
+    appendUpdate(msg);
+  }
+  if (onResult) onResult(msg.trim(), null);
+}
+
+function handleSocketMessage(payload) {
+  if (payload.type === "update") {
+    state.updatesSeq = payload.seq;
+    handleUpdateMessage(payload.message);
+  } else if (payload.type === "state") {
+    applyState(payload.state);
+  } else if (payload.type === "reply") {
+    const pending = state.pendingReplies[payload.id];
+    delete state.pendingReplies[payload.id];
+    const { silent = false, onResult } = pending || {};
+    handleCommandReply(payload.message, silent, onResult);
+  } else if (payload.type === "error") {
+    appendUpdate(payload.detail);
+    if (payload.status === 401 || payload.status === 410) {
+      resetClientSession();
+    }
+  }
+}
+
+function stopPolling() {
+  stopHttpPolling();
+  closeSocket();
   if (state.browserTimer) {
     clearInterval(state.browserTimer);
     state.browserTimer = null;
@@ -278,6 +383,9 @@ function resetClientSession() {
   state.lobbyName = "";
   state.token = null;
   state.playerId = null;
+  state.updatesSeq = null;
+  state.stateVersion = null;
+  state.lastStateData = null;
   state.joinedExistingLobby = false;
   state.browserLobbies = [];
   state.hand = [];
@@ -343,34 +451,38 @@ function resetClientSession() {
   startBrowserPolling();
 }
 
-async function fetchUpdates() {
-  if (!state.token) return;
+async function fetchUpdates(waitSeconds = 0) {
+  if (!state.token) return false;
   try {
-    const response = await fetch(`${baseUrl()}/updates?token=${state.token}`);
+    const since = state.updatesSeq === null ? "" : `&since=${state.updatesSeq}`;
+    const wait = waitSeconds > 0 ? `&wait=${waitSeconds}` : "";
+    const response = await fetch(`${baseUrl()}/updates?token=${state.token}${since}${wait}`);
     if (!response.ok) {
       if (response.status === 401 || response.status === 410) {
         appendUpdate("Session expired. Returning to the lobby browser.");
         resetClientSession();
       }
-      return;
+      return false;
     }
     const data = await response.json();
     const message = data.message;
-    if (message && message !== "No new updates.") {
-      appendUpdate(message);
-      if (message.includes("Received 8 cards.")) {
-        sendCommand("show");
-      }
+    if (typeof data.seq === "number") {
+      state.updatesSeq = data.seq;
     }
+    handleUpdateMessage(message);
+    return true;
   } catch (error) {
     appendUpdate(`Update error: ${error}`);
+    return false;
   }
 }
 
 async function fetchState() {
   if (!state.token) return;
   try {
-    const response = await fetch(`${baseUrl()}/state?token=${state.token}`);
+    const since = state.lastStateData ? `&since=${state.stateVersion}` : "";
+    const response = await fetch(`${baseUrl()}/state?token=${state.token}${since}`);
+    if (response.status === 304) return;
     if (!response.ok) {
       if (response.status === 401 || response.status === 410) {
         appendUpdate("Session expired. Returning to the lobby browser.");
@@ -378,57 +490,65 @@ async function fetchState() {
       }
       return;
     }
-    const data = await response.json();
-    const previousPhase = state.phase;
-    state.playerId = data.player_id;
-    state.lobbyId = data.lobby_id;
-    state.lobbyName = data.lobby_name;
-    state.phase = data.phase;
-    state.trumpSuit = data.trump;
-    state.playableCards = data.playable_cards || [];
-    state.roundScore = data.round_score || { Vit: 0, Tit: 0 };
-    state.lastRoundWinnerTeam = data.last_round_winner_team || null;
-    state.lastRoundResultKey = Number(data.last_round_result_key || 0);
-    state.lastRoundResultKind = data.last_round_result_kind || null;
-    state.trickCount = Number(data.trick_count || 0);
-    state.lastWinner = data.last_winner;
-    state.lastTrickWinningCard = data.last_trick_winning_card || null;
-    state.highlightUntil = Number(data.highlight_until || 0);
-    state.currentTurn = data.current_turn;
-    state.recentTrick = data.recent_trick || [];
-    state.recentTrickExpire = Number(data.recent_trick_expire || 0);
-    state.lastTrickSignature = recentTrickKey(state.recentTrick);
-    updateRecentTrickTiming(state.recentTrick);
-
-    updatePhaseState(data, previousPhase);
-    renderScreen(data.phase);
-    renderLobby(data);
-
-    renderScoreboard(data.scoreboard);
-    renderRoundHistory(data.round_history || []);
-    renderRoundScore(state.roundScore);
-    renderPlayers(data.players, data.current_turn);
-    const me = (data.players || []).find((player) => player.id === state.playerId);
-    playerLabel.textContent = me
-      ? `Player ${state.playerId} (${me.name})`
-      : `Player ${state.playerId}`;
-    renderTableCards(data.table_cards);
-    renderTableLayout(data.players, data.table_slots, data.current_turn);
-    renderTrump(data.trump);
-    state.hand = sortHand(data.hand || [], data.trump);
-    schedulePlayableReveal(data);
-    renderCardButtons();
-    maybeRequestMaxMeld(data);
-    maybeSendSuit(data);
-    renderMeldActions();
-    renderDealActions(data);
-    maybeShowMatchCelebration(data.scoreboard, data.phase);
-    maybeShowRoundCelebration();
+    const payload = await response.json();
+    // Delta replies carry only the fields that changed since our version.
+    const data = payload.changes ? { ...state.lastStateData, ...payload.changes } : payload;
+    applyState(data);
   } catch (error) {
     appendUpdate(`State error: ${error}`);
   }
 }
 
+function applyState(data) {
+  const previousPhase = state.phase;
+  state.lastStateData = data;
+  state.stateVersion = data.version;
+  state.playerId = data.player_id;
+  state.lobbyId = data.lobby_id;
+  state.lobbyName = data.lobby_name;
+  state.phase = data.phase;
+  state.trumpSuit = data.trump;
+  state.playableCards = data.playable_cards || [];
+  state.roundScore = data.round_score || { Vit: 0, Tit: 0 };
+  state.lastRoundWinnerTeam = data.last_round_winner_team || null;
+  state.lastRoundResultKey = Number(data.last_round_result_key || 0);
+  state.lastRoundResultKind = data.last_round_result_kind || null;
+  state.trickCount = Number(data.trick_count || 0);
+  state.lastWinner = data.last_winner;
+  state.lastTrickWinningCard = data.last_trick_winning_card || null;
+  state.highlightUntil = Number(data.highlight_until || 0);
+  state.currentTurn = data.current_turn;
+  state.recentTrick = data.recent_trick || [];
+  state.recentTrickExpire = Number(data.recent_trick_expire || 0);
+  state.lastTrickSignature = recentTrickKey(state.recentTrick);
+  updateRecentTrickTiming(state.recentTrick);
+
+  updatePhaseState(data, previousPhase);
+  renderScreen(data.phase);
+  renderLobby(data);
+
+  renderScoreboard(data.scoreboard);
+  renderRoundHistory(data.round_history || []);
+  renderRoundScore(state.roundScore);
+  renderPlayers(data.players, data.current_turn);
+  const me = (data.players || []).find((player) => player.id === state.playerId);
+  playerLabel.textContent = me
+    ? `Player ${state.playerId} (${me.name})`
+    : `Player ${state.playerId}`;
+  renderTableCards(data.table_cards);
+  renderTableLayout(data.players, data.table_slots, data.current_turn);
+  renderTrump(data.trump);
+  state.hand = sortHand(data.hand || [], data.trump);
+  schedulePlayableReveal(data);
+  renderCardButtons();
+  maybeRequestMaxMeld(data);
+  maybeSendSuit(data);
+  renderMeldActions();
+  renderDealActions(data);
+  maybeShowMatchCelebration(data.scoreboard, data.phase);
+  maybeShowRoundCelebration();
+}
+
 function maybeShowMatchCelebration(board, phase) {
   if (!celebrationOverlay || phase !== "end" || !board) return;
   const winners = Object.entries(board)
@@ -508,6 +628,12 @@ function maybeShowRoundCelebration() {
 async function sendCommand(command, options = {}) {
   if (!state.token) return;
   const { silent = false, onResult } = options;
+  if (state.socket && state.socket.readyState === WebSocket.OPEN) {
+    state.socketRequestId += 1;
+    state.pendingReplies[state.socketRequestId] = { silent, onResult };
+    state.socket.send(JSON.stringify({ id: state.socketRequestId, command }));
+    return;
+  }
   try {
     const response = await fetch(`${baseUrl()}/command`, {
       method: "POST",
@@ -522,11 +648,7 @@ async function sendCommand(command, options = {}) {
       return;
     }
     const data = await response.json();
-    const msg = data.message ?? "";
-    if (msg && msg.trim() && !silent) {
-      appendUpdate(msg);
-    }
-    if (onResult) onResult(msg.trim(), null);
+    handleCommandReply(data.message, silent, onResult);
   } catch (error) {
     appendUpdate(`Command error: ${error}`);
     if (onResult) onResult(null, error);
@@ -0,0 +1,148 @@
+"""
+Background expiry of idle lobbies.
+
+Request handlers used to sweep the whole registry on every call. Now each
+lobby that may expire gets an entry in a heap ordered by deadline. A single
+background thread sleeps until the earliest deadline, pops every entry that
+is due and asks the owner to ``reclaim`` that key. ``reclaim`` re-checks the
+lobby (it may have filled up again, or be gone already) and returns how many
+sessions it freed, or ``None`` if it kept the lobby. So a request does no
+expiry work at all, and a pass costs O(due log n), whatever the number of
+lobbies that are still live.
+
+A key may be scheduled more than once; extra entries just come back as
+``None`` from ``reclaim``. Every pass is recorded in ``stats``, with the
+lobbies and sessions it reclaimed.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Hashable, List, Optional, Tuple
+
+# Passes kept for ``SweepStats.recent``.
+RECENT_PASSES = 64
+
+Reclaim = Callable[[Hashable, float], Optional[int]]
+
+
+@dataclass(frozen=True)
+class SweepPass:
+    at: float
+    due: int  # heap entries that came due
+    lobbies: int  # lobbies reclaimed
+    sessions: int  # sessions dropped with them
+
+
+@dataclass(frozen=True)
+class SweepStats:
+    passes: int
+    lobbies: int
+    sessions: int
+    scheduled: int  # entries still in the heap
+    recent: Tuple[SweepPass, ...]
+
+    @property
+    def last(self) -> Optional[SweepPass]:
+        return self.recent[-1] if self.recent else None
+
+
+class Sweeper:
+    def __init__(self, reclaim: Reclaim, name: str = "lobby-sweeper") -> None:
+        self._reclaim = reclaim
+        self.name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._recent: Deque[SweepPass] = deque(maxlen=RECENT_PASSES)
+        self._passes = 0
+        self._lobbies = 0
+        self._sessions = 0
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Offer ``key`` to ``reclaim`` once ``time.time()`` reaches ``deadline``."""
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._order), key))
+            if self._heap[0][2] is key:
+                self._condition.notify()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def sweep(self, now: Optional[float] = None) -> SweepPass:
+        """Reclaim everything due by ``now``; the thread calls this, and so can tests."""
+        now = time.time() if now is None else now
+        due: List[Hashable] = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+        # ``reclaim`` takes the owner's locks, so it runs without ours.
+        lobbies = sessions = 0
+        for key in due:
+            try:
+                freed = self._reclaim(key, now)
+            except Exception as exc:  # noqa: BLE001 - keep the thread alive
+                print(f"[{self.name}] could not reclaim {key!r}: {exc}")
+                continue
+            if freed is not None:
+                lobbies += 1
+                sessions += freed
+        result = SweepPass(at=now, due=len(due), lobbies=lobbies, sessions=sessions)
+        with self._condition:
+            self._passes += 1
+            self._lobbies += lobbies
+            self._sessions += sessions
+            self._recent.append(result)
+        return result
+
+    def stats(self) -> SweepStats:
+        with self._condition:
+            return SweepStats(
+                passes=self._passes,
+                lobbies=self._lobbies,
+                sessions=self._sessions,
+                scheduled=len(self._heap),
+                recent=tuple(self._recent),
+            )
+
+    # ------------- thread -------------
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _wait_until_due(self) -> bool:
+        """Block until an entry is due; False once stopped."""
+        with self._condition:
+            while not self._stopped:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay <= 0:
+                    return True
+                self._condition.wait(delay)
+            return False
+
+    def _run(self) -> None:
+        while self._wait_until_due():
+            self.sweep()
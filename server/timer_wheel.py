@@ -0,0 +1,154 @@
+"""
+One hashed timer wheel for every game in the process.
+
+Games used to look for quiet players by checking every seat's clock on every
+command. Now each human seat has a deadline in the wheel, and the wheel's
+thread does nothing until a deadline comes round. The wheel is a ring of
+``slots`` buckets, each covering one ``tick`` of wall-clock time. A timer
+goes into the bucket for its deadline's tick, and deadlines beyond one
+revolution just stay put for later laps. Every tick the thread looks at one
+bucket and fires whatever is due there, so:
+
+* scheduling and cancelling are O(1), however many timers there are,
+* a tick costs the size of one bucket, not the number of timers,
+* timers fire up to one ``tick`` late, never early.
+
+Callbacks run on the wheel's thread and should only hand work to its owner
+(see ``Game.dispatch_timer``). Heartbeats do not touch the wheel at all. A
+game re-arms a seat's timer from the seat's last activity when the timer
+fires, which costs one re-arm per timeout period instead of one per
+heartbeat.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Callable, List, Optional
+
+DEFAULT_TICK = 0.5
+DEFAULT_SLOTS = 512  # one revolution is about four minutes
+
+
+class Timer:
+    __slots__ = ("deadline", "tick", "callback", "cancelled")
+
+    def __init__(self, deadline: float, tick: int, callback: Callable[[], None]) -> None:
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """O(1); the entry is dropped when its bucket next comes round."""
+        self.cancelled = True
+
+
+class TimerWheel:
+    def __init__(
+        self,
+        tick: float = DEFAULT_TICK,
+        slots: int = DEFAULT_SLOTS,
+        threaded: bool = True,
+        verbose: bool = False,
+    ) -> None:
+        """With ``threaded=False`` nothing fires until the owner calls ``advance``."""
+        if tick <= 0 or slots < 1:
+            raise ValueError("A timer wheel needs a positive tick and at least one slot.")
+        self.tick = tick
+        self.slots = slots
+        self.verbose = verbose
+        self._buckets: List[List[Timer]] = [[] for _ in range(slots)]
+        self._current = math.floor(time.time() / tick)  # last tick processed
+        self._count = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = not threaded
+        self.fired = 0
+
+    def schedule(self, deadline: float, callback: Callable[[], None]) -> Timer:
+        """Call ``callback()`` once ``time.time()`` passes ``deadline``."""
+        with self._condition:
+            tick = max(math.ceil(deadline / self.tick), self._current + 1)
+            timer = Timer(deadline, tick, callback)
+            self._buckets[tick % self.slots].append(timer)
+            self._count += 1
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(target=self._run, name="timer-wheel", daemon=True)
+                self._thread.start()
+            elif self._count == 1:
+                self._condition.notify()
+        return timer
+
+    def pending(self) -> int:
+        """Timers in the wheel, counting cancelled ones not yet dropped."""
+        with self._condition:
+            return self._count
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """Fire every timer due by ``now``; the thread calls this each tick. Returns how many fired."""
+        now = time.time() if now is None else now
+        due: List[Timer] = []
+        with self._condition:
+            target = math.floor(now / self.tick)
+            # After a long stall one lap visits every bucket; no need for more.
+            for step in range(1, min(target - self._current, self.slots) + 1):
+                bucket = self._buckets[(self._current + step) % self.slots]
+                keep = []
+                for timer in bucket:
+                    if timer.cancelled:
+                        self._count -= 1
+                    elif timer.tick <= target:
+                        self._count -= 1
+                        due.append(timer)
+                    else:
+                        keep.append(timer)
+                bucket[:] = keep
+            self._current = max(self._current, target)
+            self.fired += len(due)
+        for timer in due:
+            try:
+                timer.callback()
+            except Exception as exc:  # noqa: BLE001 - keep the wheel turning
+                self._log(f"timer callback failed: {exc}")
+        return len(due)
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(f"[TimerWheel] {message}")
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopped and not self._count:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                delay = (self._current + 1) * self.tick - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                if self._stopped:
+                    return
+            self.advance()
+
+
+_default_wheel: Optional[TimerWheel] = None
+_default_lock = threading.Lock()
+
+
+def default_wheel() -> TimerWheel:
+    """The process-wide wheel shared by every ``Game``."""
+    global _default_wheel
+    with _default_lock:
+        if _default_wheel is None:
+            _default_wheel = TimerWheel()
+        return _default_wheel
@@ -0,0 +1,224 @@
+"""
+Duplicate tournaments between bot strategy lists.
+
+Every seeded deal is replayed once per seat rotation, so each strategy holds
+every hand and the card luck cancels out. Batches of deals are spread over a
+``ProcessPoolExecutor`` and the per-worker tallies are merged into win rates,
+average points per round and 95% confidence intervals.
+
+Usage:
+    python -m server.tournament --deals 20000 --seats hard medium hard medium
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .bot_player import BotBrain, DIFFICULTY_STRATEGIES
+from .simulation import HeadlessTable, shuffled_codes
+
+Z_95 = 1.96
+
+
+def parse_seat(spec: str) -> List[str]:
+    """A seat is a difficulty name or a comma-separated list of strategy names."""
+    if spec.lower() in DIFFICULTY_STRATEGIES:
+        return list(DIFFICULTY_STRATEGIES[spec.lower()])
+    names = [name.strip() for name in spec.split(",") if name.strip()]
+    unknown = [name for name in names if not hasattr(BotBrain, f"_strategy_{name}")]
+    if not names or unknown:
+        raise ValueError(f"Unknown strategy in seat spec {spec!r}: {', '.join(unknown) or spec}")
+    return names
+
+
+@dataclass
+class Stat:
+    n: int = 0
+    total: float = 0.0
+    total_sq: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.n += 1
+        self.total += value
+        self.total_sq += value * value
+
+    def merge(self, other: "Stat") -> None:
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    def interval(self) -> Tuple[float, float]:
+        """Normal-approximation 95% confidence interval for the mean."""
+        if self.n < 2:
+            return self.mean, self.mean
+        variance = max(0.0, (self.total_sq - self.n * self.mean ** 2) / (self.n - 1))
+        half = Z_95 * math.sqrt(variance / self.n)
+        return self.mean - half, self.mean + half
+
+
+@dataclass
+class LabelTally:
+    wins: int = 0
+    samples: int = 0
+    card_points: Stat = field(default_factory=Stat)
+    net_game_points: Stat = field(default_factory=Stat)
+
+    def merge(self, other: "LabelTally") -> None:
+        self.wins += other.wins
+        self.samples += other.samples
+        self.card_points.merge(other.card_points)
+        self.net_game_points.merge(other.net_game_points)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.samples if self.samples else 0.0
+
+    def win_interval(self) -> Tuple[float, float]:
+        """Wilson score interval for the share of deals won."""
+        if not self.samples:
+            return 0.0, 0.0
+        n = self.samples
+        p = self.win_rate
+        denom = 1 + Z_95 ** 2 / n
+        centre = (p + Z_95 ** 2 / (2 * n)) / denom
+        half = Z_95 * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n)) / denom
+        return centre - half, centre + half
+
+
+@dataclass
+class TournamentTally:
+    deals: int = 0
+    passed_out: int = 0
+    labels: Dict[str, LabelTally] = field(default_factory=dict)
+
+    def label(self, name: str) -> LabelTally:
+        return self.labels.setdefault(name, LabelTally())
+
+    def merge(self, other: "TournamentTally") -> None:
+        self.deals += other.deals
+        self.passed_out += other.passed_out
+        for name, tally in other.labels.items():
+            self.label(name).merge(tally)
+
+
+def rotations(labels: Sequence[str]) -> List[List[str]]:
+    return [list(labels[shift:]) + list(labels[:shift]) for shift in range(len(labels))]
+
+
+def play_batch(labels: Sequence[str], seats: Sequence[Sequence[str]], seeds: Sequence[int]) -> TournamentTally:
+    """Worker entry point: play every seed under every seat rotation."""
+    tally = TournamentTally()
+    rotated_labels = rotations(labels)
+    rotated_seats = rotations(list(seats))
+    tables = [
+        HeadlessTable(rotated, seed=seeds[0] * 4 + shift if seeds else shift)
+        for shift, rotated in enumerate(rotated_seats)
+    ]
+    for seed in seeds:
+        deck = shuffled_codes(random.Random(seed))
+        for table, seat_labels in zip(tables, rotated_labels):
+            result = table.play_deal(deck, dealer=1)
+            tally.deals += 1
+            if result.passed_out:
+                tally.passed_out += 1
+                continue
+            teams = {"Vit": {seat_labels[0], seat_labels[2]}, "Tit": {seat_labels[1], seat_labels[3]}}
+            for team, team_labels in teams.items():
+                opponent = "Tit" if team == "Vit" else "Vit"
+                won = result.game_points[team] > 0
+                net = result.game_points[team] - result.game_points[opponent]
+                for name in team_labels:
+                    entry = tally.label(name)
+                    entry.samples += 1
+                    entry.wins += int(won)
+                    entry.card_points.add(result.card_points[team])
+                    entry.net_game_points.add(net)
+    return tally
+
+
+def _chunks(seeds: Sequence[int], size: int) -> Iterable[Sequence[int]]:
+    for start in range(0, len(seeds), size):
+        yield seeds[start:start + size]
+
+
+def run_tournament(
+    seat_specs: Sequence[str],
+    deals: int,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = 250,
+) -> TournamentTally:
+    if len(seat_specs) != 4:
+        raise ValueError("A tournament needs exactly four seat specs.")
+    seats = [parse_seat(spec) for spec in seat_specs]
+    labels = list(seat_specs)
+    seeds = [seed * 1_000_003 + offset for offset in range(deals)]
+    total = TournamentTally()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(seeds, chunk_size):
+            total.merge(play_batch(labels, seats, chunk))
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(play_batch, labels, seats, chunk)
+            for chunk in _chunks(seeds, chunk_size)
+        ]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def format_report(tally: TournamentTally) -> str:
+    lines = [
+        f"Deals played: {tally.deals} ({tally.passed_out} passed out)",
+        f"{'strategy':<16}{'samples':>9}{'win rate':>20}{'card pts/round':>24}{'net game pts/round':>26}",
+    ]
+    for name, entry in sorted(tally.labels.items()):
+        low, high = entry.win_interval()
+        card_low, card_high = entry.card_points.interval()
+        net_low, net_high = entry.net_game_points.interval()
+        lines.append(
+            f"{name:<16}{entry.samples:>9}"
+            f"{entry.win_rate:>8.3f} [{low:.3f},{high:.3f}]"
+            f"{entry.card_points.mean:>10.2f} [{card_low:.2f},{card_high:.2f}]"
+            f"{entry.net_game_points.mean:>10.3f} [{net_low:.3f},{net_high:.3f}]"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a duplicate Sjavs bot tournament.")
+    parser.add_argument("--deals", type=int, default=2000, help="Seeded deals to play (default: 2000)")
+    parser.add_argument(
+        "--seats",
+        nargs=4,
+        default=["hard", "medium", "hard", "medium"],
+        metavar="SPEC",
+        help="Seats 1-4: a difficulty or comma-separated strategy names.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for the deals (default: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=250, help="Deals per worker batch (default: 250)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tally = run_tournament(args.seats, args.deals, args.seed, args.workers, args.chunk)
+    elapsed = time.perf_counter() - start
+    print(format_report(tally))
+    print(f"Elapsed {elapsed:.2f}s ({tally.deals / elapsed:,.0f} deals/s including rotations)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Incremental card knowledge for a bot's seat.
+
+``CardTracker`` follows the cards played in a round and keeps, as masks:
+
+* every card played, overall and per seat;
+* for each seat, the cards it cannot hold because it failed to follow a lead
+  (a void in a plain suit, or in trumps);
+* how many trumps have been played.
+
+Recording a card is a handful of mask operations, so strategies can ask
+"which cards are still out", "is seat 3 void in spades" or "how many trumps
+can the opponents still hold" without rescanning the round.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from . import cards
+
+SEATS = (1, 2, 3, 4)
+
+
+class CardTracker:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the round (and its trump)."""
+        self.trump: Optional[str] = None
+        self._trumps = 0
+        self.plays: List[Tuple[int, str]] = []  # this round's cards with their seats, in order
+        self.played = 0
+        self.played_by: Dict[int, int] = {seat: 0 for seat in SEATS}
+        self.barred: Dict[int, int] = {seat: 0 for seat in SEATS}
+        self.trumps_played = 0
+        self._in_trick = 0
+        self._follow = 0
+
+    def set_trump(self, trump: Optional[str]) -> None:
+        self.trump = trump[0].upper() if trump else None
+        self._trumps = cards.trump_mask(self.trump) if self.trump else 0
+        self.trumps_played = (self.played & self._trumps).bit_count()
+
+    def record(self, seat: int, card: str) -> None:
+        """Note ``card`` played by ``seat``; repeats of a recorded card are ignored."""
+        index = cards.CARD_INDEX.get(card)
+        if index is None:
+            return
+        bit = 1 << index
+        if self.played & bit:
+            return
+        self.plays.append((seat, card))
+        self.played |= bit
+        self.played_by[seat] = self.played_by.get(seat, 0) | bit
+        if self._trumps & bit:
+            self.trumps_played += 1
+        if not self._in_trick:
+            self._follow = (
+                cards.follow_mask(index, self.trump) if self.trump
+                else cards.SUIT_MASKS[cards.SUITS[index >> 3]]
+            )
+        elif not self._follow & bit:
+            self.barred[seat] = self.barred.get(seat, 0) | self._follow
+        self._in_trick = (self._in_trick + 1) % 4
+
+    def end_trick(self) -> None:
+        self._in_trick = 0
+
+    # ------------- queries -------------
+    def unseen(self, hand_mask: int = 0) -> int:
+        """Cards neither played nor in ``hand_mask`` (the asking seat's own hand)."""
+        return cards.FULL_MASK & ~self.played & ~hand_mask
+
+    def possible(self, seat: int, hand_mask: int = 0) -> int:
+        """Unseen cards ``seat`` may still hold."""
+        return self.unseen(hand_mask) & ~self.barred.get(seat, 0)
+
+    def is_void(self, seat: int, card: str) -> bool:
+        """Whether ``seat`` has shown out of whatever a lead of ``card`` calls for."""
+        index = cards.CARD_INDEX[card]
+        follow = (
+            cards.follow_mask(index, self.trump) if self.trump
+            else cards.SUIT_MASKS[cards.SUITS[index >> 3]]
+        )
+        return self.barred.get(seat, 0) & follow == follow
+
+    def trumps_outstanding(self, hand_mask: int = 0) -> int:
+        """Trumps not yet played and not in ``hand_mask``."""
+        return (self.unseen(hand_mask) & self._trumps).bit_count()
+
+    def trumps_possible(self, seats: Tuple[int, ...], hand_mask: int = 0) -> int:
+        """Outstanding trumps that any of ``seats`` may still hold."""
+        mask = 0
+        for seat in seats:
+            mask |= self.possible(seat, hand_mask)
+        return (mask & self._trumps).bit_count()
@@ -0,0 +1,164 @@
+"""
+Long-lived client connections for remote bots (``BotBrain`` ``send_fn``).
+
+``ConnectionPool`` keeps up to ``size`` open connections to one server and
+lends one out per command, so a process running many bots opens a bounded
+number of sockets instead of one per command. Broken or timed-out
+connections are discarded and the command is retried on a fresh connection
+with exponential backoff.
+
+By default connections speak the framed ``SJAVS/1`` protocol
+(``server.protocol``). ``legacy=True`` keeps persistent connections but uses
+the original one-command-per-packet protocol, for the ``--blocking`` server.
+"""
+
+from __future__ import annotations
+
+import random
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+
+from .protocol import FramedClient, ProtocolError
+
+DEFAULT_TIMEOUT = 3.0
+LEGACY_READ_SIZE = 4096
+
+
+class LegacyConnection:
+    """A persistent connection using the unframed protocol, one command at a time."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+
+    @classmethod
+    def connect(cls, host: str, port: int, timeout: Optional[float] = DEFAULT_TIMEOUT) -> "LegacyConnection":
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(sock)
+
+    def request(self, command: str) -> str:
+        self._sock.sendall(command.encode())
+        data = self._sock.recv(LEGACY_READ_SIZE)
+        if not data:
+            raise ConnectionError("Server closed the connection.")
+        return data.decode()
+
+    def close(self) -> None:
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded pool of persistent connections. Call the pool (or its
+    ``send`` method) with a command to get the server's reply.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        size: int = 4,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        legacy: bool = False,
+        retries: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 5.0,
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be positive.")
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self.legacy = legacy
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.connects = 0  # connections opened over the pool's lifetime
+        self._idle: List = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        self._closed = False
+
+    def __call__(self, command: str) -> str:
+        return self.send(command)
+
+    def send(self, command: str) -> str:
+        """
+        Send one command and return the reply. Failed attempts are retried on
+        a new connection; a command may therefore reach the server twice if the
+        connection broke after it was sent.
+        """
+        delay = self.backoff
+        attempt = 0
+        while True:
+            try:
+                return self._send_once(command)
+            except (OSError, ProtocolError):
+                attempt += 1
+                if attempt > self.retries or self._closed:
+                    raise
+            time.sleep(min(delay, self.max_backoff) * random.uniform(0.5, 1.0))
+            delay *= 2
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def __enter__(self) -> "ConnectionPool":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def _send_once(self, command: str) -> str:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("No pooled connection became free in time.")
+        try:
+            connection = self._checkout()
+            try:
+                reply = connection.request(command)
+            except BaseException:
+                connection.close()  # state unknown after a failure or timeout
+                raise
+            self._checkin(connection)
+            return reply
+        finally:
+            self._slots.release()
+
+    def _checkout(self):
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("Connection pool is closed.")
+            if self._idle:
+                return self._idle.pop()
+            self.connects += 1
+        if self.legacy:
+            return LegacyConnection.connect(self.host, self.port, self.timeout)
+        return FramedClient.connect(self.host, self.port, timeout=self.timeout)
+
+    def _checkin(self, connection) -> None:
+        with self._lock:
+            if not self._closed:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+
+def connect_per_command(host: str, port: int, timeout: float = DEFAULT_TIMEOUT) -> Callable[[str], str]:
+    """The original transport: a new TCP connection for every command."""
+
+    def send(message: str) -> str:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.sendall(message.encode("utf-8"))
+            return sock.recv(LEGACY_READ_SIZE).decode("utf-8")
+
+    return send
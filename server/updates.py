@@ -0,0 +1,224 @@
+"""
+Bounded, sequence-numbered update log shared by every seat of a game.
+
+Each message is stored once with a monotonically increasing ``seq`` and an
+optional recipient (``None`` means every seat). Seats read "everything after
+seq N", either by passing N explicitly (reconnecting clients) or through the
+per-seat cursor that the ``GU`` command advances.
+
+Eviction policy: the log keeps the newest ``capacity`` events and drops the
+oldest ones first. A reader whose position is older than the oldest retained
+event is told it missed updates instead of the log growing without bound.
+
+Listeners registered with ``add_listener`` are called with each new event
+after the lock is released, and optionally when the log is cleared; that is
+how ``/ws`` pushes updates and how ``/updates`` long-polls without a thread.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+UPDATE_LOG_CAPACITY = 256
+DROPPED_NOTICE = "Some earlier updates were dropped."
+
+
+@dataclass(frozen=True)
+class UpdateEvent:
+    seq: int
+    text: str
+    recipient: Optional[int] = None
+
+    def visible_to(self, player_id: int) -> bool:
+        return self.recipient is None or self.recipient == player_id
+
+
+class UpdateLog:
+    def __init__(self, capacity: int = UPDATE_LOG_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("Update log capacity must be positive.")
+        self.capacity = capacity
+        self._events: Deque[UpdateEvent] = deque()
+        self._cursors: Dict[int, int] = {}
+        self.last_seq = 0
+        self.evicted_through = 0  # seq of the newest event that was dropped
+        self._lock = threading.RLock()
+        # (on_event, on_clear) pairs; on_clear may be None.
+        self._listeners: List[Tuple[Callable[[UpdateEvent], None], Optional[Callable[[], None]]]] = []
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def publish(self, text: str, recipient: Optional[int] = None) -> int:
+        with self._lock:
+            self.last_seq += 1
+            if len(self._events) >= self.capacity:
+                self.evicted_through = self._events.popleft().seq
+            event = UpdateEvent(self.last_seq, text, recipient)
+            self._events.append(event)
+            listeners = list(self._listeners)
+        for listener, _ in listeners:
+            listener(event)
+        return event.seq
+
+    def add_listener(
+        self,
+        listener: Callable[[UpdateEvent], None],
+        on_clear: Optional[Callable[[], None]] = None,
+    ) -> Callable[[], None]:
+        """
+        Call ``listener`` with every event published from now on, and
+        ``on_clear`` (if given) whenever the log is cleared; returns a remover.
+        """
+        entry = (listener, on_clear)
+        with self._lock:
+            self._listeners.append(entry)
+
+        def remove() -> None:
+            with self._lock:
+                if entry in self._listeners:
+                    self._listeners.remove(entry)
+
+        return remove
+
+    def register(self, player_id: int) -> None:
+        """Start a seat's cursor at the current end of the log."""
+        self._cursors[player_id] = self.last_seq
+
+    def cursor(self, player_id: int) -> int:
+        return self._cursors.get(player_id, self.last_seq)
+
+    def since(self, player_id: int, seq: int) -> Tuple[List[UpdateEvent], bool]:
+        """Return events after ``seq`` visible to the seat, and whether some were evicted."""
+        with self._lock:
+            missed = seq < self.evicted_through
+            events = [
+                event
+                for event in self._events_after(seq)
+                if event.visible_to(player_id)
+            ]
+            return events, missed
+
+    def read(self, player_id: int) -> List[str]:
+        """Return unread messages for the seat and advance its cursor (``GU``)."""
+        with self._lock:
+            events, missed = self.since(player_id, self.cursor(player_id))
+            self._cursors[player_id] = self.last_seq
+        messages = [event.text for event in events]
+        if missed:
+            messages.insert(0, DROPPED_NOTICE)
+        return messages
+
+    def pending(self, player_id: int) -> List[str]:
+        """Unread messages for the seat without advancing its cursor."""
+        events, _ = self.since(player_id, self.cursor(player_id))
+        return [event.text for event in events]
+
+    def mark_read(self, player_id: int) -> None:
+        self._cursors[player_id] = self.last_seq
+
+    def remap(self, seat_map: Dict[int, int]) -> None:
+        """Renumber recipients and cursors after seats shift; unmapped seats are dropped."""
+        with self._lock:
+            self._events = deque(
+                event if event.recipient is None else UpdateEvent(event.seq, event.text, seat_map[event.recipient])
+                for event in self._events
+                if event.recipient is None or event.recipient in seat_map
+            )
+            self._cursors = {
+                seat_map[pid]: cursor
+                for pid, cursor in self._cursors.items()
+                if pid in seat_map
+            }
+
+    def clear(self) -> None:
+        """Forget every event and cursor; sequence numbers keep increasing."""
+        with self._lock:
+            self._events.clear()
+            self._cursors.clear()
+            self.evicted_through = self.last_seq
+            listeners = [on_clear for _, on_clear in self._listeners if on_clear is not None]
+        for on_clear in listeners:
+            on_clear()
+
+    def dump(self) -> Dict[str, object]:
+        """Events, cursors and sequence counters as plain data (see ``server.snapshot``)."""
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "last_seq": self.last_seq,
+                "evicted_through": self.evicted_through,
+                "events": [[event.seq, event.text, event.recipient] for event in self._events],
+                "cursors": [[pid, cursor] for pid, cursor in self._cursors.items()],
+            }
+
+    @classmethod
+    def load(cls, data: Dict[str, object]) -> "UpdateLog":
+        """The log ``dump`` described; readers resume from their old sequence numbers."""
+        log = cls(int(data["capacity"]))
+        log.last_seq = int(data["last_seq"])
+        log.evicted_through = int(data["evicted_through"])
+        log._events = deque(UpdateEvent(seq, text, recipient) for seq, text, recipient in data["events"])
+        log._cursors = {int(pid): int(cursor) for pid, cursor in data["cursors"]}
+        return log
+
+    def _events_after(self, seq: int) -> Iterator[UpdateEvent]:
+        events = self._events
+        if not events or seq >= events[-1].seq:
+            return iter(())
+        # Sequence numbers increase through the deque but may have gaps where
+        # ``remap`` dropped a departed seat's private messages.
+        start = bisect_right(events, seq, key=lambda event: event.seq)
+        return (events[index] for index in range(start, len(events)))
+
+
+class _SeatUpdates:
+    """List-like view of one seat's unread messages."""
+
+    def __init__(self, log: UpdateLog, player_id: int) -> None:
+        self._log = log
+        self._player_id = player_id
+
+    def append(self, message: str) -> None:
+        self._log.publish(message, recipient=self._player_id)
+
+    def clear(self) -> None:
+        self._log.mark_read(self._player_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._log.pending(self._player_id))
+
+    def __len__(self) -> int:
+        return len(self._log.pending(self._player_id))
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+class PendingUpdatesView(Mapping):
+    """
+    Read-compatible stand-in for the old ``updatesForPlayers`` dict of lists:
+    ``view[pid]`` lists the seat's unread messages and ``append`` publishes a
+    private message to it.
+    """
+
+    def __init__(self, log: UpdateLog, seats) -> None:
+        self._log = log
+        self._seats = seats
+
+    def __getitem__(self, player_id: int) -> _SeatUpdates:
+        return _SeatUpdates(self._log, player_id)
+
+    def __contains__(self, player_id: object) -> bool:
+        return player_id in self._seats
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._seats))
+
+    def __len__(self) -> int:
+        return len(self._seats)
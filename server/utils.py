@@ -3,6 +3,11 @@ from __future__ import annotations
 import random
 import time
 
+from . import cards as engine
+from . import declarations
+
+VALUE_POINTS = {1: 11, 10: 10, 11: 2, 12: 3, 13: 4}
+
 
 class Table:
     def __init__(self, trump):
@@ -11,42 +16,29 @@ class Table:
         self.firstCard: Card | None = None
         self.trump = trump[0].upper()
         self.team_piles: dict[str, list[Card]] = {'Vit': [], 'Tit': []}
+        self.pile_masks: dict[str, int] = {'Vit': 0, 'Tit': 0}
+        self.seen_mask: int = 0
         self.last_winning_card: Card | None = None
         self.last_winning_owner_id: int | None = None
 
-    @staticmethod
-    def _card_value_rank(card: "Card") -> int:
-        return 14 if card.value == 1 else card.value
-
     def clear_and_reset(self) -> int:
         if not self.cards or not self.cardOwners:
             raise ValueError("No cards have been played on the table.")
         if self.firstCard is None:
             raise ValueError("The first card of the trick is unknown.")
 
-        lead_suit = self.firstCard.suit
-
-        def strength(card: "Card") -> tuple[int, int]:
-            short = card.short_name()
-            if short in Card.TRUMPS:
-                # Higher-ranked permanent trumps should win over all other cards.
-                return 3, len(Card.TRUMPS) - Card.TRUMPS.index(short)
-            if card.is_trump(self.trump):
-                return 2, self._card_value_rank(card)
-            if card.suit == lead_suit:
-                return 1, self._card_value_rank(card)
-            return 0, self._card_value_rank(card)
-
-        winner_index, _ = max(
-            enumerate(self.cards),
-            key=lambda item: (strength(item[1]), -item[0]),
-        )
+        winner_index = engine.trick_winner([card.index for card in self.cards], self.trump)
         winner = self.cardOwners[winner_index]
         winning_card = self.cards[winner_index]
         self.last_winning_card = winning_card
         self.last_winning_owner_id = winner.id
         team = 'Vit' if winner.id in (1, 3) else 'Tit'
         self.team_piles[team].extend(self.cards)
+        trick_mask = 0
+        for card in self.cards:
+            trick_mask |= card.bit
+        self.pile_masks[team] |= trick_mask
+        self.seen_mask |= trick_mask
         self.cards.clear()
         self.cardOwners.clear()
         self.firstCard = None
@@ -66,8 +58,8 @@ class Table:
     def play_other_card(self, card, player) -> str:
         ok_card = take_card(player, card)
         if ok_card:
-            if (ok_card.is_suit(self.firstCard, self.trump) or
-                    (not any([x.is_suit(self.firstCard, self.trump) for x in player.hand]))):
+            follow = engine.follow_mask(self.firstCard.index, self.trump)
+            if (ok_card.bit & follow) or not (player.hand.mask & follow):
                 self.cards.append(ok_card)
                 self.cardOwners.append(player)
                 return "OK"
@@ -78,9 +70,12 @@ class Table:
             return "Tú hevur ikki kortið"
 
     def sum_cards_list(self, key):
-        values = {1: 11, 10: 10, 11: 2, 12: 3, 13: 4}
         pile = self.team_piles.get(key) or self.team_piles.get(key.title(), [])
-        return sum(values.get(x.value, 0) for x in pile)
+        return sum(VALUE_POINTS.get(x.value, 0) for x in pile)
+
+    def pile_points(self, key: str) -> int:
+        """Points in a team pile, read from the mask kept by ``clear_and_reset``."""
+        return engine.mask_points(self.pile_masks.get(key.title(), 0))
 
 
 class Card:
@@ -106,14 +101,20 @@ class Card:
         'Clubs':'C',
     }
 
-    TRUMPS = ['QC', 'QS', 'JC', 'JS', 'JH', 'JD']
+    TRUMPS = list(engine.PERMANENT_TRUMPS)
+
+    __slots__ = ("suit", "value", "code", "index", "bit")
 
     def __init__(self, suit, value):
         self.suit = suit
         self.value = value
+        self.code = f"{self.short_value[value]}{self.short_suites[suit]}"
+        # Position in the 32-card engine; raises for cards outside the Sjavs pack.
+        self.index = engine.card_index(self.code)
+        self.bit = 1 << self.index
 
     def short_name(self):
-        return f"{self.short_value[self.value]}{self.short_suites[self.suit]}"
+        return self.code
 
     def long_name(self):
         value_names = {1: "Ace", 11: "Jack", 12: "Queen", 13: "King"}
@@ -122,29 +123,93 @@ class Card:
         return f"{val} of {self.suit}"
 
     def is_trump(self, trump) -> bool:
-        trump = trump[0].upper()
-        return (self.short_name()[1] == trump) or (self.short_name() in self.TRUMPS)
+        return bool(engine.trump_mask(trump) & self.bit)
 
     def is_suit(self, first_card, trump:str) -> bool:
-        trump = trump[0].upper()
-        
-        if first_card.is_trump(trump):
-            return self.is_trump(trump)
-        
-        return (self.suit == first_card.suit) and (self.short_name() not in self.TRUMPS)
+        return bool(engine.follow_mask(first_card.index, trump) & self.bit)
 
     def __eq__(self, other):
         if type(other) == Card:
-            return (self.value == other.value) and (self.suit == other.suit)
+            return self.index == other.index
         elif type(other) == str:
-            return self.short_name() == other
+            return self.code == other
         return False
 
+    def __hash__(self):
+        return self.index
+
     def __str__(self):
-        return self.short_name()
+        return self.code
 
     def __repr__(self):
-        return self.__str__()
+        return self.code
+
+
+class Hand(list):
+    """
+    List of cards that keeps a 32-bit mask of its contents in sync, so
+    membership and follow-suit checks never have to walk the list.
+    """
+
+    def __init__(self, cards=()):
+        super().__init__(cards)
+        self.mask = 0
+        for card in self:
+            self.mask |= card.bit
+
+    def _rebuild(self) -> None:
+        mask = 0
+        for card in self:
+            mask |= card.bit
+        self.mask = mask
+
+    def append(self, card):
+        super().append(card)
+        self.mask |= card.bit
+
+    def extend(self, cards):
+        super().extend(cards)
+        self._rebuild()
+
+    def __iadd__(self, cards):
+        super().__iadd__(cards)
+        self._rebuild()
+        return self
+
+    def insert(self, position, card):
+        super().insert(position, card)
+        self.mask |= card.bit
+
+    def pop(self, position=-1):
+        card = super().pop(position)
+        self._rebuild()
+        return card
+
+    def remove(self, card):
+        super().remove(card)
+        self._rebuild()
+
+    def clear(self):
+        super().clear()
+        self.mask = 0
+
+    def __setitem__(self, position, value):
+        super().__setitem__(position, value)
+        self._rebuild()
+
+    def __delitem__(self, position):
+        super().__delitem__(position)
+        self._rebuild()
+
+    def position_of(self, index: int) -> int:
+        """Return the list position of the card with engine ``index`` or -1."""
+        if not self.mask >> index & 1:
+            return -1
+        for position, card in enumerate(self):
+            if card.index == index:
+                return position
+        return -1
+
 
 class Deck:
     def __init__(self):
@@ -156,9 +221,9 @@ class Deck:
         # Enhanced display method that joins string representations of each card
         return '\n'.join(str(card) for card in self.cards)
 
-    def shuffle(self):
+    def shuffle(self, rng=None):
         # Using the built-in random.shuffle for better performance and readability
-        random.shuffle(self.cards)
+        (rng or random).shuffle(self.cards)
 
     def deal(self):
         # Added error handling to avoid exceptions when the deck is empty
@@ -177,34 +242,28 @@ class Player:
     def __init__(self, name, id=None):
         self.name = name
         self.id = id
-        self.hand = []
+        self.hand = Hand()
         self.last_update_time = time.time()
+        # Bots driven by the server's own events never go quiet or time out.
+        self.in_process = False
 
-    def find_highest_trump_declaration(self):
-        high_trumps_count = 0
-        normal_cards = []
-        for card in self.hand:
-            if (card.value == 12 and card.suit in ['Clubs', 'Spades']) or (card.value == 11):
-                high_trumps_count += 1
-            else:
-                normal_cards.append(card)
-        suit_counts = {'Hearts': 0, 'Clubs': 0, 'Diamonds': 0, 'Spades': 0}
-        for card in normal_cards:
-            suit_counts[card.suit] += 1
+    @property
+    def hand(self) -> Hand:
+        return self._hand
 
-        for suit in suit_counts:
-            suit_counts[suit] += high_trumps_count
-        longest_length = max(suit_counts.values())
-        if longest_length < 5:
-            return "0"  # If no suit has 5 or more cards including high trumps
-        longest_suits = [suit for suit, count in suit_counts.items() if count == longest_length]
+    @hand.setter
+    def hand(self, cards) -> None:
+        self._hand = cards if isinstance(cards, Hand) else Hand(cards)
 
-        return str(longest_length) + ''.join([x[0] for x in longest_suits])
+    def find_highest_trump_declaration(self):
+        return declarations.lookup(self.hand.mask)
 
     def update_last_time(self):
         self.last_update_time = time.time()
 
     def time_since_last_update(self):
+        if self.in_process:
+            return 0.0
         return time.time() - self.last_update_time
 
     def say_hello(self):
@@ -238,8 +297,13 @@ class Player:
 
 
 def take_card(player, card) -> Card | None:
-    try:
-        card_loc = player.hand.index(card)
-    except ValueError:
+    if isinstance(card, Card):
+        index = card.index
+    else:
+        index = engine.CARD_INDEX.get(card)
+        if index is None:
+            return None
+    card_loc = player.hand.position_of(index)
+    if card_loc < 0:
         return None
     return player.hand.pop(card_loc)
@@ -1,21 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from threading import Lock, Thread
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
 from uuid import uuid4
 import time
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from .app import HOST as TCP_HOST, PORT as TCP_PORT, start_server
+from . import cards, endgame
+from .actor import ActorClosed, GameActor
+from .app import HOST as TCP_HOST, PORT as TCP_PORT, start_async_server
 from .bot_manager import BotManager
-from .game import Game
+from .game import INACTIVITY_TIMEOUT_SECONDS, Game
+from .journal import Journal, journal_path
+from .push import GameFeed
+from .snapshot import game_state, read_snapshot, restore_game, write_snapshot
+from .sweeper import Sweeper
+from .updates import UpdateEvent, UpdateLog
+from .utils import Player
 
 app = FastAPI(title="Sjavs Web Gateway")
 
@@ -27,6 +41,29 @@ app.add_middleware(
 )
 
 
+@dataclass(frozen=True)
+class LobbySnapshot:
+    """
+    What request handlers see of a lobby. Published by the lobby's actor after
+    every change and never mutated, so it is read without any lock.
+    """
+
+    version: int
+    phase: str
+    players: Tuple[Tuple[int, Player], ...]
+    presence: Tuple[int, ...]
+    # When the finished trick on show expires; 0.0 if none is.
+    last_trick_expire: float
+    reset_message: Optional[str]
+    # player_id -> the seat's most recent (version, encoded StateResponse)
+    # pairs, newest last. Seats played by in-process bots are left out.
+    seats: Mapping[int, Tuple[Tuple[int, Dict[str, Any]], ...]]
+
+    @property
+    def player_count(self) -> int:
+        return len(self.players)
+
+
 @dataclass
 class LobbyRecord:
     lobby_id: str
@@ -34,21 +71,88 @@ class LobbyRecord:
     game: Game
     bot_manager: BotManager
     created_at: float
+    feed: GameFeed
+    # Seconds a seat may stay silent before the table resets.
+    inactivity_timeout: float = INACTIVITY_TIMEOUT_SECONDS
+    # Seats last seen as connected; a change bumps the game's state version.
+    # Only the actor reads or writes it.
+    presence: Tuple[int, ...] = ()
+    # The single writer for ``game``; set by ``assemble_lobby``.
+    actor: Optional[GameActor[LobbySnapshot]] = None
+    # When a request last reached the lobby; it hibernates once this is old.
+    last_active: float = 0.0
+
+    @property
+    def snapshot(self) -> LobbySnapshot:
+        return self.actor.snapshot
+
+
+@dataclass(frozen=True)
+class HibernatedLobby:
+    """A lobby put away on disk: enough to list it, wake it or let it expire."""
 
+    lobby_id: str
+    name: str
+    created_at: float
+    inactivity_timeout: float
+    phase: str
+    player_count: int
+    path: Path
+    # By then every human seat would have timed out, so it is dropped unwoken.
+    expires_at: float
+
+
+# Seconds a bot "thinks" before reacting; scheduled, so it costs no thread.
+BOT_THINK_DELAY_SECONDS = 0.6
 
 legacy_tcp_game = Game()
-legacy_tcp_bot_manager = BotManager(legacy_tcp_game)
+legacy_tcp_bot_manager = BotManager(legacy_tcp_game, think_delay=BOT_THINK_DELAY_SECONDS)
 legacy_tcp_game.attach_bot_manager(legacy_tcp_bot_manager)
 tcp_thread: Optional[Thread] = None
-
-session_lock = Lock()
+# Every live table and session is journaled (``server.journal``) and comes
+# back from it on startup; the TCP table is kept under this id. Opened by
+# ``restore_tables`` at startup, at ``journal_path()``; None until then.
+journal: Optional[Journal] = None
+LEGACY_TCP_GAME_ID = "tcp"
+
+# Guards ``sessions``, ``lobbies``, ``hibernated`` and ``lobby_tokens`` only. Games are
+# reached through their actors, and no code waits on an actor while holding
+# this lock (actors may take it briefly, e.g. to remap seats after a player
+# leaves).
+registry_lock = Lock()
 sessions: Dict[str, Dict[str, Any]] = {}
 lobbies: Dict[str, LobbyRecord] = {}
+# Lobbies idle for ``HIBERNATE_AFTER_SECONDS``, kept on disk instead of in ``lobbies``.
+hibernated: Dict[str, HibernatedLobby] = {}
+# lobby_id -> tokens of its sessions, so nothing has to scan ``sessions``.
+lobby_tokens: Dict[str, Set[str]] = {}
+# lobby_id -> lock held while that lobby is read back from disk, so requests
+# arriving together wake it once. Entries are added and removed under
+# ``registry_lock``.
+waking: Dict[str, Lock] = {}
 EMPTY_LOBBY_TTL_SECONDS = 120
+# A lobby no request has reached for this long is written to disk and evicted.
+HIBERNATE_AFTER_SECONDS = 600
+HIBERNATION_DIR = Path(__file__).resolve().parent / "data" / "lobbies"
+MAX_UPDATES_WAIT_SECONDS = 30.0
+# An idle /ws connection still counts as a heartbeat for its seat this often.
+SOCKET_HEARTBEAT_SECONDS = 0.5
+# Close codes for /ws: 4000 + the HTTP status the same failure would return.
+SOCKET_CLOSE_BASE = 4000
+# Snapshots kept per seat for /state?since=<version> deltas.
+STATE_HISTORY = 8
+# A seat shows as connected while it has been heard from this recently.
+PLAYER_OK_SECONDS = 0.7
+# Bounds for a lobby's own inactivity timeout. Tables played over days stay
+# open that long, mostly hibernated.
+MIN_INACTIVITY_TIMEOUT_SECONDS = 10.0
+MAX_INACTIVITY_TIMEOUT_SECONDS = 7 * 24 * 3600.0
 
 
 class CreateLobbyRequest(BaseModel):
     name: Optional[str] = None
+    # Seconds of silence before the table resets; the server default if omitted.
+    inactivity_timeout: Optional[float] = None
 
 
 class LeaveRequest(BaseModel):
@@ -63,6 +167,7 @@ class LobbyResponse(BaseModel):
     max_players: int
     can_join: bool
     can_start: bool
+    inactivity_timeout: float = INACTIVITY_TIMEOUT_SECONDS
 
 
 class LobbyListResponse(BaseModel):
@@ -93,9 +198,35 @@ class CommandResponse(BaseModel):
 
 class UpdatesResponse(BaseModel):
     message: str
+    seq: int = 0
+
+
+class SweepPassResponse(BaseModel):
+    at: float
+    due: int
+    lobbies: int
+    sessions: int
+
+
+class SweepStatsResponse(BaseModel):
+    passes: int
+    lobbies: int
+    sessions: int
+    scheduled: int
+    recent: List[SweepPassResponse]
+
+
+class ServerStatsResponse(BaseModel):
+    lobbies: int
+    hibernated: int
+    sessions: int
+    # Empty lobbies and sessions reclaimed, and lobbies put to disk.
+    sweeper: SweepStatsResponse
+    hibernator: SweepStatsResponse
 
 
 class StateResponse(BaseModel):
+    version: int = 0
     player_id: int
     lobby_id: str
     lobby_name: str
@@ -128,66 +259,255 @@ def make_lobby_name(index: int) -> str:
     return f"Table {index}"
 
 
-def create_lobby_record(name: Optional[str] = None) -> LobbyRecord:
-    lobby_index = len(lobbies) + 1
+def create_lobby_record(name: Optional[str] = None, inactivity_timeout: Optional[float] = None) -> LobbyRecord:
+    if inactivity_timeout is None:
+        inactivity_timeout = INACTIVITY_TIMEOUT_SECONDS
+    if not MIN_INACTIVITY_TIMEOUT_SECONDS <= inactivity_timeout <= MAX_INACTIVITY_TIMEOUT_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"inactivity_timeout must be between {MIN_INACTIVITY_TIMEOUT_SECONDS:g} "
+                f"and {MAX_INACTIVITY_TIMEOUT_SECONDS:g} seconds."
+            ),
+        )
+    lobby_index = len(lobbies) + len(hibernated) + 1
     lobby_id = uuid4().hex[:8]
     lobby_name = (name or "").strip() or make_lobby_name(lobby_index)
-    game = Game()
-    bot_manager = BotManager(game)
+    game = Game(inactivity_timeout=inactivity_timeout)
+    return assemble_lobby(lobby_id, lobby_name, game, time.time())
+
+
+def assemble_lobby(lobby_id: str, name: str, game: Game, created_at: float) -> LobbyRecord:
+    """Wrap a new or restored game in a lobby with its bot manager, feed and actor."""
+    bot_manager = BotManager(game, think_delay=BOT_THINK_DELAY_SECONDS)
     game.attach_bot_manager(bot_manager)
-    return LobbyRecord(
+    lobby = LobbyRecord(
         lobby_id=lobby_id,
-        name=lobby_name,
+        name=name,
         game=game,
         bot_manager=bot_manager,
-        created_at=time.time(),
+        created_at=created_at,
+        feed=GameFeed(game.updates),
+        inactivity_timeout=game.inactivity_timeout,
+        last_active=time.time(),
     )
+    lobby.actor = GameActor(game, partial(publish_snapshot, lobby))
+    # Bots' commands and expired inactivity timers queue up with everyone else's.
+    bot_manager.send_fn = lobby.actor.command
+    game.dispatch_timer = partial(lobby.actor.submit, run_timer)
+    if journal is not None:
+        journal.attach(lobby_id, game, {"name": name, "created_at": created_at})
+    lobby_hibernator.schedule(lobby_id, lobby.last_active + HIBERNATE_AFTER_SECONDS)
+    return lobby
+
+
+def run_timer(game: Game, callback: Callable[[], None]) -> None:
+    callback()
+
+
+def close_lobby(lobby: LobbyRecord) -> None:
+    lobby.actor.close()
+    lobby.bot_manager.stop_all()
+    lobby.feed.close()
+    lobby.game.close()
+
+
+def ask(lobby: LobbyRecord, fn: Callable[..., Any], *args: Any) -> Any:
+    """Run ``fn(game, *args)`` on the lobby's actor and wait for the result."""
+    try:
+        return lobby.actor.call(fn, *args)
+    except ActorClosed:
+        pass
+    # Hibernated between the lookup and the call: wake it and ask again.
+    current = awake_lobby(lobby.lobby_id)
+    if current is None or current is lobby:
+        raise HTTPException(status_code=410, detail="Lobby no longer exists.")
+    return ask(current, fn, *(current if arg is lobby else arg for arg in args))
+
+
+def awake_lobby(lobby_id: str) -> Optional[LobbyRecord]:
+    """
+    The lobby, read back from disk first if it was hibernating, and marked as
+    active. Call without ``registry_lock``: the snapshot is read and the game
+    rebuilt outside it, under the lobby's entry in ``waking``, and the lock is
+    taken again only to install the result.
+    """
+    with registry_lock:
+        lobby = lobbies.get(lobby_id)
+        if lobby is not None:
+            lobby.last_active = time.time()
+            return lobby
+        if lobby_id not in hibernated:
+            return None
+        guard = waking.setdefault(lobby_id, Lock())
+    with guard:
+        with registry_lock:
+            lobby = lobbies.get(lobby_id)
+            record = hibernated.get(lobby_id) if lobby is None else None
+            if record is None:
+                # Woken by whoever held the guard before us, or expired meanwhile.
+                if waking.get(lobby_id) is guard:
+                    del waking[lobby_id]
+                if lobby is not None:
+                    lobby.last_active = time.time()
+                return lobby
+        lobby = rehydrate_lobby(record)
+        with registry_lock:
+            if waking.get(lobby_id) is guard:
+                del waking[lobby_id]
+            installed = hibernated.get(lobby_id) is record
+            if installed:
+                del hibernated[lobby_id]
+                if lobby is not None:
+                    lobbies[lobby_id] = lobby
+                    lobby.last_active = time.time()
+    if lobby is not None and not installed:
+        # Expired while it was being read back (see ``expire_lobby``).
+        close_lobby(lobby)
+        if journal is not None:
+            journal.drop(lobby_id)
+        return None
+    if installed:
+        record.path.unlink(missing_ok=True)
+    return lobby
 
 
 def get_lobby_or_404(lobby_id: str) -> LobbyRecord:
-    lobby = lobbies.get(lobby_id)
+    lobby = awake_lobby(lobby_id)
     if lobby is None:
         raise HTTPException(status_code=404, detail="Lobby not found.")
     return lobby
 
 
-def cleanup_empty_lobbies(now: Optional[float] = None) -> None:
-    current_time = now if now is not None else time.time()
-    expired_lobby_ids = [
-        lobby_id
-        for lobby_id, lobby in lobbies.items()
-        if not lobby.game.players and current_time - lobby.created_at >= EMPTY_LOBBY_TTL_SECONDS
-    ]
-    if not expired_lobby_ids:
-        return
+def hibernate_lobby(lobby_id: str, now: float) -> Optional[int]:
+    """
+    Write an idle lobby to disk and evict it, stopping its bots; called by
+    ``lobby_hibernator``. The number of sessions parked with it, or None if
+    it stays awake (it was used since, or is empty and left to expire).
+    """
+    with registry_lock:
+        lobby = lobbies.get(lobby_id)
+        if lobby is None or not lobby.snapshot.players:
+            return None
+        idle_until = lobby.last_active + HIBERNATE_AFTER_SECONDS
+        if now < idle_until:
+            lobby_hibernator.schedule(lobby_id, idle_until)
+            return None
+    try:
+        return lobby.actor.call(hibernate_on_actor, lobby, now)
+    except ActorClosed:
+        return None
+
+
+def hibernate_on_actor(game: Game, lobby: LobbyRecord, now: float) -> Optional[int]:
+    """
+    Runs on the lobby's actor, so nothing changes the game while it is saved.
+    ``now`` is the sweep time ``hibernate_lobby`` was called with.
+    """
+    path = HIBERNATION_DIR / f"{lobby.lobby_id}.snap"
+    write_snapshot(path, game_state(game, lobby.bot_manager.bot_states()))
+    humans = [player for player in game.players.values() if not player.in_process]
+    expires_at = min((player.last_update_time for player in humans), default=now) + game.inactivity_timeout
+    with registry_lock:
+        idle_until = lobby.last_active + HIBERNATE_AFTER_SECONDS
+        stay = (
+            lobbies.get(lobby.lobby_id) is not lobby
+            or now < idle_until
+            # Requests that already hold the record find it closed and wake it (see ``ask``).
+            or not lobby.actor.close_if_idle()
+        )
+        if not stay:
+            del lobbies[lobby.lobby_id]
+            hibernated[lobby.lobby_id] = HibernatedLobby(
+                lobby_id=lobby.lobby_id,
+                name=lobby.name,
+                created_at=lobby.created_at,
+                inactivity_timeout=lobby.inactivity_timeout,
+                phase=game.state,
+                player_count=len(game.players),
+                path=path,
+                expires_at=expires_at,
+            )
+            parked = len(lobby_tokens.get(lobby.lobby_id, ()))
+    if stay:
+        # Used while the snapshot was written, or messages are queued: try again later.
+        path.unlink(missing_ok=True)
+        if lobbies.get(lobby.lobby_id) is lobby:
+            lobby_hibernator.schedule(lobby.lobby_id, time.time() + HIBERNATE_AFTER_SECONDS)
+        return None
+    lobby.bot_manager.stop_all()
+    lobby.feed.close()
+    game.close()
+    lobby_sweeper.schedule(lobby.lobby_id, expires_at)
+    return parked
+
+
+def rehydrate_lobby(record: HibernatedLobby) -> Optional[LobbyRecord]:
+    """Rebuild a hibernated lobby, bots and all; None if its snapshot is gone."""
+    data = read_snapshot(record.path)
+    if data is None:
+        return None
+    lobby = assemble_lobby(record.lobby_id, record.name, restore_game(data), record.created_at)
+    lobby.bot_manager.restore_bots(data["bots"])
+    return lobby
 
-    expired_set = set(expired_lobby_ids)
-    for lobby_id in expired_lobby_ids:
-        lobby = lobbies.pop(lobby_id, None)
-        if lobby is not None:
-            lobby.bot_manager.stop_all()
 
-    for token, session in list(sessions.items()):
-        if session["lobby_id"] in expired_set:
-            del sessions[token]
+def expire_lobby(lobby_id: str, now: float) -> Optional[int]:
+    """
+    Drop the lobby if it is still empty and old enough (or hibernating past
+    the point where its seats would have timed out), with its sessions;
+    called by ``lobby_sweeper``. The number of sessions dropped, or None if
+    the lobby stays.
+    """
+    with registry_lock:
+        lobby = lobbies.get(lobby_id)
+        record = hibernated.get(lobby_id) if lobby is None else None
+        if record is not None:
+            if now < record.expires_at or lobby_id in waking:
+                return None
+            del hibernated[lobby_id]
+        elif lobby is None or lobby.snapshot.players or now - lobby.created_at < EMPTY_LOBBY_TTL_SECONDS:
+            return None
+        else:
+            del lobbies[lobby_id]
+        tokens = lobby_tokens.pop(lobby_id, set())
+        for token in tokens:
+            sessions.pop(token, None)
+    if journal is not None:
+        journal.drop(lobby_id)
+    if record is not None:
+        record.path.unlink(missing_ok=True)
+    else:
+        close_lobby(lobby)
+    return len(tokens)
+
+
+# Lobbies are offered to it when created, whenever they empty out and when
+# they go to disk.
+lobby_sweeper = Sweeper(expire_lobby)
+# Lobbies are offered to it when created or woken; it re-arms them from
+# ``last_active`` until they have really been idle that long.
+lobby_hibernator = Sweeper(hibernate_lobby, name="lobby-hibernator")
 
 
 def require_session(token: str) -> tuple[Dict[str, Any], LobbyRecord]:
-    with session_lock:
-        cleanup_empty_lobbies()
+    with registry_lock:
         session = sessions.get(token)
-        if not session:
-            raise HTTPException(status_code=401, detail="Invalid or expired token.")
-        lobby = lobbies.get(session["lobby_id"])
-        if lobby is None:
-            raise HTTPException(status_code=410, detail="Lobby no longer exists.")
-        return session, lobby
+    if not session:
+        raise HTTPException(status_code=401, detail="Invalid or expired token.")
+    lobby = awake_lobby(session["lobby_id"])
+    if lobby is None:
+        raise HTTPException(status_code=410, detail="Lobby no longer exists.")
+    return session, lobby
 
 
-def lobby_summary(lobby: LobbyRecord) -> LobbyResponse:
-    game = lobby.game
-    player_count = len(game.players)
-    phase = game.state
+def lobby_summary(lobby: Union[LobbyRecord, HibernatedLobby]) -> LobbyResponse:
+    if isinstance(lobby, HibernatedLobby):
+        # Listed as it was put away, without waking it.
+        player_count, phase = lobby.player_count, lobby.phase
+    else:
+        snapshot = lobby.snapshot
+        player_count, phase = snapshot.player_count, snapshot.phase
     can_join = phase in {"init", "lobby"} and player_count < 4
     can_start = phase == "lobby" and player_count == 4
     return LobbyResponse(
@@ -198,6 +518,7 @@ def lobby_summary(lobby: LobbyRecord) -> LobbyResponse:
         max_players=4,
         can_join=can_join,
         can_start=can_start,
+        inactivity_timeout=lobby.inactivity_timeout,
     )
 
 
@@ -210,60 +531,81 @@ def playable_cards_for_player(game: Game, player_id: int) -> List[str]:
     if game.state != "play" or not game.table or not game.table.firstCard:
         return []
 
-    must_follow = any(
-        card.is_suit(game.table.firstCard, game.table.trump)
-        for card in player.hand
-    )
-    if not must_follow:
-        return [str(card) for card in player.hand]
-    return [
-        str(card)
-        for card in player.hand
-        if card.is_suit(game.table.firstCard, game.table.trump)
-    ]
+    legal = cards.legal_mask(player.hand.mask, game.table.firstCard.index, game.table.trump)
+    return [str(card) for card in player.hand if card.bit & legal]
 
 
 @app.get("/lobbies", response_model=LobbyListResponse)
 def list_lobbies() -> LobbyListResponse:
-    with session_lock:
-        cleanup_empty_lobbies()
-        items = sorted(lobbies.values(), key=lambda lobby: lobby.created_at)
-        return LobbyListResponse(lobbies=[lobby_summary(lobby) for lobby in items])
+    with registry_lock:
+        items = sorted([*lobbies.values(), *hibernated.values()], key=lambda lobby: lobby.created_at)
+    return LobbyListResponse(lobbies=[lobby_summary(lobby) for lobby in items])
+
+
+def sweep_stats(sweeper: Sweeper) -> SweepStatsResponse:
+    stats = sweeper.stats()
+    return SweepStatsResponse(
+        passes=stats.passes,
+        lobbies=stats.lobbies,
+        sessions=stats.sessions,
+        scheduled=stats.scheduled,
+        recent=[SweepPassResponse(**vars(sweep)) for sweep in stats.recent],
+    )
+
+
+@app.get("/stats", response_model=ServerStatsResponse)
+def server_stats() -> ServerStatsResponse:
+    """Registry sizes and what ``lobby_sweeper`` and ``lobby_hibernator`` have done, pass by pass."""
+    with registry_lock:
+        counts = len(lobbies), len(hibernated), len(sessions)
+    return ServerStatsResponse(
+        lobbies=counts[0],
+        hibernated=counts[1],
+        sessions=counts[2],
+        sweeper=sweep_stats(lobby_sweeper),
+        hibernator=sweep_stats(lobby_hibernator),
+    )
 
 
 @app.post("/lobbies", response_model=LobbyResponse)
 def create_lobby(payload: CreateLobbyRequest) -> LobbyResponse:
-    with session_lock:
-        cleanup_empty_lobbies()
-        lobby = create_lobby_record(payload.name)
+    with registry_lock:
+        lobby = create_lobby_record(payload.name, payload.inactivity_timeout)
         lobbies[lobby.lobby_id] = lobby
-        return lobby_summary(lobby)
+        lobby_tokens[lobby.lobby_id] = set()
+    return lobby_summary(lobby)
+
+
+def join_seat(game: Game, name: str) -> int:
+    """Seat a new player; runs on the lobby's actor."""
+    if game.state not in {"init", "lobby"}:
+        raise HTTPException(status_code=409, detail="Game already in progress.")
+    reply = game.process_command(f"Hallo, Eg eri {name}")
+    if reply == "full":
+        raise HTTPException(status_code=409, detail="Table is full.")
+    if not reply.startswith("P"):
+        raise HTTPException(status_code=400, detail=reply)
+    game.last_reset_message = None
+    return int(reply[1:])
 
 
 @app.post("/join", response_model=JoinResponse)
 def join(payload: JoinRequest) -> JoinResponse:
     name = payload.name.strip() or "Guest"
-    with session_lock:
-        cleanup_empty_lobbies()
-        lobby = get_lobby_or_404(payload.lobby_id)
-        game = lobby.game
-        if game.state not in {"init", "lobby"}:
-            raise HTTPException(status_code=409, detail="Game already in progress.")
-        join_command = f"Hallo, Eg eri {name}"
-        reply = game.process_command(join_command)
-        if reply == "full":
-            raise HTTPException(status_code=409, detail="Table is full.")
-        if not reply.startswith("P"):
-            raise HTTPException(status_code=400, detail=reply)
-
-        player_id = int(reply[1:])
-        token = uuid4().hex
+    lobby = get_lobby_or_404(payload.lobby_id)
+    if lobby.snapshot.phase not in {"init", "lobby"}:
+        raise HTTPException(status_code=409, detail="Game already in progress.")
+    player_id = ask(lobby, join_seat, name)
+    token = uuid4().hex
+    with registry_lock:
         sessions[token] = {
             "player_id": player_id,
             "name": name,
             "lobby_id": lobby.lobby_id,
         }
-        game.last_reset_message = None
+        lobby_tokens.setdefault(lobby.lobby_id, set()).add(token)
+        if journal is not None:
+            journal.put_session(token, lobby.lobby_id, sessions[token])
     return JoinResponse(
         token=token,
         player_id=player_id,
@@ -273,134 +615,312 @@ def join(payload: JoinRequest) -> JoinResponse:
     )
 
 
-@app.post("/command", response_model=CommandResponse)
-def command(payload: CommandRequest) -> CommandResponse:
-    session, lobby = require_session(payload.token)
-    player_id = session["player_id"]
-    cmd = payload.command.strip()
-    if not cmd:
-        raise HTTPException(status_code=400, detail="Command may not be empty.")
+def session_command(game: Game, session: Dict[str, Any], command: str) -> str:
+    # The seat is read on the actor, where a concurrent /leave remaps it.
+    return game.process_command(f"P{session['player_id']} {command}")
 
-    with session_lock:
-        reply = lobby.game.process_command(f"P{player_id} {cmd}")
-    return CommandResponse(message=reply)
 
+def run_session_command(token: str, command: str) -> str:
+    session, lobby = require_session(token)
+    cmd = command.strip()
+    if not cmd:
+        raise HTTPException(status_code=400, detail="Command may not be empty.")
+    return ask(lobby, session_command, session, cmd)
 
-@app.post("/leave", response_model=CommandResponse)
-def leave(payload: LeaveRequest) -> CommandResponse:
-    with session_lock:
-        session, lobby = require_session(payload.token)
-        player_id = session["player_id"]
-        game = lobby.game
-        if game.state not in {"init", "lobby", "end"}:
-            raise HTTPException(status_code=409, detail="You can only leave from the waiting room or after the game ends.")
 
-        try:
-            seat_map = game.remove_player(player_id)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
+@app.post("/command", response_model=CommandResponse)
+def command(payload: CommandRequest) -> CommandResponse:
+    return CommandResponse(message=run_session_command(payload.token, payload.command))
 
-        del sessions[payload.token]
 
-        for token, other_session in list(sessions.items()):
-            if other_session["lobby_id"] != lobby.lobby_id:
-                continue
+def leave_seat(game: Game, lobby: LobbyRecord, token: str) -> None:
+    """
+    Free the token's seat and renumber the other sessions; runs on the lobby's
+    actor, so no command can slip in between the two.
+    """
+    with registry_lock:
+        session = sessions.get(token)
+        if session is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired token.")
+        player_id = session["player_id"]
+    if game.state not in {"init", "lobby", "end"}:
+        raise HTTPException(status_code=409, detail="You can only leave from the waiting room or after the game ends.")
+
+    try:
+        seat_map = game.remove_player(player_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    with registry_lock:
+        sessions.pop(token, None)
+        if journal is not None:
+            journal.drop_session(token)
+        tokens = lobby_tokens.get(lobby.lobby_id, set())
+        tokens.discard(token)
+        for other_token in tokens:
+            other_session = sessions[other_token]
             old_id = other_session["player_id"]
-            if old_id in seat_map:
+            if old_id in seat_map and seat_map[old_id] != old_id:
                 other_session["player_id"] = seat_map[old_id]
-
+                if journal is not None:
+                    journal.put_session(other_token, lobby.lobby_id, other_session)
         if not game.players:
-            lobby.bot_manager.stop_all()
-            del lobbies[lobby.lobby_id]
+            lobbies.pop(lobby.lobby_id, None)
+            for other_token in lobby_tokens.pop(lobby.lobby_id, ()):
+                sessions.pop(other_token, None)
+    if not game.players:
+        if journal is not None:
+            journal.drop(lobby.lobby_id)
+        # Still on the actor: close it without waiting for it.
+        close_lobby(lobby)
+
 
+@app.post("/leave", response_model=CommandResponse)
+def leave(payload: LeaveRequest) -> CommandResponse:
+    _, lobby = require_session(payload.token)
+    ask(lobby, leave_seat, lobby, payload.token)
     return CommandResponse(message="Left room.")
 
 
-@app.get("/updates", response_model=UpdatesResponse)
-def updates(token: str) -> UpdatesResponse:
-    session, lobby = require_session(token)
+def read_updates(game: Game, session: Dict[str, Any], since: Optional[int]) -> Tuple[str, int]:
     player_id = session["player_id"]
+    if since is None:
+        return game.process_command(f"P{player_id} GU"), game.updates.last_seq
+    return game.updates_since(player_id, since)
+
+
+async def wait_for_update(log: UpdateLog, player_id: int, seq: int, timeout: float) -> bool:
+    """
+    Wait on the event loop until the seat has an event after ``seq``, for at
+    most ``timeout`` seconds; True if it has. A listener on the log wakes the
+    waiter, so a long-poll holds no thread. A cleared log (the table reset)
+    wakes it too, with nothing to read.
+    """
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+
+    def on_event(event: UpdateEvent) -> None:
+        if event.visible_to(player_id):
+            loop.call_soon_threadsafe(ready.set)
+
+    def on_clear() -> None:
+        loop.call_soon_threadsafe(ready.set)
+
+    remove = log.add_listener(on_event, on_clear)
+    try:
+        # Anything published before the listener was added is already in the log.
+        if log.since(player_id, seq)[0]:
+            return True
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return bool(log.since(player_id, seq)[0])
+    finally:
+        remove()
+
+
+@app.get("/updates", response_model=UpdatesResponse)
+async def updates(token: str, since: Optional[int] = None, wait: float = 0.0) -> UpdatesResponse:
+    session, lobby = await run_in_threadpool(require_session, token)
+
+    if wait > 0:
+        # Long-poll on the game's own update log; the actor keeps serving
+        # commands, and no worker thread is held, while this request waits.
+        log = lobby.game.updates
+        start = since if since is not None else log.cursor(session["player_id"])
+        await wait_for_update(log, session["player_id"], start, min(wait, MAX_UPDATES_WAIT_SECONDS))
 
-    with session_lock:
-        reply = lobby.game.process_command(f"P{player_id} GU")
-    return UpdatesResponse(message=reply)
+    reply, seq = await run_in_threadpool(ask, lobby, read_updates, session, since)
+    return UpdatesResponse(message=reply, seq=seq)
 
 
 @app.get("/state", response_model=StateResponse)
-def state(token: str) -> StateResponse:
+def state(
+    token: str,
+    since: Optional[int] = None,
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    """
+    The seat's current state, tagged with the game's state version. Answers 304
+    when the client already has it (``If-None-Match`` or ``since``), and only the
+    changed fields when ``since`` names a version still in the seat's history.
+    """
     session, lobby = require_session(token)
+    history = seat_history(session, lobby)
+    version, snapshot = history[-1]
+    changes = state_changes(history, since) if since is not None else None
+    headers = {"ETag": f'"{lobby.lobby_id}-{snapshot["player_id"]}-{version}"'}
+    if since == version or if_none_match == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    if changes is not None:
+        return JSONResponse({"version": version, "since": since, "changes": changes}, headers=headers)
+    return JSONResponse(snapshot, headers=headers)
+
+
+def touch_seat(snapshot: LobbySnapshot, player_id: int) -> None:
+    """Polling the state counts as hearing from the seat (a single timestamp store)."""
+    for pid, player in snapshot.players:
+        if pid == player_id:
+            player.update_last_time()
+            return
+
+
+def current_presence(players: Tuple[Tuple[int, Player], ...]) -> Tuple[int, ...]:
+    return tuple(pid for pid, player in players if player.time_since_last_update() <= PLAYER_OK_SECONDS)
+
+
+def timed_state_stale(snapshot: LobbySnapshot, now: float) -> bool:
+    """Whether the clock has moved the state on since ``snapshot`` was published."""
+    if snapshot.last_trick_expire and now >= snapshot.last_trick_expire:
+        return True
+    return current_presence(snapshot.players) != snapshot.presence
+
+
+def refresh_timed_state(game: Game, lobby: LobbyRecord, now: float) -> None:
+    """
+    Fold clock-driven changes into the state version: the last trick expiring
+    and seats going quiet or coming back. Runs on the lobby's actor.
+    """
+    changed = False
+    if game.last_trick_cards and now >= game.last_trick_expire:
+        game.last_trick_cards = []
+        game.last_trick_expire = 0.0
+        changed = True
+    presence = current_presence(tuple(sorted(game.players.items())))
+    if presence != lobby.presence:
+        lobby.presence = presence
+        changed = True
+    if changed:
+        game.mark_changed()
+
+
+def seat_history(session: Dict[str, Any], lobby: LobbyRecord) -> Tuple[Tuple[int, Dict[str, Any]], ...]:
+    """
+    The seat's recent snapshots, newest last, from the lobby's published
+    snapshot. The actor is only asked for anything when the clock has changed
+    what the seat should see. Also a heartbeat for the seat.
+    """
     player_id = session["player_id"]
-    game = lobby.game
-
-    with session_lock:
-        scoreboard = dict(game.scoreboard)
-        round_history = list(game.round_history)
-        last_round_winner_team = game.last_round_winner_team
-        last_round_result_key = game.last_round_result_key
-        last_round_result_kind = game.last_round_result_kind
-        trick_count = len(game.trick_winners)
-        round_score = {"Vit": 0, "Tit": 0}
-        if game.table:
-            round_score = {
-                "Vit": game.table.sum_cards_list("Vit"),
-                "Tit": game.table.sum_cards_list("Tit"),
+    snapshot = lobby.snapshot
+    touch_seat(snapshot, player_id)
+    now = time.time()
+    if timed_state_stale(snapshot, now):
+        ask(lobby, refresh_timed_state, lobby, now)
+        snapshot = lobby.snapshot
+    history = snapshot.seats.get(player_id)
+    if not history:
+        raise HTTPException(
+            status_code=410,
+            detail=snapshot.reset_message or "Session reset. Please rejoin.",
+        )
+    return history
+
+
+def state_changes(history: Sequence[Tuple[int, Dict[str, Any]]], since: int) -> Optional[Dict[str, Any]]:
+    """Fields of the newest snapshot that differ from the one at ``since``, if still cached."""
+    latest = history[-1][1]
+    for version, snapshot in history:
+        if version == since:
+            return {key: value for key, value in latest.items() if snapshot.get(key) != value}
+    return None
+
+
+def publish_snapshot(lobby: LobbyRecord, game: Game, previous: Optional[LobbySnapshot]) -> LobbySnapshot:
+    """
+    Build the lobby's next ``LobbySnapshot``; runs on the lobby's actor whenever
+    the game's version moves. Each human seat's state is encoded once here,
+    however many requests then read it.
+    """
+    version = game.state_version
+    players = tuple(sorted(game.players.items()))
+    if not players and (previous is None or previous.players):
+        # Just emptied (or just created): it expires once the TTL is up,
+        # unless someone sits down first.
+        lobby_sweeper.schedule(lobby.lobby_id, lobby.created_at + EMPTY_LOBBY_TTL_SECONDS)
+    seats: Dict[int, Tuple[Tuple[int, Dict[str, Any]], ...]] = {}
+    for player_id, player in players:
+        if player.in_process:
+            continue
+        history = previous.seats.get(player_id, ()) if previous is not None else ()
+        encoded = jsonable_encoder(build_state(game, lobby, player_id))
+        seats[player_id] = (*history, (version, encoded))[-STATE_HISTORY:]
+    return LobbySnapshot(
+        version=version,
+        phase=game.state,
+        players=players,
+        presence=lobby.presence,
+        last_trick_expire=game.last_trick_expire if game.last_trick_cards else 0.0,
+        reset_message=game.last_reset_message,
+        seats=MappingProxyType(seats),
+    )
+
+
+def build_state(game: Game, lobby: LobbyRecord, player_id: int) -> StateResponse:
+    """Snapshot the game as seen by one seat; runs on the lobby's actor."""
+    version = game.state_version
+    scoreboard = dict(game.scoreboard)
+    round_history = list(game.round_history)
+    last_round_winner_team = game.last_round_winner_team
+    last_round_result_key = game.last_round_result_key
+    last_round_result_kind = game.last_round_result_kind
+    trick_count = len(game.trick_winners)
+    round_score = {"Vit": 0, "Tit": 0}
+    if game.table:
+        round_score = {
+            "Vit": game.table.pile_points("Vit"),
+            "Tit": game.table.pile_points("Tit"),
+        }
+    current_turn = game.current_turn
+    trump = game.trump_suit
+    phase = game.state
+    host_id = 1
+    max_players = 4
+    can_start = phase == "lobby" and len(game.players) == max_players
+    players = []
+    for pid, player in sorted(game.players.items()):
+        ping = player.time_since_last_update()
+        players.append(
+            {
+                "id": pid,
+                "name": player.name,
+                "ping": ping,
+                "ok": ping <= PLAYER_OK_SECONDS,
             }
-        current_turn = game.current_turn
-        trump = game.trump_suit
-        phase = game.state
-        host_id = 1
-        max_players = 4
-        can_start = phase == "lobby" and len(game.players) == max_players
-        players = []
-        for pid, player in sorted(game.players.items()):
-            ping = player.time_since_last_update()
-            players.append(
-                {
-                    "id": pid,
-                    "name": player.name,
-                    "ping": ping,
-                    "ok": ping <= 0.7,
-                }
-            )
-        now = time.time()
-        if game.last_trick_cards and now < game.last_trick_expire:
-            recent_trick = [
-                {"id": pid, "card": card}
-                for pid, card in game.last_trick_cards
-            ]
-        else:
-            recent_trick = []
-            if now >= game.last_trick_expire:
-                game.last_trick_cards = []
-                game.last_trick_expire = 0.0
-
-        if game.table and game.table.cards:
-            table_cards = [str(card) for card in game.table.cards]
-            table_slots = [
-                {"id": owner.id, "name": owner.name, "card": str(card)}
-                for owner, card in zip(game.table.cardOwners, game.table.cards)
-            ]
-        else:
-            table_cards = []
-            table_slots = []
-        player = game.players.get(player_id)
-        if player is None:
-            raise HTTPException(
-                status_code=410,
-                detail=game.last_reset_message or "Session reset. Please rejoin.",
-            )
-        hand = [str(card) for card in getattr(player, "hand", [])]
-        playable_cards = playable_cards_for_player(game, player_id)
-        last_winner = game.last_trick_winner
-        last_trick_winning_card = (
-            str(game.table.last_winning_card)
-            if game.table and game.table.last_winning_card
-            else None
         )
-        highlight_until = game.highlight_until
-        recent_trick_expire = game.last_trick_expire
+    recent_trick = [
+        {"id": pid, "card": card}
+        for pid, card in game.last_trick_cards
+    ]
+
+    if game.table and game.table.cards:
+        table_cards = [str(card) for card in game.table.cards]
+        table_slots = [
+            {"id": owner.id, "name": owner.name, "card": str(card)}
+            for owner, card in zip(game.table.cardOwners, game.table.cards)
+        ]
+    else:
+        table_cards = []
+        table_slots = []
+    player = game.players.get(player_id)
+    if player is None:
+        raise HTTPException(
+            status_code=410,
+            detail=game.last_reset_message or "Session reset. Please rejoin.",
+        )
+    hand = [str(card) for card in getattr(player, "hand", [])]
+    playable_cards = playable_cards_for_player(game, player_id)
+    last_winner = game.last_trick_winner
+    last_trick_winning_card = (
+        str(game.table.last_winning_card)
+        if game.table and game.table.last_winning_card
+        else None
+    )
+    highlight_until = game.highlight_until
+    recent_trick_expire = game.last_trick_expire
 
     return StateResponse(
+        version=version,
         player_id=player_id,
         lobby_id=lobby.lobby_id,
         lobby_name=lobby.name,
@@ -430,6 +950,127 @@ def state(token: str) -> StateResponse:
     )
 
 
+
+def socket_state_payload(token: str, sent_version: Optional[int]) -> Tuple[int, Optional[str]]:
+    """
+    The seat's state version and, if it differs from ``sent_version``, its
+    StateResponse as a ``state`` frame. Also a heartbeat for the seat.
+    """
+    session, lobby = require_session(token)
+    version, snapshot = seat_history(session, lobby)[-1]
+    if version == sent_version:
+        return version, None
+    return version, json.dumps({"type": "state", "state": snapshot})
+
+
+def socket_state_current(token: str, lobby: LobbyRecord, sent_version: Optional[int]) -> bool:
+    """
+    Whether the seat already has the lobby's current state. Runs on the event
+    loop and reads only the published snapshot and two dict entries, so an
+    idle socket costs no worker thread. Like the full check it is a heartbeat
+    for the seat and keeps the lobby awake.
+    """
+    session = sessions.get(token)
+    if session is None or lobbies.get(lobby.lobby_id) is not lobby:
+        return False
+    snapshot = lobby.snapshot
+    now = time.time()
+    if snapshot.version != sent_version or timed_state_stale(snapshot, now):
+        return False
+    touch_seat(snapshot, session["player_id"])
+    lobby.last_active = now
+    return True
+
+
+def socket_error_payload(exc: HTTPException, request_id: Any = None) -> str:
+    return json.dumps({"type": "error", "id": request_id, "status": exc.status_code, "detail": exc.detail})
+
+
+async def pump_socket(websocket: WebSocket, token: str, lobby: LobbyRecord, outbox: asyncio.Queue) -> None:
+    """
+    Send queued frames in order. After each batch, and on every idle heartbeat,
+    a state snapshot follows if the state version moved, so a burst of updates
+    (a whole trick, say) costs one snapshot, not one each. The version is
+    checked on the loop first; only a change goes to a worker thread. Closes
+    the socket once the session or its lobby is gone.
+    """
+    sent_version: Optional[int] = None
+    try:
+        while True:
+            try:
+                frames = [await asyncio.wait_for(outbox.get(), SOCKET_HEARTBEAT_SECONDS)]
+            except asyncio.TimeoutError:
+                frames = []
+            while not outbox.empty():
+                frames.append(outbox.get_nowait())
+            for frame in frames:
+                if frame is not None:
+                    await websocket.send_text(frame)
+            if socket_state_current(token, lobby, sent_version):
+                continue
+            sent_version, snapshot = await run_in_threadpool(socket_state_payload, token, sent_version)
+            if snapshot is not None:
+                await websocket.send_text(snapshot)
+    except HTTPException as exc:
+        await websocket.send_text(socket_error_payload(exc))
+        await websocket.close(code=SOCKET_CLOSE_BASE + exc.status_code)
+
+
+@app.websocket("/ws")
+async def push_channel(websocket: WebSocket, token: str) -> None:
+    """
+    Push channel for one session: ``update`` frames as the game publishes them,
+    ``state`` snapshots after every change and ``reply`` frames for commands
+    sent as ``{"id": ..., "command": ...}``.
+    """
+    try:
+        session, lobby = await run_in_threadpool(require_session, token)
+    except HTTPException as exc:
+        await websocket.close(code=SOCKET_CLOSE_BASE + exc.status_code)
+        return
+    await websocket.accept()
+
+    loop = asyncio.get_running_loop()
+    outbox: asyncio.Queue = asyncio.Queue()
+
+    def deliver(frame: str) -> None:
+        # Called on whichever thread published the update.
+        try:
+            loop.call_soon_threadsafe(outbox.put_nowait, frame)
+        except RuntimeError:  # the connection's loop already shut down
+            pass
+
+    unsubscribe = lobby.feed.subscribe(lambda: session["player_id"], deliver)
+    sender = asyncio.create_task(pump_socket(websocket, token, lobby, outbox))
+    outbox.put_nowait(None)  # initial snapshot
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                outbox.put_nowait(socket_error_payload(HTTPException(status_code=400, detail="Frames must be JSON objects.")))
+                continue
+            request_id = message.get("id")
+            try:
+                reply = await run_in_threadpool(run_session_command, token, str(message.get("command", "")))
+            except HTTPException as exc:
+                # A dead session is reported by the sender's next snapshot, which also closes.
+                outbox.put_nowait(None if exc.status_code in {401, 410} else socket_error_payload(exc, request_id))
+                continue
+            outbox.put_nowait(json.dumps({"type": "reply", "id": request_id, "message": reply}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        unsubscribe()
+        sender.cancel()
+        try:
+            await sender
+        except (asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+            pass
+
+
 static_dir = Path(__file__).resolve().parent / "static"
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
@@ -439,6 +1080,62 @@ def root() -> FileResponse:
     return FileResponse(static_dir / "index.html")
 
 
+@app.on_event("startup")
+def start_lobby_sweeper() -> None:
+    lobby_sweeper.start()
+    lobby_hibernator.start()
+
+
+@app.on_event("shutdown")
+def stop_lobby_sweeper() -> None:
+    lobby_sweeper.stop()
+    lobby_hibernator.stop()
+
+
+@app.on_event("startup")
+def restore_tables() -> None:
+    """
+    Open the journal and bring back every table and session in it, before
+    the TCP table starts serving. ``SJAVS_JOURNAL`` picks the file; set it
+    empty to run without one.
+    """
+    global journal, legacy_tcp_game, legacy_tcp_bot_manager
+    path = journal_path()
+    if path is None or journal is not None:
+        return
+    journal = Journal(path)
+    # Every hibernated lobby is in the journal too; files left by the last run are stale.
+    for path in HIBERNATION_DIR.glob("*.snap"):
+        path.unlink(missing_ok=True)
+    for table in journal.restore():
+        if table.game_id == LEGACY_TCP_GAME_ID:
+            legacy_tcp_game = table.game
+            legacy_tcp_bot_manager = BotManager(legacy_tcp_game, think_delay=BOT_THINK_DELAY_SECONDS)
+            legacy_tcp_game.attach_bot_manager(legacy_tcp_bot_manager)
+            legacy_tcp_bot_manager.restore_bots(table.bots)
+            continue
+        with registry_lock:
+            lobby = assemble_lobby(table.game_id, table.meta["name"], table.game, table.meta["created_at"])
+            lobbies[lobby.lobby_id] = lobby
+            lobby_tokens[lobby.lobby_id] = set(table.sessions)
+            sessions.update(table.sessions)
+        lobby.bot_manager.restore_bots(table.bots)
+    journal.attach(LEGACY_TCP_GAME_ID, legacy_tcp_game)
+
+
+@app.on_event("shutdown")
+def close_journal() -> None:
+    global journal
+    if journal is not None:
+        journal.close()
+        journal = None
+
+
+@app.on_event("shutdown")
+def flush_endgame_table() -> None:
+    endgame.flush_default()
+
+
 @app.on_event("startup")
 def launch_tcp_server() -> None:
     global tcp_thread
@@ -447,7 +1144,7 @@ def launch_tcp_server() -> None:
 
     def runner() -> None:
         try:
-            start_server(
+            start_async_server(
                 host=TCP_HOST,
                 port=TCP_PORT,
                 game_instance=legacy_tcp_game,
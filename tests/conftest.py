@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import pytest
+
+from server.app import AsyncGameServer
+
+
+@pytest.fixture
+def serve_game():
+    """Start an AsyncGameServer for a game on a background loop; returns its port."""
+    stops = []
+
+    def serve(game):
+        loop = asyncio.new_event_loop()
+        server = AsyncGameServer(game, host="127.0.0.1", port=0)
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(server.start())
+            ready.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        ready.wait(5)
+
+        def stop():
+            asyncio.run_coroutine_threadsafe(server.shutdown(timeout=1.0), loop).result(5)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(5)
+            loop.close()
+
+        stops.append(stop)
+        return server.sockets[0].getsockname()[1]
+
+    yield serve
+    for stop in stops:
+        stop()
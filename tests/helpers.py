@@ -0,0 +1,18 @@
+"""Helpers shared by the test modules."""
+
+import time
+
+
+def wait_until(predicate, timeout=10.0):
+    """Poll ``predicate`` until it holds or ``timeout`` seconds pass; returns its last value."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def hands(game):
+    """Each seat's hand as card codes, for comparing two games."""
+    return {pid: [str(card) for card in player.hand] for pid, player in game.players.items()}
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from server.actor import ActorClosed, ActorExecutor, GameActor
+from server.bot_manager import BotManager
+from server.bot_scheduler import BotScheduler
+from server.game import Game
+
+from helpers import wait_until
+
+
+def publish_names(game, _previous):
+    return (game.state_version, tuple(player.name for _, player in sorted(game.players.items())))
+
+
+@pytest.fixture
+def executor():
+    pool = ActorExecutor(workers=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_commands_run_in_order_and_callers_read_their_writes(executor):
+    game = Game()
+    actor = GameActor(game, publish_names, executor)
+    assert actor.snapshot == (0, ())
+
+    futures = [actor.submit(lambda g, name=name: g.process_command(f"Hallo, Eg eri {name}")) for name in "ABC"]
+    assert [future.result(5) for future in futures] == ["P1", "P2", "P3"]
+    assert actor.snapshot == (game.state_version, ("A", "B", "C"))
+
+    # Read-only commands do not move the version, so nothing is republished.
+    published = actor.snapshot
+    assert "Current Players" in actor.command("P1 list players")
+    assert actor.snapshot is published
+
+    with pytest.raises(ValueError):
+        actor.call(lambda g: g.remove_player(9))
+    actor.close()
+    with pytest.raises(ActorClosed):
+        actor.command("P1 start")
+
+
+def test_a_message_may_post_to_its_own_actor(executor):
+    game = Game()
+    actor = GameActor(game, publish_names, executor)
+
+    def join_two(g):
+        return actor.command("Hallo, Eg eri A"), actor.command("Hallo, Eg eri B")
+
+    assert actor.call(join_two, timeout=5) == ("P1", "P2")
+
+
+def test_a_slow_table_does_not_hold_up_the_others(executor):
+    slow = GameActor(Game(), publish_names, executor)
+    fast = GameActor(Game(), publish_names, executor)
+    release = threading.Event()
+    stuck = slow.submit(lambda _game: release.wait(5))
+    try:
+        started = time.monotonic()
+        for name in ("A", "B", "C", "D"):
+            fast.command(f"Hallo, Eg eri {name}")
+        assert time.monotonic() - started < 1.0
+        assert not stuck.done()
+    finally:
+        release.set()
+    assert stuck.result(5) is True
+
+
+def test_bots_send_their_commands_through_the_actor(executor):
+    scheduler = BotScheduler(workers=2)
+    game = Game()
+    actor = GameActor(game, publish_names, executor)
+    manager = BotManager(game, scheduler=scheduler, send_fn=actor.command)
+    game.attach_bot_manager(manager)
+    try:
+        actor.command("Hallo, Eg eri Anna")
+        assert actor.command("P1 bots 4") == "3 bot(s) joined the table."
+        assert len(actor.snapshot[1]) == 4
+        actor.command("P1 start")
+        # A bot deals, then the declarations come round to Anna.
+        assert wait_until(lambda: game.state == "declaration" and game.current_turn == 1)
+        handled = actor.messages
+        actor.command("P1 M 0")
+        # Anna's pass, then the three bots' declarations, all through the mailbox.
+        assert wait_until(lambda: actor.messages >= handled + 4)
+    finally:
+        manager.stop_all()
+        scheduler.shutdown()
+
+
+def test_close_if_idle_refuses_while_messages_wait(executor):
+    game = Game()
+    actor = GameActor(game, publish_names, executor)
+    release = threading.Event()
+    blocker = actor.submit(lambda g: release.wait(5))
+    queued = actor.submit(lambda g: "queued")
+    assert wait_until(lambda: actor.pending() == 1)
+    assert not actor.close_if_idle()
+    release.set()
+    assert queued.result(5) == "queued" and blocker.result(5)
+    assert actor.close_if_idle()
+    with pytest.raises(ActorClosed):
+        actor.call(lambda g: None)
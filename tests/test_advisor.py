@@ -0,0 +1,71 @@
+import random
+
+from server import advisor, cards
+from server.advisor import Advice, DeclarationAdvisor
+from server.bot_player import BotBrain
+
+
+def test_canonical_key_ignores_swapped_side_suits_of_the_same_build():
+    hand = cards.mask_from_codes(["QC", "JS", "AS", "KS", "9S", "AH", "7D", "TC"])
+    # Hearts and diamonds exchanged: same key with spades as trump.
+    mirror = cards.mask_from_codes(["QC", "JS", "AS", "KS", "9S", "AD", "7H", "TC"])
+    assert advisor.canonical_key(hand, "S") == advisor.canonical_key(mirror, "S")
+    # Hearts are seven plain cards, clubs six: not interchangeable.
+    other = cards.mask_from_codes(["QC", "JS", "AS", "KS", "9S", "AC", "7D", "TH"])
+    assert advisor.canonical_key(hand, "S") != advisor.canonical_key(other, "S")
+    assert advisor.canonical_key(hand, "S") != advisor.canonical_key(hand, "C")
+
+
+def test_advisor_caches_values_by_canonical_hand():
+    shared = DeclarationAdvisor(rollouts=4)
+    first = shared.advise(["QC", "JS", "AS", "KS", "9S", "AH", "7D", "TC"])
+    assert first.length == 5 and set(first.suit_values) == {"S"}
+    assert (shared.hits, shared.misses) == (0, 1)
+
+    mirror = shared.advise(["QC", "JS", "AS", "KS", "9S", "AD", "7H", "TC"])
+    assert mirror == first
+    assert (shared.hits, shared.misses) == (1, 1)
+
+    assert shared.advise(["7C", "8D", "9H", "TS", "AC", "KD", "QH", "AS"]) == Advice(0, {})
+    assert shared.misses == 1
+
+
+def test_advice_declares_only_when_expected_to_pay():
+    advice = Advice(length=6, suit_values={"H": 1.5, "C": 1.5})
+    assert advice.suit == "C"  # ties go to clubs
+    assert advice.declaration == 6
+    assert advice.values() == {0: 0.0, 5: 1.5, 6: 1.5}
+    assert "declare 6 (M 6) and name C" in advice.describe()
+
+    losing = Advice(length=5, suit_values={"D": -2.25})
+    assert losing.declaration == 0
+    assert "pass (M 0)" in losing.describe()
+
+
+def test_play_out_scores_every_trick():
+    rng = random.Random(3)
+    deck = list(range(32))
+    rng.shuffle(deck)
+    hands = {seat: cards.mask_of(deck[8 * (seat - 1):8 * seat]) for seat in advisor.SEATS}
+    points, winners = advisor.play_out(hands, "H", 2, advisor._rollout_bots(rng))
+
+    assert sum(points.values()) == 120
+    assert len(winners) == 8
+    assert advisor.score_rollout({1: 40, 2: 30, 3: 20, 4: 30}, winners, "H") == 0
+    assert advisor.score_rollout({1: 120, 2: 0, 3: 0, 4: 0}, [1] * 8, "C") == 24
+    assert advisor.score_rollout({1: 30, 2: 60, 3: 0, 4: 30}, [2] * 8, "D") == -8
+
+
+def test_hard_bot_follows_the_advisor(monkeypatch):
+    bot = BotBrain(name="TestBot", send_fn=lambda _payload: "", difficulty="hard")
+    bot.hand = ["QC", "JS", "AS", "KS", "9S", "AH", "7D", "TC"]
+    monkeypatch.setattr(advisor, "advise", lambda _hand: Advice(5, {"S": -1.0}))
+    assert bot.decide_declaration("5S") == 0
+
+    monkeypatch.setattr(advisor, "advise", lambda _hand: Advice(6, {"H": 0.5, "D": 2.0}))
+    assert bot.decide_declaration("6HD") == 6
+    assert bot.decide_suit() == "D"
+
+    medium = BotBrain(name="Medium", send_fn=lambda _payload: "", difficulty="medium")
+    medium.hand = list(bot.hand)
+    assert medium.decide_declaration("5S") == 5
@@ -0,0 +1,69 @@
+import asyncio
+
+from server.app import BUSY_REPLY, AsyncGameServer
+from server.game import Game
+
+
+async def send(reader, writer, command):
+    writer.write(command.encode())
+    await writer.drain()
+    return (await reader.read(4096)).decode()
+
+
+async def start(game, **kwargs):
+    server = AsyncGameServer(game, host="127.0.0.1", port=0, **kwargs)
+    await server.start()
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_async_server_runs_commands_for_many_clients():
+    async def scenario():
+        game = Game()
+        server, port = await start(game)
+        clients = [await asyncio.open_connection("127.0.0.1", port) for _ in range(50)]
+        seats = await asyncio.gather(
+            *(send(reader, writer, f"Hallo, Eg eri Bot{index}") for index, (reader, writer) in enumerate(clients[:4]))
+        )
+        assert sorted(seats) == ["P1", "P2", "P3", "P4"]
+        replies = await asyncio.gather(*(send(reader, writer, "P1 GU") for reader, writer in clients))
+        assert all(reply for reply in replies)
+        assert server.connections == 50
+        for _, writer in clients:
+            writer.close()
+        await server.shutdown()
+        return game
+
+    game = asyncio.run(scenario())
+    assert len(game.players) == 4
+
+
+def test_async_server_rejects_connections_over_the_limit():
+    async def scenario():
+        server, port = await start(Game(), max_connections=1)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        assert (await send(reader, writer, "Hallo, Eg eri Anna")) == "P1"
+        extra_reader, extra_writer = await asyncio.open_connection("127.0.0.1", port)
+        busy = await extra_reader.read(4096)
+        extra_writer.close()
+        writer.close()
+        await server.shutdown()
+        return busy.decode(), server.rejected
+
+    busy, rejected = asyncio.run(scenario())
+    assert busy == BUSY_REPLY
+    assert rejected == 1
+
+
+def test_async_server_shutdown_closes_idle_connections():
+    async def scenario():
+        server, port = await start(Game())
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        assert (await send(reader, writer, "Hallo, Eg eri Anna")) == "P1"
+        await server.shutdown(timeout=1.0)
+        closed = await asyncio.wait_for(reader.read(4096), timeout=1.0)
+        writer.close()
+        return closed, server.connections
+
+    closed, connections = asyncio.run(scenario())
+    assert closed == b""
+    assert connections == 0
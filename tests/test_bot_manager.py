@@ -0,0 +1,114 @@
+import threading
+import time
+
+from server.bot_manager import BotManager
+from server.bot_scheduler import BotScheduler
+from server.game import Game
+
+from helpers import wait_until
+
+
+class RecordingBot:
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    def handle_event(self, event):
+        self.log.append((self.name, event, time.monotonic()))
+
+
+def test_event_driven_bots_play_a_round_on_the_shared_scheduler():
+    scheduler = BotScheduler(workers=2)
+    games, managers = [], []
+    before = threading.active_count()
+    try:
+        for _ in range(10):
+            game = Game()
+            manager = BotManager(game, scheduler=scheduler)
+            game.attach_bot_manager(manager)
+            assert manager.ensure_bots(4) == "4 bot(s) joined the table."
+            assert all(player.in_process for player in game.players.values())
+            games.append(game)
+            managers.append(manager)
+        for game in games:
+            game.process_command("P1 start")
+        assert wait_until(lambda: all(game.round_history or game.state == "end" for game in games))
+        # Forty bots, and the only threads they ever use are the two workers.
+        assert threading.active_count() == before + 2
+    finally:
+        for manager in managers:
+            manager.stop_all()
+        scheduler.shutdown()
+
+
+def test_scheduler_honours_think_delay_and_per_bot_order():
+    scheduler = BotScheduler(workers=2)
+    log = []
+    try:
+        slow = scheduler.register(RecordingBot("slow", log), think_delay=0.3)
+        fast = scheduler.register(RecordingBot("fast", log), think_delay=0.0)
+        posted = time.monotonic()
+        for index in range(3):
+            slow.post(f"slow {index}")
+        fast.post("fast 0")
+        assert wait_until(lambda: len(log) == 4, timeout=2.0)
+        assert log[0][1] == "fast 0"
+        assert [text for name, text, _ in log if name == "slow"] == ["slow 0", "slow 1", "slow 2"]
+        assert all(at - posted >= 0.3 for name, _, at in log if name == "slow")
+    finally:
+        scheduler.shutdown()
+
+
+def test_stop_all_deregisters_without_running_queued_updates():
+    scheduler = BotScheduler(workers=1)
+    game = Game()
+    manager = BotManager(game, think_delay=0.2, scheduler=scheduler)
+    game.attach_bot_manager(manager)
+    try:
+        manager.ensure_bots(4)
+        bots = list(manager._bots)
+        game.process_command("P1 start")
+        manager.stop_all()
+        time.sleep(0.3)
+        assert scheduler.pending() == 0
+        assert all(not bot.hand for bot in bots)
+        assert game.state != "end" and not game.round_history
+    finally:
+        scheduler.shutdown()
+
+
+def test_bots_act_on_typed_events_without_show_or_maxmeld():
+    game = Game()
+    manager = BotManager(game)
+    game.attach_bot_manager(manager)
+    commands = []
+    process_command = game.process_command
+
+    def recording(command):
+        commands.append(command)
+        return process_command(command)
+
+    game.process_command = recording
+    try:
+        manager.ensure_bots(4)
+        game.process_command("P1 start")
+        assert wait_until(lambda: game.round_history or game.state == "end")
+    finally:
+        manager.stop_all()
+    subcommands = {command.split(" ", 1)[1].split()[0].lower() for command in commands if command.startswith("P")}
+    assert "show" not in subcommands and "maxmeld" not in subcommands
+    assert "p" in subcommands
+
+
+def test_in_process_bots_never_time_out():
+    game = Game()
+    manager = BotManager(game)
+    game.attach_bot_manager(manager)
+    try:
+        manager.ensure_bots(2)
+        for player in game.players.values():
+            player.last_update_time -= 3600
+        assert not any(game.check_inactivity(player) for player in list(game.players.values()))
+        assert len(game.players) == 2
+    finally:
+        manager.stop_all()
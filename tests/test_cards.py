@@ -0,0 +1,89 @@
+import random
+
+from server import cards
+from server.utils import Card, Player, Table, take_card
+
+
+def test_trump_mask_contains_permanent_trumps_and_suit():
+    hearts = cards.trump_mask("Hearts")
+    assert cards.codes_of(hearts & cards.SUIT_MASKS["C"]) == ["JC", "QC"]
+    assert (hearts & cards.SUIT_MASKS["H"]) == cards.SUIT_MASKS["H"]
+    assert hearts.bit_count() == 13
+
+
+def test_follow_mask_excludes_permanent_trumps_from_plain_suit():
+    lead = cards.card_index("7C")
+    follow = cards.follow_mask(lead, "H")
+    assert "QC" not in cards.codes_of(follow)
+    assert "AC" in cards.codes_of(follow)
+
+    trump_lead = cards.card_index("JD")
+    assert cards.follow_mask(trump_lead, "H") == cards.trump_mask("H")
+
+
+def test_mask_points_matches_pack_total():
+    assert cards.mask_points(cards.FULL_MASK) == 120
+    assert cards.mask_points(cards.mask_from_codes(["AH", "TS", "KD"])) == 25
+
+
+def test_take_card_keeps_hand_mask_in_sync():
+    player = Player("Anna", id=1)
+    player.hand = [Card("Hearts", 1), Card("Clubs", 12), Card("Spades", 7)]
+    assert player.hand.mask == cards.mask_from_codes(["AH", "QC", "7S"])
+
+    taken = take_card(player, "QC")
+    assert str(taken) == "QC"
+    assert player.hand.mask == cards.mask_from_codes(["AH", "7S"])
+    assert take_card(player, "QC") is None
+    assert take_card(player, "ZZ") is None
+
+
+def test_play_other_card_enforces_follow_suit_with_masks():
+    table = Table(trump="S")
+    leader = Player("Lead", id=1)
+    follower = Player("Follow", id=2)
+    leader.hand = [Card("Hearts", 9)]
+    follower.hand = [Card("Hearts", 1), Card("Clubs", 12)]
+
+    assert table.play_first_card("9H", leader) == "OK"
+    assert table.play_other_card("QC", follower) == "Ikki loyvt!"
+    assert follower.hand.mask == cards.mask_from_codes(["AH", "QC"])
+    assert table.play_other_card("AH", follower) == "OK"
+
+
+def test_pile_points_follow_cleared_tricks():
+    table = Table(trump="H")
+    players = [Player(f"P{idx}", id=idx) for idx in range(1, 5)]
+    trick = [Card("Hearts", 1), Card("Hearts", 10), Card("Diamonds", 13), Card("Spades", 7)]
+    table.cards.extend(trick)
+    table.cardOwners.extend(players)
+    table.firstCard = trick[0]
+
+    table.clear_and_reset()
+
+    assert table.pile_points("Vit") == table.sum_cards_list("Vit") == 25
+    assert table.pile_points("Tit") == 0
+
+
+def _legacy_strength(code: str, lead: str, trump: str) -> tuple[int, int]:
+    rank = {"A": 14, "K": 13, "Q": 12, "J": 11, "T": 10}.get(code[0]) or int(code[0])
+    if code in cards.PERMANENT_TRUMPS:
+        return 3, len(cards.PERMANENT_TRUMPS) - cards.PERMANENT_TRUMPS.index(code)
+    if code[1] == trump:
+        return 2, rank
+    if code[1] == lead[1]:
+        return 1, rank
+    return 0, rank
+
+
+def test_trick_winner_matches_legacy_strength_ordering():
+    rng = random.Random(7)
+    for _ in range(2000):
+        trump = rng.choice(cards.SUITS)
+        trick = rng.sample(cards.CARD_CODES, 4)
+        expected = max(
+            range(4),
+            key=lambda pos: (_legacy_strength(trick[pos], trick[0], trump), -pos),
+        )
+        indices = [cards.card_index(code) for code in trick]
+        assert cards.trick_winner(indices, trump) == expected
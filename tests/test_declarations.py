@@ -0,0 +1,52 @@
+import random
+
+from server import cards, declarations
+from server.declarations import DeclarationTable
+
+
+def test_hand_rank_counts_hands_in_numeric_order():
+    for rank, mask in enumerate(declarations.iter_hands()):
+        assert declarations.hand_rank(mask) == rank
+        if rank == 5000:
+            break
+    highest = cards.mask_of(range(24, 32))
+    assert declarations.hand_rank(highest) == declarations.TABLE_SIZE - 1
+
+
+def test_encoded_entries_decode_to_maxmeld():
+    rng = random.Random(4)
+    for _ in range(2000):
+        mask = cards.mask_of(rng.sample(range(32), 8))
+        assert declarations.DECODED[declarations.encode(mask)] == cards.highest_declaration(mask)
+    hand = cards.mask_from_codes(["QC", "QS", "JC", "AH", "KH", "AC", "KC", "7D"])
+    assert declarations.DECODED[declarations.encode(hand)] == "5HC"
+
+
+def test_table_lookups_match_computation_and_fall_back(tmp_path):
+    path = tmp_path / "declarations.bin"
+    assert declarations.write_table(path, limit=20000) == 20000
+    table = DeclarationTable(path)
+    try:
+        assert table.available
+        for mask in _first_hands(20000, 7):
+            assert table.lookup(mask) == cards.highest_declaration(mask)
+        # Beyond the written entries, and for short hands, it computes instead.
+        full = cards.mask_from_codes(["QC", "QS", "JC", "JS", "JH", "JD", "AH", "KH"])
+        assert table.lookup(full) == "8H"
+        assert table.lookup(cards.mask_from_codes(["AH"])) == "0"
+    finally:
+        table.close()
+
+    missing = DeclarationTable(tmp_path / "absent.bin")
+    assert not missing.available
+    assert missing.lookup(full) == "8H"
+
+
+def _first_hands(count, step):
+    hands = []
+    for rank, mask in enumerate(declarations.iter_hands()):
+        if rank >= count:
+            break
+        if rank % step == 0:
+            hands.append(mask)
+    return hands
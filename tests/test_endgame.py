@@ -0,0 +1,158 @@
+import random
+import threading
+import time
+
+from server import cards, endgame, expert
+from server.bot_player import BotBrain, DIFFICULTY_STRATEGIES
+from server.endgame import RECORD, EndgameTable
+from server.solver import Deal, DoubleDummySolver
+
+
+def random_endgame(rng, tricks=4, in_trick=0):
+    """A position with ``tricks`` tricks left and ``in_trick`` cards already led to the first."""
+    indices = rng.sample(range(32), 4 * tricks)
+    hands = [cards.mask_of(indices[tricks * seat:tricks * (seat + 1)]) for seat in range(4)]
+    trump = rng.choice(cards.SUITS)
+    leader = rng.randint(1, 4)
+    trick = []
+    for offset in range(in_trick):
+        seat = (leader - 1 + offset) % 4
+        lead = trick[0] if trick else None
+        card = rng.choice(list(cards.iter_mask(cards.legal_mask(hands[seat], lead, trump))))
+        hands[seat] &= ~(1 << card)
+        trick.append(card)
+    return Deal(tuple(hands), trump, leader, tuple(trick), taken=(30, 20))
+
+
+def test_endgame_values_match_the_solver():
+    rng = random.Random(8)
+    table = EndgameTable(path=None)
+    for number in range(12):
+        deal = random_endgame(rng, tricks=3 + number % 2, in_trick=number % 4)
+        assert table.move_values(deal) == DoubleDummySolver(deal.trump).move_values(deal)
+        assert table.solve(deal) == DoubleDummySolver(deal.trump).solve(deal)
+
+
+def test_endgame_table_persists_and_counts_hits(tmp_path):
+    path = tmp_path / "endgame.bin"
+    deal = random_endgame(random.Random(2))
+    first = EndgameTable(path)
+    expected = first.best_card(deal)
+    stats = first.stats()
+    assert stats.misses == stats.entries > 0 and stats.hits == 0
+    first.best_card(deal)
+    assert first.stats().hits == stats.entries
+    first.flush()
+
+    with open(path, "ab") as handle:
+        handle.write(b"\x01\x02\x03")  # a torn final record
+    second = EndgameTable(path)
+    assert second.best_card(deal) == expected
+    stats = second.stats()
+    assert stats.loaded == stats.entries == path.stat().st_size // RECORD.size
+    assert stats.misses == 0 and stats.hit_rate == 1.0
+    assert path.stat().st_size % RECORD.size == 0
+
+
+def test_default_table_is_opt_in(tmp_path, monkeypatch):
+    assert "endgame_table" not in DIFFICULTY_STRATEGIES["hard"]
+    previous = endgame.set_default_table(None)
+    try:
+        monkeypatch.delenv("SJAVS_ENDGAME", raising=False)
+        assert endgame.default_table().path is None
+        endgame.set_default_table(None)
+        monkeypatch.setenv("SJAVS_ENDGAME", str(tmp_path / "endgame.bin"))
+        table = endgame.default_table()
+        assert table.path == tmp_path / "endgame.bin"
+        table.best_card(random_endgame(random.Random(3), tricks=2))
+        endgame.flush_default()
+        assert (tmp_path / "endgame.bin").stat().st_size == table.stats().entries * RECORD.size
+    finally:
+        endgame.set_default_table(previous)
+
+
+def test_lookups_do_not_wait_for_another_threads_solve():
+    rng = random.Random(4)
+    table = EndgameTable(path=None)
+    known, unknown = random_endgame(rng, tricks=3), random_endgame(rng, tricks=3)
+    expected = table.value(known)
+    solving, release = threading.Event(), threading.Event()
+    solve = table._solve
+
+    def slow_solve(deal):
+        solving.set()
+        release.wait(10)
+        return solve(deal)
+
+    table._solve = slow_solve
+    solver = threading.Thread(target=table.value, args=(unknown,))
+    solver.start()
+    try:
+        assert solving.wait(5)
+        looked_up = []
+        reader = threading.Thread(target=lambda: looked_up.append(table.value(known)))
+        reader.start()
+        reader.join(2)
+        assert looked_up == [expected]
+    finally:
+        release.set()
+        solver.join()
+    assert table.stats().entries == 2
+
+
+def test_search_workers_flush_the_default_table_on_shutdown(tmp_path, monkeypatch):
+    path = tmp_path / "endgame.bin"
+    monkeypatch.setenv("SJAVS_ENDGAME", str(path))
+    expert.shutdown_pool(wait=True)
+    deal = random_endgame(random.Random(6), tricks=3)
+    try:
+        values = expert.search_pool().submit(expert.evaluate_sample, deal, time.time() + 30).result()
+    finally:
+        expert.shutdown_pool(wait=True)
+    assert values is not None
+    # Far fewer than FLUSH_EVERY entries, so only the exit flush wrote them.
+    assert 0 < path.stat().st_size // RECORD.size < endgame.FLUSH_EVERY
+    assert EndgameTable(path).move_values(deal) == DoubleDummySolver(deal.trump).move_values(deal)
+
+
+def test_known_hands_and_endgame_strategy():
+    rng = random.Random(5)
+    deck = list(range(32))
+    rng.shuffle(deck)
+    hands = {seat: cards.mask_of(deck[8 * (seat - 1):8 * seat]) for seat in (1, 2, 3, 4)}
+    trump = "H"
+    plays = []
+    leader = 1
+    for _ in range(5):
+        trick = []
+        for offset in range(4):
+            seat = (leader - 1 + offset) % 4 + 1
+            lead = trick[0][1] if trick else None
+            card = min(cards.iter_mask(cards.legal_mask(hands[seat], lead, trump)))
+            hands[seat] &= ~(1 << card)
+            trick.append((seat, card))
+        plays.extend((seat, cards.CARD_CODES[card]) for seat, card in trick)
+        leader = trick[cards.trick_winner([card for _, card in trick], trump)][0]
+
+    bot = BotBrain(name="TestBot", send_fn=lambda _payload: "", strategy_names=DIFFICULTY_STRATEGIES["expert"])
+    bot.player_id = leader
+    bot.trump = trump
+    bot.hand = cards.codes_of(hands[leader])
+    for seat, card in plays:
+        bot.on_card_played(seat, card)
+        if len(bot.current_trick) == 4:
+            bot.on_trick_won(0)
+    legal = cards.codes_of(hands[leader])
+    view = bot._search_view()
+    assert expert.known_hands(view) is None
+    assert bot._strategy_endgame_table(legal) is None
+
+    # Two of the other seats have shown out of everything they do not hold.
+    others = [seat for seat in (1, 2, 3, 4) if seat != leader]
+    for seat in others[:2]:
+        bot.knowledge.barred[seat] = cards.FULL_MASK & ~hands[seat]
+    assert expert.known_hands(bot._search_view()) == tuple(hands[seat] for seat in (1, 2, 3, 4))
+    best, _ = DoubleDummySolver(trump).best_card(Deal(tuple(hands[seat] for seat in (1, 2, 3, 4)), trump, leader))
+    values = DoubleDummySolver(trump).move_values(Deal(tuple(hands[seat] for seat in (1, 2, 3, 4)), trump, leader))
+    choice = bot._strategy_endgame_table(legal)
+    assert values[choice].vit == values[best].vit
@@ -0,0 +1,122 @@
+import queue
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from server import cards, expert
+from server.bot_player import BotBrain, DIFFICULTY_STRATEGIES, SearchFinished
+from server.events import TurnToPlay
+from server.expert import SearchView
+
+# Six finished tricks with every seat following except seat 4, which showed
+# out of spades in the last one; seats 1-3 are playing to the seventh trick.
+PLAYS = (
+    (1, "QC"), (2, "QS"), (3, "JC"), (4, "JS"),
+    (1, "JD"), (2, "AH"), (3, "KH"), (4, "QH"),
+    (1, "TH"), (2, "9H"), (3, "8H"), (4, "7H"),
+    (1, "AC"), (2, "KC"), (3, "TC"), (4, "9C"),
+    (1, "AD"), (2, "KD"), (3, "QD"), (4, "TD"),
+    (1, "KS"), (2, "9S"), (3, "8S"), (4, "7C"),
+    (1, "AS"), (2, "7S"), (3, "TS"),
+)
+
+
+def test_barred_cards_follow_failures_to_follow_suit():
+    barred = expert.barred_cards(PLAYS, "H")
+    assert barred[4] == cards.follow_mask(cards.card_index("KS"), "H")
+    assert barred[1] == barred[2] == barred[3] == 0
+
+
+def test_sample_hands_respect_voids_sizes_and_declarer():
+    view = SearchView(
+        seat=1,
+        hand=("KH", "7C", "8C", "9C", "TC", "KC", "AC"),
+        trump="D",
+        plays=((2, "7S"), (3, "8S"), (4, "QH"), (1, "AH")),
+        declarer=3,
+    )
+    spades = cards.follow_mask(cards.card_index("9S"), "D")
+    rng = random.Random(2)
+    for _ in range(50):
+        hands = expert.sample_hands(view, rng)
+        assert hands is not None
+        assert hands[0] == cards.mask_from_codes(view.hand)
+        assert [hand.bit_count() for hand in hands] == [7, 7, 7, 7]
+        assert not hands[3] & spades  # seat 4 discarded a heart on spades
+        assert (hands[2] & cards.trump_mask("D")).bit_count() >= expert.MIN_DECLARATION
+        assert sum(hands) == cards.FULL_MASK & ~cards.mask_from_codes(["7S", "8S", "QH", "AH"])
+
+
+def test_choose_card_trumps_the_trick_worth_winning():
+    view = SearchView(seat=4, hand=("JH", "8C"), trump="H", plays=PLAYS, declarer=1)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        choice = expert.choose_card(view, ["JH", "8C"], budget=5.0, samples=4, rng=random.Random(1), pool=pool)
+    assert choice == "JH"
+
+
+def test_choose_card_gives_up_at_the_budget():
+    rng = random.Random(3)
+    codes = list(cards.CARD_CODES)
+    rng.shuffle(codes)
+    view = SearchView(seat=1, hand=tuple(codes[:8]), trump="C", plays=())
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        start = time.perf_counter()
+        expert.choose_card(view, list(view.hand), budget=0.05, samples=2, rng=rng, pool=pool)
+        assert time.perf_counter() - start < 1.0
+
+
+def test_expert_bot_searches_on_the_shared_pool():
+    bot = BotBrain(
+        name="TestBot",
+        send_fn=lambda _payload: "",
+        difficulty="expert",
+        strategy_names=DIFFICULTY_STRATEGIES["expert"],
+        move_budget=10.0,
+        search_samples=2,
+    )
+    bot.player_id = 4
+    bot.trump = "H"
+    bot.declarer = 1
+    bot.hand = ["JH", "8C"]
+    for seat, card in PLAYS:
+        bot.on_card_played(seat, card)
+        if len(bot.current_trick) == 4:
+            bot.on_trick_won(seat)
+    try:
+        assert bot._choose_card(["8C", "JH"]) == "JH"
+    finally:
+        expert.shutdown_pool()
+
+
+def test_event_driven_expert_searches_off_the_scheduler_and_plays_when_posted_back():
+    sent = []
+    posted = queue.Queue()
+    bot = BotBrain(
+        name="TestBot",
+        send_fn=lambda payload: sent.append(payload) or "OK",
+        difficulty="expert",
+        strategy_names=DIFFICULTY_STRATEGIES["expert"],
+        move_budget=10.0,
+        search_samples=2,
+    )
+    bot.post_event = lambda event, delay=None: posted.put(event)
+    bot.player_id = 4
+    bot.trump = "H"
+    bot.declarer = 1
+    bot.hand = ["JH", "8C"]
+    for seat, card in PLAYS:
+        bot.on_card_played(seat, card)
+        if len(bot.current_trick) == 4:
+            bot.on_trick_won(seat)
+    try:
+        bot.handle_event(TurnToPlay(4))
+        assert sent == []  # the handler returned without waiting for the search
+        finished = posted.get(timeout=15)
+        assert isinstance(finished, SearchFinished) and finished.card == "JH"
+        bot.handle_event(finished)
+        assert sent == ["P4 P JH"]
+        # A stale answer, for a position that has moved on, is dropped.
+        bot.handle_event(finished)
+        assert sent == ["P4 P JH"]
+    finally:
+        expert.shutdown_pool()
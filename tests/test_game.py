@@ -1,8 +1,10 @@
 import importlib
+import threading
 
 import pytest
 from typing import Optional
 
+from server import events
 from server.game import Game
 from server.utils import Card, Player, Table
 
@@ -46,6 +48,40 @@ def test_app_module_importable():
     assert hasattr(module, "start_server")
 
 
+def test_state_version_moves_on_changes_but_not_on_reads():
+    game = Game()
+    register_four_players(game)
+    version = game.state_version
+    assert version > 0
+
+    for command in ("GU", "help", "list players", "maxmeld", "show"):
+        game.process_command(f"P1 {command}")
+    assert game.state_version == version
+
+    game.process_command("P1 start")
+    assert game.state_version > version
+
+
+def test_game_emits_typed_events_alongside_text_updates():
+    game = Game()
+    register_four_players(game)
+    seen = []
+    game.events.add_listener(seen.append)
+
+    game.process_command("P1 start")
+    assert seen == [events.SplitRequested(game.current_turn)]
+    dealer = game.current_turn
+    game.process_command(f"P{dealer} banka")
+
+    hands = {event.recipient: event.cards for event in seen if isinstance(event, events.HandDealt)}
+    assert hands == {pid: tuple(str(card) for card in player.hand) for pid, player in game.players.items()}
+    prompt = seen[-1]
+    assert prompt == events.DeclarationRequested(game.current_turn)
+    other = next(pid for pid in game.players if pid != game.current_turn)
+    assert prompt.visible_to(game.current_turn) and not prompt.visible_to(other)
+    assert events.CardPlayed(1, "QC").visible_to(other)
+
+
 def test_deal_cards_requires_deal_state():
     game = Game()
     # Directly calling deal_cards during init should return a helpful message instead of crashing.
@@ -206,13 +242,13 @@ def test_help_lists_commands_for_current_state():
     lobby_help = game.process_command("P1 help")
     assert "State: lobby" in lobby_help
     assert "General: help, gu, show, list players, say <message>" in lobby_help
-    assert "Lobby: start, bots [count] [easy|medium|hard]" in lobby_help
+    assert "Lobby: start, bots [count] [easy|medium|hard|expert]" in lobby_help
 
     game.process_command("P1 start")
     game.process_command("P4 banka")
     declaration_help = game.process_command("P1 help")
     assert "State: declaration" in declaration_help
-    assert "Declaration: maxmeld, M 0, M <5-8>, <0|5-8>, <5-8> Better" in declaration_help
+    assert "Declaration: maxmeld, hint, M 0, M <5-8>, <0|5-8>, <5-8> Better" in declaration_help
     assert "Examples: P 7C, M 5, 5 Better, S C, split 16, say hello" in declaration_help
 
 
@@ -242,3 +278,46 @@ def test_better_declaration_skips_suit_prompt_when_clubs_win_tiebreak():
     assert game.table.trump == "C"
     updates = "\n".join(game.updatesForPlayers[1])
     assert "What suit is your declaration?" not in updates
+
+
+def test_hint_estimates_the_declaration_for_the_asking_player():
+    game = Game()
+    register_four_players(game)
+    assert game.process_command("P1 hint") == "Hints are only available during declarations."
+
+    game.process_command("P1 start")
+    game.process_command("P4 banka")
+    game.players[1].hand = [make_card(code) for code in ("QC", "QS", "JC", "JS", "JH", "JD", "AH", "KH")]
+    version = game.state_version
+
+    reply = game.process_command("P1 hint")
+    assert reply.startswith("Hint: declare 8 (M 8) and name H.")
+    assert game.state_version == version
+
+
+def test_hint_rollouts_run_outside_the_command_lock(monkeypatch):
+    from server import advisor
+
+    game = Game()
+    register_four_players(game)
+    game.process_command("P1 start")
+    game.process_command("P4 banka")
+    advise = advisor.advise
+    free = []
+
+    def probe():
+        acquired = game.command_lock.acquire(timeout=1)
+        if acquired:
+            game.command_lock.release()
+        free.append(acquired)
+
+    def checked_advise(hand):
+        # Another thread can take the lock while the rollouts run.
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return advise(hand)
+
+    monkeypatch.setattr(advisor, "advise", checked_advise)
+    assert game.process_command("P1 hint").startswith("Hint:")
+    assert free == [True]
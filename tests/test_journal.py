@@ -0,0 +1,165 @@
+import random
+import sqlite3
+import threading
+
+from server import journal as journal_module
+from server.bot_manager import BotManager
+from server.game import Game
+from server.journal import Journal
+
+from helpers import hands, wait_until
+
+
+def pass_round(game):
+    """Everyone passes, so the hand is thrown in and redealt from a fresh shuffle."""
+    game.process_command(f"P{game.current_turn} banka")
+    for _ in range(4):
+        game.process_command(f"P{game.current_turn} 0")
+
+
+def test_restore_replays_the_log_after_the_last_snapshot(tmp_path):
+    path = tmp_path / "journal.sqlite3"
+    journal = Journal(path, snapshot_every=5)
+    game = Game(rng=random.Random(7))
+    journal.attach("t1", game, {"name": "Table 1"})
+    for name in ("Anna", "Bjorg", "Carl", "Dani"):
+        game.process_command(f"Hallo, Eg eri {name}")
+    game.process_command("P1 start")
+    game.process_command("P2 say hello")
+    pass_round(game)
+    game.process_command(f"P{game.current_turn} banka")
+    journal.put_session("token-1", "t1", {"player_id": 1, "name": "Anna", "lobby_id": "t1"})
+    assert journal.flush(5.0)
+    journal.close()
+
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT COUNT(*) FROM records").fetchone()[0] < 5
+
+    [table] = Journal(path).restore()
+    restored = table.game
+    try:
+        assert table.game_id == "t1" and table.meta == {"name": "Table 1"}
+        assert table.sessions == {"token-1": {"player_id": 1, "name": "Anna", "lobby_id": "t1"}}
+        assert 0 < table.replayed < 5
+        for field in ("state", "current_turn", "dealer_position", "scoreboard", "declaration_count"):
+            assert getattr(restored, field) == getattr(game, field)
+        assert restored.state_version > game.state_version
+        assert hands(restored) == hands(game)
+        assert restored.updates.dump()["events"] == game.updates.dump()["events"]
+
+        # The generator came back too, so the next redeal is the same one.
+        for _ in range(4):
+            restored.process_command(f"P{restored.current_turn} 0")
+            game.process_command(f"P{game.current_turn} 0")
+        restored.process_command(f"P{restored.current_turn} banka")
+        game.process_command(f"P{game.current_turn} banka")
+        assert hands(restored) == hands(game)
+    finally:
+        restored.close()
+        game.close()
+
+
+def test_bots_carry_on_after_a_restore(tmp_path):
+    path = tmp_path / "journal.sqlite3"
+    journal = Journal(path, snapshot_every=16)
+    game = Game()
+    journal.attach("bots", game)
+    # Slow enough that the poll below cannot miss the round's middle and
+    # find the rubber already over.
+    manager = BotManager(game, think_delay=0.05)
+    game.attach_bot_manager(manager)
+    manager.ensure_bots(4)
+    game.process_command("P1 start")
+    assert wait_until(lambda: game.state == "play" and len(game.trick_winners) >= 2)
+    with game.command_lock:
+        assert journal.flush(5.0)
+        manager.stop_all()
+        game.close()
+        [table] = Journal(path).restore()
+        restored = table.game
+        assert hands(restored) == hands(game)
+        assert restored.trick_winners == game.trick_winners
+        assert restored.round_plays == game.round_plays
+        assert [state["difficulty"] for state in table.bots] == [
+            game.bot_seats[player] for _, player in sorted(game.players.items())
+        ]
+        rounds = len(game.round_history)
+    journal.close()
+
+    bots = BotManager(restored, think_delay=0.05)
+    restored.attach_bot_manager(bots)
+    try:
+        assert bots.restore_bots(table.bots) == 4
+        assert wait_until(lambda: len(restored.round_history) > rounds)
+    finally:
+        bots.stop_all()
+        restored.close()
+
+
+def test_writer_groups_records_into_shared_commits(tmp_path):
+    journal = Journal(tmp_path / "journal.sqlite3", snapshot_every=10_000)
+    games = []
+    for index in range(4):
+        game = Game(inactivity_timeout=None)
+        journal.attach(f"g{index}", game)
+        game.process_command("Hallo, Eg eri Anna")
+        games.append(game)
+
+    def chatter(game):
+        for count in range(200):
+            game.process_command(f"P1 say {count}")
+
+    threads = [threading.Thread(target=chatter, args=(game,)) for game in games]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert journal.flush(10.0)
+    stats = journal.stats()
+    assert stats.records == 4 * 201
+    assert stats.queued == 0
+    assert stats.commits < stats.operations
+    journal.drop("g3")
+    journal.close()
+
+    tables = {table.game_id: table for table in Journal(tmp_path / "journal.sqlite3").restore()}
+    assert sorted(tables) == ["g0", "g1", "g2"]
+    assert tables["g0"].game.updates.last_seq == games[0].updates.last_seq
+    for table in tables.values():
+        table.game.close()
+
+
+def test_a_failed_commit_stays_queued_and_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal_module, "RETRY_DELAY", 0.01)
+    path = tmp_path / "journal.sqlite3"
+    journal = Journal(path)
+    failing = threading.Event()
+    failing.set()
+    apply = journal._apply
+
+    def flaky_apply(db, op):
+        if failing.is_set():
+            raise sqlite3.OperationalError("disk I/O error")
+        apply(db, op)
+
+    journal._apply = flaky_apply
+    game = Game(inactivity_timeout=None)
+    journal.attach("t1", game)
+    game.process_command("Hallo, Eg eri Anna")
+    assert wait_until(lambda: journal.stats().failures >= 2)
+    assert not journal.flush(0.05)
+    stats = journal.stats()
+    assert stats.operations == stats.commits == 0
+    assert stats.queued == 3 and stats.last_error == "disk I/O error"
+
+    failing.clear()
+    assert journal.flush(5.0)
+    stats = journal.stats()
+    assert stats.operations == 3 and stats.queued == 0 and stats.last_error is None
+    journal.close()
+    [table] = Journal(path).restore()
+    try:
+        assert table.replayed == 1 and table.game.players[1].name == "Anna"
+    finally:
+        table.game.close()
+        game.close()
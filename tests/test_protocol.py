@@ -0,0 +1,64 @@
+import socket
+
+import pytest
+
+from server.game import Game
+from server.protocol import (
+    FrameBuffer,
+    FramedClient,
+    ProtocolError,
+    encode_frame,
+    parse_handshake,
+)
+
+
+def test_frame_buffer_splits_merged_and_partial_frames():
+    data = encode_frame(1, "P1 GU") + encode_frame(2, "line one\nline two") + encode_frame(3, "tail")
+    buffer = FrameBuffer(data[:7])
+    assert buffer.next_frame() is None
+    buffer.feed(data[7:-2])
+    assert buffer.next_frame() == (1, "P1 GU")
+    assert buffer.next_frame() == (2, "line one\nline two")
+    assert buffer.next_frame() is None
+    buffer.feed(data[-2:])
+    assert buffer.next_frame() == (3, "tail")
+
+
+def test_frame_buffer_rejects_oversized_frames():
+    buffer = FrameBuffer(b"\xff\xff\xff\xff\x00\x00\x00\x01")
+    with pytest.raises(ProtocolError):
+        buffer.next_frame()
+
+
+def test_parse_handshake():
+    assert parse_handshake("Hallo SJAVS/1, Eg eri Anna") == "Hallo, Eg eri Anna"
+    assert parse_handshake("Hallo SJAVS/1") == ""
+    assert parse_handshake("Hallo SJAVS/17") is None
+    assert parse_handshake("Hallo, Eg eri Anna") is None
+
+
+def test_framed_clients_pipeline_alongside_legacy_clients(serve_game):
+    port = serve_game(Game())
+    anna = FramedClient.connect("127.0.0.1", port, name="Anna")
+    assert anna.greeting == "P1"
+
+    with socket.create_connection(("127.0.0.1", port), timeout=3) as legacy:
+        legacy.sendall(b"Hallo, Eg eri Bjorg")
+        assert legacy.recv(1024) == b"P2"
+
+    shared = FramedClient.connect("127.0.0.1", port)
+    assert shared.greeting == "OK"
+    replies = shared.pipeline(["P1 say hi", "P2 say there", "P1 GU", "P2 GU"])
+    assert replies[:2] == [" ", " "]
+    # Multi-line GU replies arrive whole, matched to their request.
+    assert replies[2].splitlines() == [
+        "Anna joined the lobby.",
+        "Bjorg joined the lobby.",
+        "Anna says: hi",
+        "Bjorg says: there",
+    ]
+    assert replies[3].splitlines() == ["Bjorg joined the lobby.", "Anna says: hi", "Bjorg says: there"]
+    assert anna.request("P1 GU") == "No new updates."
+
+    anna.close()
+    shared.close()
@@ -0,0 +1,36 @@
+import random
+
+from server.simulation import HeadlessTable, shuffled_codes
+
+
+def test_headless_rubber_runs_to_completion():
+    table = HeadlessTable(["hard", "medium", "hard", "medium"], seed=11)
+
+    result = table.play_rubber()
+
+    assert result.winner in {"Vit", "Tit"}
+    assert result.scoreboard[result.winner] <= 0
+    for deal in result.deals:
+        if not deal.passed_out:
+            assert sum(deal.card_points.values()) == 120
+            assert len(deal.trick_winners) == 8
+    assert len(table.game.updates) <= table.game.updates.capacity
+
+
+def test_headless_rubbers_are_reproducible_with_a_seed():
+    first = HeadlessTable(["easy", "hard", "easy", "hard"], seed=5).play_rubber()
+    second = HeadlessTable(["easy", "hard", "easy", "hard"], seed=5).play_rubber()
+
+    assert first.scoreboard == second.scoreboard
+    assert [deal.trick_winners for deal in first.deals] == [deal.trick_winners for deal in second.deals]
+
+
+def test_play_deal_replays_the_same_cards():
+    deck = shuffled_codes(random.Random(3))
+
+    first = HeadlessTable(["medium"] * 4, seed=2).play_deal(deck, dealer=1)
+    second = HeadlessTable(["medium"] * 4, seed=2).play_deal(deck, dealer=1)
+
+    assert first == second
+    if not first.passed_out:
+        assert sum(first.card_points.values()) == 120
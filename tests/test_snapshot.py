@@ -0,0 +1,77 @@
+import random
+
+from server import cards, snapshot
+from server.game import Game
+
+from helpers import hands
+
+
+def owner_id(game):
+    return game.trump_owner.id if game.trump_owner is not None else None
+
+
+def step(game):
+    """Send the command the seat whose turn it is owes: banka, the longest declaration, its lowest legal card."""
+    seat = game.current_turn
+    player = game.players[seat]
+    if game.state == "deal":
+        return game.process_command(f"P{seat} banka")
+    if game.state == "declaration":
+        maxmeld = player.find_highest_trump_declaration()
+        if game.declaration_count > game.nPlayers:
+            return game.process_command(f"P{seat} S {maxmeld[1]}")
+        length = int(maxmeld[0])
+        declared = length if length >= 5 and length > game.trump_length else 0
+        return game.process_command(f"P{seat} M {declared}")
+    legal = cards.FULL_MASK
+    if game.state == "play" and game.table.firstCard is not None:
+        legal = cards.legal_mask(player.hand.mask, game.table.firstCard.index, game.table.trump)
+    card = next(card for card in player.hand if card.bit & legal)
+    return game.process_command(f"P{seat} P {card}")
+
+
+def play_until(game, predicate, limit=500):
+    for _ in range(limit):
+        if predicate():
+            return True
+        step(game)
+    return predicate()
+
+
+def test_snapshot_round_trips_a_game_mid_round(tmp_path):
+    game = Game(rng=random.Random(11))
+    for name in ("Anna", "Bjorg", "Carl", "Dani"):
+        game.process_command(f"Hallo, Eg eri {name}")
+    game.process_command("P1 start")
+    # Two tricks in and a card led to the third.
+    assert play_until(game, lambda: game.state == "play" and len(game.trick_winners) >= 2 and game.table.cards)
+    path = tmp_path / "table.snap"
+    snapshot.write_snapshot(path, snapshot.game_state(game))
+
+    data = snapshot.read_snapshot(path)
+    restored = snapshot.restore_game(data)
+    try:
+        for field in ("state", "current_turn", "scoreboard", "round_history", "trump_suit", "trick_winners", "state_version"):
+            assert getattr(restored, field) == getattr(game, field)
+        assert owner_id(game) is not None and owner_id(restored) == owner_id(game)
+        assert hands(restored) == hands(game)
+        assert [str(card) for card in restored.table.cards] == [str(card) for card in game.table.cards]
+        assert restored.table.pile_masks == game.table.pile_masks
+        assert restored.table.pile_points("Vit") == game.table.pile_points("Vit")
+        assert restored.updates.last_seq == game.updates.last_seq
+        for pid in game.players:
+            assert restored.updates.cursor(pid) == game.updates.cursor(pid)
+            assert restored.updates.pending(pid) == game.updates.pending(pid)
+        assert restored.pending_prompt() == game.pending_prompt()
+        assert snapshot.read_snapshot(tmp_path / "missing.snap") is None
+
+        # Played on the same way, both finish the round alike, and deal the next one alike.
+        rounds = len(game.round_history)
+        for table in (game, restored):
+            assert play_until(table, lambda: len(table.round_history) > rounds)
+        assert restored.round_history == game.round_history
+        assert restored.scoreboard == game.scoreboard
+        assert hands(restored) == hands(game)
+    finally:
+        restored.close()
+        game.close()
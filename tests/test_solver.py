@@ -0,0 +1,130 @@
+import random
+from functools import lru_cache
+
+from server import cards
+from server.game import Game
+from server.solver import Deal, DoubleDummySolver, Outcome, solve, solve_many
+from server.utils import Card, Table
+
+SUIT_NAMES = {"C": "Clubs", "D": "Diamonds", "H": "Hearts", "S": "Spades"}
+VALUES = {"A": 1, "K": 13, "Q": 12, "J": 11, "T": 10, "9": 9, "8": 8, "7": 7}
+
+
+@lru_cache(maxsize=None)
+def brute_force(hands, trump, leader, trick=()):
+    """Vit's points from here on by plain minimax over every legal card."""
+    if len(trick) == 4:
+        winner = (leader - 1 + cards.trick_winner(trick, trump)) % 4 + 1
+        points = sum(cards.CARD_POINTS[index] for index in trick)
+        return (points if winner % 2 else 0) + brute_force(hands, trump, winner)
+    seat = (leader - 1 + len(trick)) % 4 + 1
+    hand = hands[seat - 1]
+    if not hand:
+        return 0
+    values = []
+    for index in cards.iter_mask(cards.legal_mask(hand, trick[0] if trick else None, trump)):
+        rest = list(hands)
+        rest[seat - 1] ^= 1 << index
+        values.append(brute_force(tuple(rest), trump, leader, trick + (index,)))
+    return max(values) if seat % 2 else min(values)
+
+
+def random_deal(rng: random.Random, per_hand: int) -> Deal:
+    codes = list(cards.CARD_CODES)
+    rng.shuffle(codes)
+    hands = tuple(cards.mask_from_codes(codes[seat * per_hand:(seat + 1) * per_hand]) for seat in range(4))
+    return Deal(hands, rng.choice(cards.SUITS), rng.randint(1, 4))
+
+
+def test_solver_matches_brute_force_on_small_endgames():
+    rng = random.Random(5)
+    for _ in range(30):
+        deal = random_deal(rng, rng.randint(1, 3))
+        outcome = solve(deal)
+        assert outcome.vit == brute_force(deal.hands, deal.trump, deal.leader)
+        assert outcome.vit + outcome.tit == cards.mask_points(sum(deal.hands))
+
+
+def test_move_values_mid_trick_match_brute_force():
+    rng = random.Random(8)
+    for _ in range(10):
+        start = random_deal(rng, 3)
+        lead = next(cards.iter_mask(start.hands[start.leader - 1]))
+        hands = list(start.hands)
+        hands[start.leader - 1] ^= 1 << lead
+        deal = Deal(tuple(hands), start.trump, start.leader, (lead,), taken=(10, 4))
+        values = DoubleDummySolver(deal.trump).move_values(deal)
+        seat = deal.to_move()
+        legal = cards.legal_mask(deal.hands[seat - 1], lead, deal.trump)
+        assert set(values) == set(cards.codes_of(legal))
+        for code, outcome in values.items():
+            rest = list(deal.hands)
+            rest[seat - 1] ^= 1 << cards.card_index(code)
+            expected = brute_force(tuple(rest), deal.trump, deal.leader, (lead, cards.card_index(code)))
+            assert outcome.vit == 10 + expected
+            assert outcome.vit + outcome.tit == 14 + cards.mask_points(sum(deal.hands)) + cards.CARD_POINTS[lead]
+
+
+def test_move_values_settle_the_trick_a_last_card_completes():
+    deal = Deal.from_codes(
+        {1: ["8D"], 2: ["7D"], 3: ["9D"], 4: ["8C", "JH"]}, "H", leader=1, trick=["AS", "7S", "TS"],
+    )
+    values = DoubleDummySolver("H").move_values(deal)
+    assert values == {"8C": Outcome(21, 2), "JH": Outcome(0, 23)}
+
+
+def test_a_card_in_the_trick_keeps_the_cards_either_side_of_it_apart():
+    # 9H beats the 8H led and 7H does not, though both are worth nothing and
+    # no live card lies between them.
+    deal = Deal.from_codes(
+        {1: ["9S", "KD"], 2: ["9H", "7H", "TH"], 3: ["AC", "8D", "7C"], 4: ["8C", "JH", "QD"]},
+        "D", leader=1, trick=["8H"],
+    )
+    assert solve(deal).vit == brute_force(deal.hands, deal.trump, deal.leader, deal.trick)
+
+
+def test_full_deal_best_card_agrees_with_solve():
+    deal = random_deal(random.Random(1), 8)
+    solver = DoubleDummySolver(deal.trump)
+    outcome = solver.solve(deal)
+    card, best = solver.best_card(deal)
+    assert outcome.vit + outcome.tit == 120
+    assert best == outcome
+    assert deal.hands[deal.leader - 1] >> cards.card_index(card) & 1
+
+
+def test_solve_many_in_a_pool_matches_serial():
+    rng = random.Random(3)
+    deals = [random_deal(rng, 4) for _ in range(6)]
+    assert solve_many(deals, processes=2) == solve_many(deals, processes=1)
+
+
+def test_deal_from_game_snapshots_hands_trick_and_piles():
+    game = Game()
+    for name in ("Anna", "Bjorg", "Carl", "Dani"):
+        game.process_command(f"Hallo, Eg eri {name}")
+    hands = {1: ["JD", "AH"], 2: ["7C", "8C"], 3: ["TS", "9S"], 4: ["KH", "QD"]}
+    for seat, codes in hands.items():
+        game.players[seat].hand = [Card(SUIT_NAMES[code[1]], VALUES[code[0]]) for code in codes]
+    game.table = Table(trump="H")
+    game.table.pile_masks["Vit"] = cards.mask_from_codes(["AC", "TC"])
+    lead = Card("Hearts", 7)
+    game.table.cards.append(lead)
+    game.table.cardOwners.append(game.players[4])
+    game.table.firstCard = lead
+    game.current_turn = 1
+
+    deal = Deal.from_game(game)
+    assert deal.hands[0] == cards.mask_from_codes(["JD", "AH"])
+    assert deal.trump == "H"
+    assert deal.leader == 4
+    assert deal.trick == (cards.card_index("7H"),)
+    assert deal.taken == (21, 0)
+    assert deal.to_move() == 1
+
+
+def test_outcome_award_follows_round_scoring():
+    assert Outcome(75, 45).award("Vit", "H") == ("Vit", 2)
+    assert Outcome(75, 45).award("Tit", "C") == ("Vit", 8)
+    assert Outcome(0, 120).award("Tit", "C") == ("Tit", 16)
+    assert Outcome(60, 60).award("Vit", "S") == (None, 0)
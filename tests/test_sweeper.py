@@ -0,0 +1,66 @@
+import threading
+import time
+
+from server.sweeper import Sweeper
+
+from helpers import wait_until
+
+
+def test_sweep_reclaims_only_due_entries_and_records_the_pass():
+    offered = []
+    freed = {"a": 2, "b": None, "c": 0}
+
+    def reclaim(key, now):
+        offered.append(key)
+        return freed[key]
+
+    sweeper = Sweeper(reclaim)
+    sweeper.schedule("c", 30.0)
+    sweeper.schedule("a", 10.0)
+    sweeper.schedule("b", 20.0)
+
+    first = sweeper.sweep(now=25.0)
+    assert offered == ["a", "b"]
+    assert (first.due, first.lobbies, first.sessions) == (2, 1, 2)
+    assert sweeper.pending() == 1
+
+    second = sweeper.sweep(now=40.0)
+    assert offered == ["a", "b", "c"]
+    assert (second.due, second.lobbies, second.sessions) == (1, 1, 0)
+
+    stats = sweeper.stats()
+    assert (stats.passes, stats.lobbies, stats.sessions, stats.scheduled) == (2, 2, 2, 0)
+    assert stats.last == second
+
+
+def test_failing_reclaim_does_not_stop_the_pass():
+    def reclaim(key, now):
+        if key == "bad":
+            raise RuntimeError("boom")
+        return 1
+
+    sweeper = Sweeper(reclaim)
+    sweeper.schedule("bad", 1.0)
+    sweeper.schedule("good", 2.0)
+    result = sweeper.sweep(now=5.0)
+    assert (result.due, result.lobbies, result.sessions) == (2, 1, 1)
+
+
+def test_thread_wakes_for_an_earlier_deadline():
+    reclaimed = threading.Event()
+
+    def reclaim(key, now):
+        if key == "soon":
+            reclaimed.set()
+        return 0
+
+    sweeper = Sweeper(reclaim)
+    sweeper.schedule("later", time.time() + 60)
+    sweeper.start()
+    try:
+        sweeper.schedule("soon", time.time() + 0.05)
+        assert reclaimed.wait(2.0)
+        assert wait_until(lambda: sweeper.stats().lobbies == 1)
+        assert sweeper.pending() == 1
+    finally:
+        sweeper.stop()
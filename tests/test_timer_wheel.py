@@ -0,0 +1,59 @@
+import time
+
+from server.game import Game
+from server.timer_wheel import TimerWheel
+
+
+def test_wheel_fires_due_timers_once_and_skips_cancelled_ones():
+    wheel = TimerWheel(tick=1.0, slots=8, threaded=False)
+    fired = []
+    start = wheel._current + 1
+    wheel.schedule(start + 2.5, lambda: fired.append("soon"))
+    # Twenty ticks out: same bucket as others on earlier laps.
+    wheel.schedule(start + 20.0, lambda: fired.append("later"))
+    cancelled = wheel.schedule(start + 3.0, lambda: fired.append("cancelled"))
+    cancelled.cancel()
+
+    assert wheel.advance(start + 2.0) == 0
+    assert wheel.advance(start + 5.0) == 1
+    assert fired == ["soon"]
+    assert wheel.pending() == 1
+    assert wheel.advance(start + 19.0) == 0
+    assert wheel.advance(start + 100.0) == 1
+    assert fired == ["soon", "later"]
+    assert wheel.pending() == 0 and wheel.fired == 2
+
+
+def test_quiet_seat_resets_the_table_only_when_its_deadline_passes():
+    wheel = TimerWheel(tick=1.0, threaded=False)
+    game = Game(inactivity_timeout=30.0, timers=wheel)
+    game.process_command("Hallo, Eg eri Bjorg")
+    game.process_command("Hallo, Eg eri Anna")
+    bjorg, anna = game.players[1], game.players[2]
+    assert wheel.pending() == 2
+    assert wheel.advance(time.time() + 20) == 0
+
+    # Both timers come due; Bjorg was heard from since, Anna was not.
+    bjorg.last_update_time -= 10
+    anna.last_update_time -= 31
+    assert wheel.advance(time.time() + 31) == 2
+    assert not game.players
+    assert "Anna" in game.last_reset_message and "Bjorg" not in game.last_reset_message
+    assert game.process_command("P1 show") == game.last_reset_message
+    # Bjorg's timer was re-armed, then cancelled by the reset.
+    assert wheel.advance(time.time() + 10_000) == 0
+
+
+def test_inactivity_handler_and_timeout_are_per_game():
+    wheel = TimerWheel(tick=1.0, threaded=False)
+    game = Game(inactivity_timeout=None, timers=wheel)
+    game.process_command("Hallo, Eg eri Anna")
+    assert wheel.pending() == 0
+
+    quiet = []
+    game.on_inactive = lambda _game, players: quiet.extend(player.name for player in players)
+    game.players[1].last_update_time -= 6
+    game.set_inactivity_timeout(5.0)
+    assert wheel.advance(time.time() + 2) == 1
+    assert quiet == ["Anna"]
+    assert game.players  # the handler chose not to reset
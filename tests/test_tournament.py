@@ -0,0 +1,29 @@
+import pytest
+
+from server.tournament import TournamentTally, parse_seat, rotations, run_tournament
+
+
+def test_parse_seat_accepts_difficulty_or_strategy_list():
+    assert parse_seat("easy") == ["discard_filler_when_losing"]
+    assert parse_seat("win_cheap_trick,lead_unseen_ace") == ["win_cheap_trick", "lead_unseen_ace"]
+    with pytest.raises(ValueError):
+        parse_seat("not_a_strategy")
+
+
+def test_rotations_give_every_label_every_seat():
+    seats = rotations(["a", "b", "c", "d"])
+    for position in range(4):
+        assert sorted(rotation[position] for rotation in seats) == ["a", "b", "c", "d"]
+
+
+def test_pool_results_match_serial_results():
+    serial = run_tournament(["hard", "easy", "hard", "easy"], deals=12, seed=4, workers=1, chunk_size=5)
+    pooled = run_tournament(["hard", "easy", "hard", "easy"], deals=12, seed=4, workers=2, chunk_size=5)
+
+    assert isinstance(pooled, TournamentTally)
+    assert serial.deals == pooled.deals == 48
+    for name in ("hard", "easy"):
+        assert serial.labels[name].wins == pooled.labels[name].wins
+        assert serial.labels[name].card_points.total == pooled.labels[name].card_points.total
+    played = serial.deals - serial.passed_out
+    assert serial.labels["hard"].card_points.total + serial.labels["easy"].card_points.total == 120 * played
@@ -0,0 +1,60 @@
+from server import cards
+from server.bot_player import BotBrain, DIFFICULTY_STRATEGIES
+from server.tracking import CardTracker
+
+
+def test_tracker_infers_voids_and_counts_trumps():
+    tracker = CardTracker()
+    tracker.set_trump("H")
+    for seat, card in ((1, "AS"), (2, "7S"), (3, "QC"), (4, "8D")):
+        tracker.record(seat, card)
+    tracker.end_trick()
+    for seat, card in ((3, "7H"), (4, "JD"), (1, "KS"), (2, "8H")):
+        tracker.record(seat, card)
+
+    spades = cards.follow_mask(cards.card_index("9S"), "H")
+    assert tracker.is_void(3, "9S") and tracker.is_void(4, "KS")
+    assert not tracker.is_void(2, "9S")
+    assert tracker.is_void(1, "9H")  # KS on a trump lead
+    assert tracker.barred[3] == spades
+    assert tracker.trumps_played == 4  # QC, 7H, JD, 8H
+    assert tracker.trumps_outstanding() == 13 - 4
+    assert not tracker.possible(4) & spades
+    assert tracker.trumps_possible((1,)) == 0
+
+
+def test_tracker_ignores_repeats_and_resets_per_round():
+    tracker = CardTracker()
+    tracker.set_trump("C")
+    tracker.record(2, "JC")
+    tracker.record(2, "JC")
+    assert tracker.plays == [(2, "JC")]
+    assert tracker.trumps_played == 1
+    tracker.reset()
+    assert tracker.trump is None
+    assert tracker.played == 0 and tracker.plays == []
+
+
+def test_bot_stops_bleeding_trumps_once_opponents_show_out():
+    bot = BotBrain(
+        name="TestBot",
+        send_fn=lambda _payload: "",
+        difficulty="hard",
+        strategy_names=DIFFICULTY_STRATEGIES["hard"],
+    )
+    bot.player_id = 1
+    bot.trump = "D"
+    bot.hand = ["9D", "AH"]
+    bot.trick_winners = [1, 3, 1, 3, 1]
+    assert bot._strategy_bleed_trump_late(["9D", "AH"]) == "9D"
+
+    for seat, card in ((1, "7D"), (2, "7S"), (3, "8D"), (4, "7C")):
+        bot.on_card_played(seat, card)
+    bot.on_trick_won(3)
+    assert bot.knowledge.is_void(2, "KD") and bot.knowledge.is_void(4, "KD")
+    assert bot._seen_trump_count() == 2
+    assert bot._strategy_bleed_trump_late(["9D", "AH"]) is None
+
+    bot.on_round_finished()
+    assert bot.trump is None
+    assert bot.knowledge.played == 0
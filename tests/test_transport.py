@@ -0,0 +1,41 @@
+import socket
+
+import pytest
+
+from server.game import Game
+from server.transport import ConnectionPool
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+def test_pool_reuses_persistent_connections(serve_game, legacy):
+    game = Game()
+    port = serve_game(game)
+    with ConnectionPool("127.0.0.1", port, size=2, legacy=legacy) as pool:
+        assert pool("Hallo, Eg eri Anna") == "P1"
+        replies = [pool("P1 GU") for _ in range(20)]
+        assert replies[0] == "Anna joined the lobby."
+        assert set(replies[1:]) == {"No new updates."}
+        assert pool.connects == 1
+
+
+def test_pool_reconnects_after_the_connection_drops(serve_game):
+    game = Game()
+    port = serve_game(game)
+    with ConnectionPool("127.0.0.1", port, size=1, backoff=0.01) as pool:
+        assert pool("Hallo, Eg eri Anna") == "P1"
+        pool._idle[0].close()  # simulate the server dropping the idle connection
+        assert pool("P1 GU") == "Anna joined the lobby."
+        assert pool.connects == 2
+
+
+def test_pool_gives_up_after_retries_when_the_server_is_down():
+    pool = ConnectionPool("127.0.0.1", free_port(), size=1, timeout=0.5, retries=2, backoff=0.01)
+    with pytest.raises(OSError):
+        pool("P1 GU")
+    assert pool.connects == 3
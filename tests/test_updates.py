@@ -0,0 +1,122 @@
+import json
+
+from server.game import Game
+from server.push import GameFeed
+from server.updates import DROPPED_NOTICE, UpdateLog
+
+
+def register_four_players(game: Game) -> None:
+    for name in ("Anna", "Bjorg", "Carl", "Dani"):
+        game.process_command(f"Hallo, Eg eri {name}")
+
+
+def test_log_stores_broadcasts_once_and_filters_private_messages():
+    log = UpdateLog(capacity=8)
+    for pid in (1, 2):
+        log.register(pid)
+    log.publish("hello all")
+    log.publish("only two", recipient=2)
+
+    assert len(log) == 2
+    assert log.read(1) == ["hello all"]
+    assert log.read(2) == ["hello all", "only two"]
+    assert log.read(2) == []
+
+
+def test_log_evicts_oldest_and_reports_dropped_updates():
+    log = UpdateLog(capacity=3)
+    log.register(1)
+    for index in range(5):
+        log.publish(f"m{index}")
+
+    assert len(log) == 3
+    assert log.read(1) == [DROPPED_NOTICE, "m2", "m3", "m4"]
+    events, missed = log.since(1, 3)
+    assert [event.text for event in events] == ["m3", "m4"]
+    assert missed is False
+
+
+def test_remap_moves_private_messages_and_cursors_with_seats():
+    log = UpdateLog()
+    for pid in (1, 2, 3):
+        log.register(pid)
+    log.publish("for one", recipient=1)
+    log.publish("for three", recipient=3)
+
+    log.remap({2: 1, 3: 2})
+
+    assert log.read(2) == ["for three"]
+    assert log.read(1) == []
+
+
+def test_since_reads_past_messages_dropped_with_a_departed_seat():
+    game = Game()
+    register_four_players(game)
+    game.updates.publish("for Carl", recipient=3)
+    game.updates.publish("for Dani", recipient=4)
+    start = game.updates.last_seq
+    game.process_command("P1 say one")
+    game.process_command("P1 say two")
+
+    game.remove_player(3)
+
+    events, missed = game.updates.since(2, start)
+    assert [event.text for event in events] == ["Anna says: one", "Anna says: two", "Carl left the table."]
+    assert missed is False
+    events, _ = game.updates.since(2, start - 1)  # from inside the gap
+    assert [event.text for event in events][:2] == ["Anna says: one", "Anna says: two"]
+
+
+def test_gu_and_since_are_served_from_the_same_log():
+    game = Game()
+    register_four_players(game)
+    start_seq = game.updates.last_seq
+
+    game.process_command("P1 say hi")
+    assert game.process_command("P2 GU").endswith("Anna says: hi")
+    assert game.process_command("P2 GU") == "No new updates."
+
+    message, seq = game.updates_since(2, start_seq)
+    assert message == "Anna says: hi"
+    assert seq == game.updates.last_seq
+
+
+def test_listeners_hear_published_events_and_clears():
+    log = UpdateLog()
+    heard = []
+    remove = log.add_listener(lambda event: heard.append(event.text), lambda: heard.append("cleared"))
+    log.publish("one")
+    log.clear()
+    remove()
+    log.publish("two")
+    log.clear()
+
+    assert heard == ["one", "cleared"]
+
+
+def test_feed_encodes_each_update_once_and_routes_private_messages():
+    log = UpdateLog()
+    feed = GameFeed(log)
+    received = {pid: [] for pid in (1, 2, 3)}
+    seats = {pid: pid for pid in received}
+    unsubscribe = {
+        pid: feed.subscribe(lambda pid=pid: seats[pid], received[pid].append)
+        for pid in received
+    }
+
+    log.publish("everyone")
+    log.publish("secret", recipient=2)
+    unsubscribe[3]()
+    seats[1] = 2  # seat renumbered after someone left
+    log.publish("after leave", recipient=2)
+
+    assert feed.encoded == 3
+    assert [json.loads(frame)["message"] for frame in received[1]] == ["everyone", "after leave"]
+    assert [json.loads(frame)["message"] for frame in received[2]] == ["everyone", "secret", "after leave"]
+    assert [json.loads(frame)["message"] for frame in received[3]] == ["everyone"]
+    assert json.loads(received[2][1]) == {"type": "update", "seq": 2, "message": "secret"}
+    assert received[1][0] is received[2][0] is received[3][0]
+
+    feed.close()
+    log.publish("ignored")
+    assert feed.encoded == 3 and len(feed) == 0
@@ -39,6 +39,10 @@ def test_join_command_and_state_flow():
 
     updates_resp = client.get("/updates", params={"token": token})
     assert updates_resp.status_code == 200
+    seq = updates_resp.json()["seq"]
+    replay_resp = client.get("/updates", params={"token": token, "since": 0})
+    assert replay_resp.status_code == 200
+    assert replay_resp.json()["seq"] >= seq
 
     state_resp = client.get("/state", params={"token": token})
     assert state_resp.status_code == 200
@@ -0,0 +1,232 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from server import webapp
+from server.journal import Journal
+from server.webapp import app
+
+
+@pytest.fixture
+def server_env(tmp_path, monkeypatch):
+    """Run the app's startup hooks against a journal in ``tmp_path`` and no TCP listener."""
+    monkeypatch.setenv("SJAVS_JOURNAL", str(tmp_path / "journal.sqlite3"))
+    monkeypatch.setattr(webapp, "HIBERNATION_DIR", tmp_path / "lobbies")
+    monkeypatch.setattr(webapp, "start_async_server", lambda **kwargs: None)
+    return tmp_path
+
+
+def test_state_etag_and_delta_responses():
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Version Table"}).json()["lobby_id"]
+    token = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+
+    first = client.get("/state", params={"token": token})
+    assert first.status_code == 200
+    version = first.json()["version"]
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/state", params={"token": token}, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert client.get("/state", params={"token": token, "since": version}).status_code == 304
+
+    client.post("/join", json={"name": "Beta", "lobby_id": lobby_id})
+    delta = client.get("/state", params={"token": token, "since": version})
+    assert delta.status_code == 200
+    payload = delta.json()
+    assert payload["since"] == version and payload["version"] > version
+    assert [player["name"] for player in payload["changes"]["players"]] == ["Alpha", "Beta"]
+    assert "scoreboard" not in payload["changes"]
+
+
+def test_tables_come_back_from_the_journal_after_a_restart(server_env):
+    with TestClient(app) as client:
+        lobby_id = client.post("/lobbies", json={"name": "Durable Table"}).json()["lobby_id"]
+        token = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+        client.post("/command", json={"token": token, "command": "bots 4"})
+        client.post("/command", json={"token": token, "command": "say hello"})
+        before = client.get("/state", params={"token": token}).json()
+    assert webapp.journal is None
+    tables = Journal(server_env / "journal.sqlite3").restore()
+    assert sorted(table.game_id for table in tables) == sorted([lobby_id, "tcp"])
+    for table in tables:
+        table.game.close()
+
+    # Forget the table, as a new process would.
+    with webapp.registry_lock:
+        lobby = webapp.lobbies.pop(lobby_id)
+        webapp.lobby_tokens.pop(lobby_id)
+        webapp.sessions.pop(token)
+    webapp.close_lobby(lobby)
+
+    with TestClient(app) as client:
+        after = client.get("/state", params={"token": token})
+        assert after.status_code == 200
+        assert after.json()["hand"] == before["hand"]
+        assert [player["name"] for player in after.json()["players"]] == [
+            player["name"] for player in before["players"]
+        ]
+        assert "Alpha says: hello" in client.get("/updates", params={"token": token, "since": 0}).json()["message"]
+
+
+def test_long_poll_wakes_when_the_seat_gets_an_update():
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Waiting Table"}).json()["lobby_id"]
+    first = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+    second = client.post("/join", json={"name": "Beta", "lobby_id": lobby_id}).json()["token"]
+    seq = client.get("/updates", params={"token": first}).json()["seq"]
+
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        result["body"] = client.get("/updates", params={"token": first, "since": seq, "wait": 10}).json()
+        result["elapsed"] = time.monotonic() - started
+
+    waiter = threading.Thread(target=poll)
+    waiter.start()
+    time.sleep(0.2)
+    client.post("/command", json={"token": second, "command": "say hi"})
+    waiter.join(10)
+    assert "Beta says: hi" in result["body"]["message"]
+    assert result["elapsed"] < 5
+
+    quiet = client.get("/updates", params={"token": first, "since": result["body"]["seq"], "wait": 0.2})
+    assert quiet.json()["message"] == "No new updates."
+
+
+def test_idle_lobby_hibernates_and_wakes_on_next_request(server_env):
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Sleepy Table", "inactivity_timeout": 7200}).json()["lobby_id"]
+    token = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+    client.post("/command", json={"token": token, "command": "bots 4"})
+    before = client.get("/state", params={"token": token}).json()
+
+    assert webapp.hibernate_lobby(lobby_id, time.time()) is None  # still active
+    later = time.time() + webapp.HIBERNATE_AFTER_SECONDS + 1
+    assert webapp.hibernate_lobby(lobby_id, later) == 1
+    assert lobby_id not in webapp.lobbies and lobby_id in webapp.hibernated
+    assert (server_env / "lobbies" / f"{lobby_id}.snap").exists()
+    listed = {lobby["lobby_id"]: lobby for lobby in client.get("/lobbies").json()["lobbies"]}
+    assert listed[lobby_id]["player_count"] == 4
+
+    after = client.get("/state", params={"token": token})
+    assert after.status_code == 200
+    assert lobby_id in webapp.lobbies and lobby_id not in webapp.hibernated
+    assert after.json()["version"] >= before["version"]
+    assert after.json()["hand"] == before["hand"]
+    assert [player["name"] for player in after.json()["players"]] == [player["name"] for player in before["players"]]
+
+
+def test_wake_reads_the_lobby_back_once_and_outside_the_registry_lock(server_env, monkeypatch):
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Drowsy Table"}).json()["lobby_id"]
+    token = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+    assert webapp.hibernate_lobby(lobby_id, time.time() + webapp.HIBERNATE_AFTER_SECONDS + 1) == 1
+
+    rehydrate = webapp.rehydrate_lobby
+    calls = []
+
+    def slow_rehydrate(record):
+        # Other lobbies stay reachable while this one is read back.
+        free = webapp.registry_lock.acquire(blocking=False)
+        if free:
+            webapp.registry_lock.release()
+        calls.append(free)
+        time.sleep(0.2)
+        return rehydrate(record)
+
+    monkeypatch.setattr(webapp, "rehydrate_lobby", slow_rehydrate)
+    woken = []
+    threads = [threading.Thread(target=lambda: woken.append(webapp.awake_lobby(lobby_id))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert calls == [True]
+    assert len(woken) == 4 and all(lobby is webapp.lobbies[lobby_id] for lobby in woken)
+    assert lobby_id not in webapp.hibernated and lobby_id not in webapp.waking
+    assert client.get("/state", params={"token": token}).status_code == 200
+
+
+def test_long_poll_returns_when_the_table_resets():
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Resetting Table"}).json()["lobby_id"]
+    token = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+    seq = client.get("/updates", params={"token": token}).json()["seq"]
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        client.get("/updates", params={"token": token, "since": seq, "wait": 20})
+        result["elapsed"] = time.monotonic() - started
+
+    waiter = threading.Thread(target=poll)
+    waiter.start()
+    time.sleep(0.2)
+    webapp.ask(webapp.lobbies[lobby_id], lambda game: game._force_reset("test"))
+    waiter.join(10)
+    assert result["elapsed"] < 5
+
+
+def test_empty_lobby_and_its_sessions_are_reclaimed_after_the_ttl():
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Emptied Table"}).json()["lobby_id"]
+    token = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+    lobby = webapp.lobbies[lobby_id]
+    webapp.ask(lobby, lambda game: game._force_reset("test"))  # seats gone, session kept
+    assert webapp.expire_lobby(lobby_id, lobby.created_at + 1) is None
+
+    before = client.get("/stats").json()["sweeper"]
+    due = lobby.created_at + webapp.EMPTY_LOBBY_TTL_SECONDS + 1
+    webapp.lobby_sweeper.schedule(lobby_id, due)
+    swept = webapp.lobby_sweeper.sweep(due)
+    assert swept.lobbies >= 1 and swept.sessions >= 1
+    assert lobby_id not in webapp.lobbies and lobby_id not in webapp.lobby_tokens
+    assert token not in webapp.sessions
+    assert client.get("/state", params={"token": token}).status_code == 401
+
+    after = client.get("/stats").json()["sweeper"]
+    assert after["passes"] == before["passes"] + 1
+    assert after["sessions"] >= before["sessions"] + 1
+    assert after["recent"][-1] == {"at": due, "due": swept.due, "lobbies": swept.lobbies, "sessions": swept.sessions}
+
+
+def test_hibernated_lobby_expires_once_its_seats_would_have_timed_out(server_env):
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Forgotten Table", "inactivity_timeout": 60}).json()["lobby_id"]
+    token = client.post("/join", json={"name": "Alpha", "lobby_id": lobby_id}).json()["token"]
+    assert webapp.hibernate_lobby(lobby_id, time.time() + webapp.HIBERNATE_AFTER_SECONDS + 1) == 1
+    record = webapp.hibernated[lobby_id]
+
+    assert webapp.expire_lobby(lobby_id, record.expires_at - 1) is None
+    assert webapp.expire_lobby(lobby_id, record.expires_at + 1) == 1
+    assert lobby_id not in webapp.hibernated and token not in webapp.sessions
+    assert not record.path.exists()
+    assert lobby_id not in [lobby["lobby_id"] for lobby in client.get("/lobbies").json()["lobbies"]]
+
+
+def test_leave_renumbers_the_other_sessions_and_the_last_one_out_closes_the_lobby():
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Shrinking Table"}).json()["lobby_id"]
+    tokens = [
+        client.post("/join", json={"name": name, "lobby_id": lobby_id}).json()["token"]
+        for name in ("Alpha", "Beta", "Gamma")
+    ]
+
+    assert client.post("/leave", json={"token": tokens[0]}).status_code == 200
+    assert tokens[0] not in webapp.sessions and webapp.lobby_tokens[lobby_id] == set(tokens[1:])
+    assert [client.get("/state", params={"token": token}).json()["player_id"] for token in tokens[1:]] == [1, 2]
+    client.post("/command", json={"token": tokens[2], "command": "say still here"})
+    message = client.get("/updates", params={"token": tokens[1]}).json()["message"]
+    assert "Gamma says: still here" in message
+
+    for token in tokens[1:]:
+        assert client.post("/leave", json={"token": token}).status_code == 200
+    assert lobby_id not in webapp.lobbies and lobby_id not in webapp.lobby_tokens
+    assert not any(session["lobby_id"] == lobby_id for session in webapp.sessions.values())
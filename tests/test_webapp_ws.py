@@ -0,0 +1,116 @@
+import time
+from contextlib import ExitStack
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from server import cards, webapp
+from server.webapp import app
+
+
+def send_command(socket, frames, game, request_id, command):
+    """Send a command; return its reply and the first state snapshot that includes it."""
+    socket.send_json({"id": request_id, "command": command})
+    reply = snapshot = None
+    version = None
+    while reply is None or snapshot is None or snapshot["version"] < version:
+        frame = socket.receive_json()
+        frames.append(frame)
+        if frame["type"] == "reply" and frame["id"] == request_id:
+            reply = frame["message"]
+            version = game.state_version
+        elif frame["type"] == "state":
+            snapshot = frame["state"]
+    return reply, snapshot
+
+
+def next_command(game, player_id):
+    player = game.players[player_id]
+    if game.state == "deal":
+        return "banka"
+    if game.state == "declaration":
+        maxmeld = player.find_highest_trump_declaration()
+        if game.declaration_count > game.nPlayers:
+            return f"S {maxmeld[1]}"
+        return f"M {maxmeld[0]}"
+    table = game.table
+    lead = table.firstCard.index if table.firstCard is not None else None
+    options = cards.codes_of(cards.legal_mask(player.hand.mask, lead, table.trump))
+    return f"P {options[0]}"
+
+
+def test_full_round_over_websockets():
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Socket Table"}).json()["lobby_id"]
+    tokens = {}
+    for name in ("Anna", "Bjorg", "Carl", "Dani"):
+        payload = client.post("/join", json={"name": name, "lobby_id": lobby_id}).json()
+        tokens[payload["player_id"]] = payload["token"]
+    game = webapp.lobbies[lobby_id].game
+
+    with ExitStack() as stack:
+        sockets = {pid: stack.enter_context(client.websocket_connect(f"/ws?token={token}")) for pid, token in tokens.items()}
+        frames = {pid: [] for pid in sockets}
+        for pid, socket in sockets.items():
+            first = socket.receive_json()
+            assert first["type"] == "state"
+            assert first["state"]["player_id"] == pid
+
+        reply, snapshot = send_command(sockets[1], frames[1], game, 1, "start")
+        assert snapshot["phase"] != "lobby"
+
+        request_id = 1
+        while not game.round_history:
+            request_id += 1
+            assert request_id < 200, "round did not finish"
+            pid = game.current_turn
+            command = next_command(game, pid)
+            reply, snapshot = send_command(sockets[pid], frames[pid], game, request_id, command)
+            if reply == "Invalid declaration":
+                request_id += 1
+                send_command(sockets[pid], frames[pid], game, request_id, "M 0")
+
+        assert len(snapshot["round_history"]) == 1
+        for pid, socket in sockets.items():
+            seen = list(frames[pid])
+            while not any(frame["type"] == "update" for frame in seen):
+                seen.append(socket.receive_json())
+            assert all(frame.get("type") != "error" for frame in seen)
+
+
+def test_websocket_rejects_unknown_token():
+    client = TestClient(app)
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with client.websocket_connect("/ws?token=nope") as socket:
+            socket.receive_json()
+    assert excinfo.value.code == 4401
+
+
+def test_idle_socket_does_not_rebuild_state(monkeypatch):
+    built = []
+    payload = webapp.socket_state_payload
+
+    def counting_payload(token, sent_version):
+        built.append(sent_version)
+        return payload(token, sent_version)
+
+    monkeypatch.setattr(webapp, "socket_state_payload", counting_payload)
+    monkeypatch.setattr(webapp, "SOCKET_HEARTBEAT_SECONDS", 0.05)
+    client = TestClient(app)
+    lobby_id = client.post("/lobbies", json={"name": "Idle Table"}).json()["lobby_id"]
+    token = client.post("/join", json={"name": "Anna", "lobby_id": lobby_id}).json()["token"]
+    # Keep the seat's presence steady so only heartbeats happen.
+    monkeypatch.setattr(webapp, "PLAYER_OK_SECONDS", 60.0)
+
+    with client.websocket_connect(f"/ws?token={token}") as socket:
+        assert socket.receive_json()["type"] == "state"
+        time.sleep(0.5)
+        assert len(built) == 1
+        client.post("/command", json={"token": token, "command": "say hello"})
+        frames = [socket.receive_json() for _ in range(2)]
+        assert {frame["type"] for frame in frames} == {"update", "state"}
+    assert len(built) == 2